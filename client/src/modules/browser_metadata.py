@@ -0,0 +1,194 @@
+"""
+Browser Metadata Cache
+Version, vendor and release channel of browser executables, read from the
+files themselves (Windows version resource, macOS bundle Info.plist, Firefox
+application.ini) instead of running the browser. Results are keyed on the
+executable path and revalidated against its size and mtime, so a browser
+update is picked up on the next lookup; the table is persisted as JSON so
+agent restarts do not read the files again either.
+"""
+
+import os
+import json
+import logging
+import plistlib
+import platform
+import threading
+from configparser import ConfigParser
+from dataclasses import dataclass, asdict
+from typing import Dict, Optional
+
+VENDORS = {
+    'Chrome': 'Google',
+    'Edge': 'Microsoft',
+    'Firefox': 'Mozilla',
+    'Safari': 'Apple',
+    'Opera': 'Opera Software',
+    'Brave': 'Brave Software',
+    'Vivaldi': 'Vivaldi Technologies',
+}
+
+# Install path / bundle id / product name markers of pre-release channels, most specific first
+_CHANNEL_MARKERS = (
+    ('canary', 'canary'), ('chrome sxs', 'canary'), ('nightly', 'nightly'),
+    ('developer edition', 'dev'), ('technology preview', 'preview'),
+    ('beta', 'beta'), ('unstable', 'dev'), ('-dev', 'dev'), (' dev', 'dev'), ('.dev', 'dev'),
+)
+
+# Where browsers live when the process path is not known (macOS)
+_MACOS_DEFAULT_EXES = {
+    'Chrome': '/Applications/Google Chrome.app/Contents/MacOS/Google Chrome',
+    'Safari': '/Applications/Safari.app/Contents/MacOS/Safari',
+}
+
+
+@dataclass
+class BrowserMetadata:
+    """What is known about one browser executable"""
+    version: str
+    vendor: str
+    channel: str  # stable, beta, dev, canary, nightly, preview
+
+    def display_version(self) -> str:
+        if self.channel and self.channel != 'stable' and self.version != 'Unknown':
+            return f"{self.version} ({self.channel})"
+        return self.version
+
+
+def _install_dir(exe: Optional[str]) -> str:
+    # Only the install's own directories: user names higher up must not look like a channel
+    parts = os.path.normpath(exe).replace('\\', '/').split('/') if exe else []
+    return '/'.join(parts[-4:])
+
+
+def detect_channel(*hints: Optional[str]) -> str:
+    """Release channel named in the install path / product name hints"""
+    text = ' '.join(hint for hint in hints if hint).lower()
+    for marker, channel in _CHANNEL_MARKERS:
+        if marker in text:
+            return channel
+    return 'stable'
+
+
+def _windows_version_info(exe: str) -> Dict[str, str]:
+    import win32api
+
+    info = win32api.GetFileVersionInfo(exe, "\\")
+    ms, ls = info['FileVersionMS'], info['FileVersionLS']
+    result = {'version': f"{ms >> 16}.{ms & 0xFFFF}.{ls >> 16}.{ls & 0xFFFF}"}
+    try:
+        language, codepage = win32api.GetFileVersionInfo(exe, '\\VarFileInfo\\Translation')[0]
+        prefix = f"\\StringFileInfo\\{language:04x}{codepage:04x}\\"
+        result['vendor'] = win32api.GetFileVersionInfo(exe, prefix + 'CompanyName') or ''
+        result['product'] = win32api.GetFileVersionInfo(exe, prefix + 'ProductName') or ''
+    except Exception:
+        pass  # no string table; the numeric version is enough
+    return result
+
+
+def _macos_bundle_info(exe: str) -> Dict[str, str]:
+    # <App>.app/Contents/MacOS/<binary> -> <App>.app/Contents/Info.plist
+    plist_path = os.path.join(os.path.dirname(os.path.dirname(exe)), 'Info.plist')
+    with open(plist_path, 'rb') as f:
+        plist = plistlib.load(f)
+    return {
+        'version': plist.get('CFBundleShortVersionString') or plist.get('CFBundleVersion') or '',
+        'product': f"{plist.get('CFBundleName', '')} {plist.get('CFBundleIdentifier', '')}",
+    }
+
+
+def _firefox_application_ini(exe: str) -> Dict[str, str]:
+    parser = ConfigParser(interpolation=None)
+    if not parser.read(os.path.join(os.path.dirname(exe), 'application.ini')):
+        return {}
+    app = parser['App'] if parser.has_section('App') else {}
+    return {
+        'version': app.get('Version', ''),
+        'vendor': app.get('Vendor', ''),
+        'product': app.get('RemotingName', ''),
+    }
+
+
+class BrowserMetadataCache:
+    """
+    executable path -> BrowserMetadata, valid while the file's (size, mtime)
+    is unchanged. Lookups with an unknown or missing executable are answered
+    but not cached.
+    """
+
+    def __init__(self, path: Optional[str] = None, logger=None):
+        self.path = path
+        self.logger = logger or logging.getLogger(__name__)
+        self.system = platform.system()
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict] = {}
+        self._dirty = False
+        self._load()
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r') as f:
+                self._entries = {exe: dict(entry) for exe, entry in json.load(f).items()}
+        except Exception as e:
+            self.logger.warning(f"Ignoring unreadable browser metadata cache: {e}")
+            self._entries = {}
+
+    def save(self):
+        """Write to disk (atomically) if anything changed"""
+        with self._lock:
+            if not self.path or not self._dirty:
+                return
+            data = dict(self._entries)
+            self._dirty = False
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            self.logger.warning(f"Failed to save browser metadata cache: {e}")
+
+    def get(self, browser_name: str, exe: Optional[str]) -> BrowserMetadata:
+        """Metadata for the browser running from exe (read from disk only when exe changed)"""
+        if not exe and self.system == 'Darwin':
+            exe = _MACOS_DEFAULT_EXES.get(browser_name)
+        try:
+            stat = os.stat(exe) if exe else None
+        except OSError:
+            stat = None
+        if stat is None:
+            return BrowserMetadata('Unknown', VENDORS.get(browser_name, 'Unknown'), detect_channel(_install_dir(exe)))
+
+        with self._lock:
+            entry = self._entries.get(exe)
+            if entry and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+                return BrowserMetadata(entry['version'], entry['vendor'], entry['channel'])
+
+        # New executable, or the browser updated itself in place
+        metadata = self._read(browser_name, exe)
+        with self._lock:
+            self._entries[exe] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, **asdict(metadata)}
+            self._dirty = True
+        self.save()
+        return metadata
+
+    def _read(self, browser_name: str, exe: str) -> BrowserMetadata:
+        info: Dict[str, str] = {}
+        try:
+            if self.system == 'Windows':
+                info = _windows_version_info(exe)
+            elif self.system == 'Darwin':
+                info = _macos_bundle_info(exe)
+            elif browser_name == 'Firefox':
+                info = _firefox_application_ini(exe)
+        except Exception as e:
+            self.logger.debug(f"Could not read {browser_name} version from {exe}: {e}")
+
+        return BrowserMetadata(
+            version=info.get('version') or 'Unknown',
+            vendor=info.get('vendor') or VENDORS.get(browser_name, 'Unknown'),
+            channel=detect_channel(_install_dir(exe), info.get('product')),
+        )
@@ -7,11 +7,11 @@ import logging
 import sys
 import os
 from datetime import datetime
-import psutil
 
 # Add src to path for imports
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 from core.config import Config
+from .process_snapshot import get_process_snapshot_service
 
 # Global flag to track if we've already warned about missing modules
 _modules_warning_shown = False
@@ -56,6 +56,10 @@ class BrowserMonitor:
         self.browser_processes = {}
         self.active_tabs = {}
         self.check_interval = 5  # seconds
+        self._last_snapshot_version = None
+
+        # Shared process snapshot (one psutil scan per tick for all monitors)
+        self.process_snapshots = get_process_snapshot_service()
 
         # Browser process names
         self.browser_names = [
@@ -81,8 +85,18 @@ class BrowserMonitor:
         current_time = datetime.now()
 
         # Get all running processes
-        current_browsers = self.get_browser_processes()
+        snapshot = self.process_snapshots.get_snapshot()
+        if snapshot.version != self._last_snapshot_version:
+            self._last_snapshot_version = snapshot.version
+            self._update_browser_processes(self.get_browser_processes(snapshot), current_time)
+
+        # Monitor active windows and URLs (simplified)
+        active_window = self.get_active_window()
+        if active_window and self.is_browser_window(active_window):
+            self.monitor_browser_urls(active_window)
 
+    def _update_browser_processes(self, current_browsers, current_time):
+        """Send start/close events for browsers that appeared or disappeared"""
         # Check for new browser sessions
         for browser_name, processes in current_browsers.items():
             if browser_name not in self.browser_processes:
@@ -105,23 +119,19 @@ class BrowserMonitor:
                 self.send_browser_event('browser_closed', browser_name, end_time, start_time)
                 del self.browser_processes[browser_name]
 
-        # Monitor active windows and URLs (simplified)
-        active_window = self.get_active_window()
-        if active_window and self.is_browser_window(active_window):
-            self.monitor_browser_urls(active_window)
-
-    def get_browser_processes(self):
+    def get_browser_processes(self, snapshot=None):
         """Get all running browser processes"""
         browsers = {}
 
         try:
-            for proc in psutil.process_iter(['pid', 'name']):
-                proc_name = proc.info['name']
-                if any(browser in proc_name for browser in self.browser_names):
-                    browser_key = self.normalize_browser_name(proc_name)
-                    if browser_key not in browsers:
-                        browsers[browser_key] = []
-                    browsers[browser_key].append(proc.info['pid'])
+            snapshot = snapshot or self.process_snapshots.get_snapshot()
+            for procs in snapshot.browsers.values():
+                for proc in procs:
+                    if any(browser in proc.name for browser in self.browser_names):
+                        browser_key = self.normalize_browser_name(proc.name)
+                        if browser_key not in browsers:
+                            browsers[browser_key] = []
+                        browsers[browser_key].append(proc.pid)
         except Exception as e:
             logging.error(f"Error getting browser processes: {str(e)}")
 
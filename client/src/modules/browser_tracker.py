@@ -13,6 +13,16 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Set
 from dataclasses import dataclass, asdict
 import psutil
+from .process_snapshot import ProcessInfo, get_process_snapshot_service
+from .url_activity_store import UrlActivityStore
+from .macos_tabs import fetch_tabs
+from .window_classifier import BrowserPidCache, classify_windows
+from .x11_windows import open_ewmh
+from .focus_tracker import FocusTracker
+from .activity_rollup import ActivityRollup
+from .domain_categories import get_domain_categorizer
+from .url_normalizer import get_url_normalizer
+from .browser_metadata import BrowserMetadataCache
 
 @dataclass
 class BrowserTab:
@@ -62,10 +72,15 @@ class BrowserTracker:
 
         # Browser sessions tracking
         self.active_sessions: Dict[str, BrowserSession] = {}
-        self.url_activities: Dict[str, Dict] = {}  # url -> activity data
+        self.url_activities = UrlActivityStore()  # (browser, url) -> time spent
+        self.urls = get_url_normalizer()  # url -> (canonical url, domain, registrable domain), memoised
+        self._sent_sessions: Dict[str, Dict] = {}  # session_id -> last payload the server has
 
         # Activity detector integration
         self.activity_detector = None
+        # Foreground window follower: durations/input go to the focused page only
+        self.focus_tracker = None
+        self._active_tabs: Dict[str, str] = {}  # browser -> title of its selected tab (macOS)
         self.tracking_paused = False  # Flag to pause duration tracking when user inactive
 
         # Platform-specific browser detection
@@ -79,12 +94,59 @@ class BrowserTracker:
             'Brave': ['brave', 'Brave Browser', 'brave.exe']
         }
 
+        # Shared process snapshot (one psutil scan per tick for all monitors)
+        self.process_snapshots = get_process_snapshot_service()
+        self.browser_pids = BrowserPidCache(self.process_snapshots)  # window owner pid -> browser
+        self.x11_windows = None  # EWMH connection (Linux), opened on first use
+        self._x11_unavailable = False
+
+        # Domain categories and optional per-domain time buckets in place of raw URL rows
+        self.rollup = None
+        self.categorizer = None
+        self.category_refresh_interval = 900
+        metadata_path = None
+        try:
+            import sys
+            import os
+            sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+            from core.config import Config
+
+            # Domain -> category rules (server rule set, cached on disk between runs)
+            data_dir = getattr(Config, 'DATA_DIR', None)
+            self.categorizer = get_domain_categorizer(
+                os.path.join(data_dir, 'category_rules.json') if data_dir else None, logger
+            )
+            self.category_refresh_interval = getattr(Config, 'CATEGORY_RULES_REFRESH_INTERVAL', self.category_refresh_interval)
+            metadata_path = os.path.join(data_dir, 'browser_metadata.json') if data_dir else None
+
+            if getattr(Config, 'BROWSER_ROLLUP_ENABLED', False):
+                self.rollup = ActivityRollup(
+                    bucket_seconds=getattr(Config, 'BROWSER_ROLLUP_BUCKET_SECONDS', 300),
+                    path_depth=getattr(Config, 'BROWSER_ROLLUP_PATH_DEPTH', 0),
+                    raw_sample=getattr(Config, 'BROWSER_ROLLUP_RAW_SAMPLE', 0.0),
+                    raw_domains=getattr(Config, 'BROWSER_ROLLUP_RAW_DOMAINS', [])
+                )
+                self.logger.info("Browser activity roll-up enabled")
+        except Exception as e:
+            self.logger.warning(f"Failed to initialize activity categories / roll-up: {e}")
+
+        # Executable -> version / vendor / channel, persisted across restarts
+        self.browser_metadata = BrowserMetadataCache(metadata_path, logger)
+
         # Browser history parser for Windows (fallback when AppleScript not available)
         self.history_parser = None
         if self.system == 'Windows':
             try:
+                import sys
+                import os
+                sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+                from core.config import Config
                 from .browser_history_parser import BrowserHistoryParser
-                self.history_parser = BrowserHistoryParser(logger)
+
+                # Per-profile read positions survive restarts so history is only read once
+                data_dir = getattr(Config, 'DATA_DIR', None)
+                state_path = os.path.join(data_dir, 'history_watermarks.json') if data_dir else None
+                self.history_parser = BrowserHistoryParser(logger, state_path=state_path)
                 self.logger.info("Browser history parser initialized for Windows")
             except Exception as e:
                 self.logger.warning(f"Failed to initialize history parser: {e}")
@@ -156,6 +218,23 @@ class BrowserTracker:
         except Exception as e:
             self.logger.warning(f"⚠ Could not initialize activity detection: {e}")
             self.activity_detector = None
+
+        # Focus tracking (falls back to crediting every visible URL when unavailable)
+        try:
+            self.focus_tracker = FocusTracker(
+                self.logger,
+                self.browser_pids.browser_of,
+                counters=lambda: self.activity_detector.activity_stats if self.activity_detector else None,
+                title_of=self._active_tabs.get
+            )
+            if self.focus_tracker.available:
+                self.focus_tracker.start()
+                self.logger.info("✓ Focus tracking enabled (time credited to the foreground page)")
+            else:
+                self.focus_tracker = None
+        except Exception as e:
+            self.logger.warning(f"⚠ Could not initialize focus tracking: {e}")
+            self.focus_tracker = None
         
         self.tracker_thread = threading.Thread(target=self._tracking_loop, daemon=True)
         self.tracker_thread.start()
@@ -168,10 +247,16 @@ class BrowserTracker:
         # Stop activity detector
         if self.activity_detector:
             self.activity_detector.stop_monitoring()
+
+        if self.focus_tracker:
+            self.focus_tracker.stop()
             
         if self.tracker_thread:
             self.tracker_thread.join(timeout=5)
 
+        if self.history_parser:
+            self.history_parser.close()
+
         # End all active sessions (thread-safe)
         for session in self._get_active_sessions_copy().values():
             self._end_browser_session(session)
@@ -179,11 +264,15 @@ class BrowserTracker:
     def _on_tracking_paused(self):
         """Callback when user activity pauses"""
         self.tracking_paused = True
+        if self.focus_tracker:
+            self.focus_tracker.set_paused(True)
         self.logger.info("⏸ Duration tracking paused (user inactive)")
     
     def _on_tracking_resumed(self):
         """Callback when user activity resumes"""
         self.tracking_paused = False
+        if self.focus_tracker:
+            self.focus_tracker.set_paused(False)
         self.logger.info("▶ Duration tracking resumed (user active)")
             
     def _tracking_loop(self):
@@ -209,6 +298,10 @@ class BrowserTracker:
                 # Update URL activity durations
                 self._update_url_durations(current_time)
 
+                # Pick up category rule changes from the server
+                if self.categorizer:
+                    self.categorizer.refresh(self.api_client, self.category_refresh_interval)
+
                 # FIX #6: Send data to server AFTER tab tracking (so history parser data is included!)
                 # Previously sent BEFORE _track_windows_tabs() which caused 1-2min delay
                 self._send_tracking_data()
@@ -223,32 +316,22 @@ class BrowserTracker:
                 self.logger.error(f"Error in browser tracking loop: {e}")
                 time.sleep(10)
                 
-    def _detect_active_browsers(self) -> Dict[str, List[psutil.Process]]:
+    def _detect_active_browsers(self) -> Dict[str, List[ProcessInfo]]:
         """Detect all active browser processes"""
         active_browsers = {}
         
         try:
-            for proc in psutil.process_iter(['pid', 'name', 'exe', 'cmdline']):
-                try:
-                    proc_info = proc.info
-                    proc_name = proc_info['name'] or ''
-                    
-                    for browser_name, process_names in self.browser_processes.items():
-                        if any(pname.lower() in proc_name.lower() for pname in process_names):
-                            if browser_name not in active_browsers:
-                                active_browsers[browser_name] = []
-                            active_browsers[browser_name].append(proc)
-                            break
-                            
-                except (psutil.NoSuchProcess, psutil.AccessDenied):
-                    continue
+            snapshot = self.process_snapshots.get_snapshot()
+            for browser_name, processes in snapshot.browsers.items():
+                if browser_name in self.browser_processes:
+                    active_browsers[browser_name] = list(processes)
                     
         except Exception as e:
             self.logger.error(f"Error detecting browsers: {e}")
             
         return active_browsers
         
-    def _update_browser_sessions(self, active_browsers: Dict[str, List[psutil.Process]]):
+    def _update_browser_sessions(self, active_browsers: Dict[str, List[ProcessInfo]]):
         """Update browser sessions based on active processes"""
         current_time = datetime.now()
 
@@ -262,7 +345,7 @@ class BrowserTracker:
                 # Create new session
                 try:
                     browser_version = self._get_browser_version(browser_name, processes[0])
-                    executable_path = processes[0].info.get('exe', 'unknown')
+                    executable_path = processes[0].exe or 'unknown'
                     
                     session = BrowserSession(
                         session_id=session_id,
@@ -306,129 +389,25 @@ class BrowserTracker:
             
     def _track_chrome_tabs_macos(self):
         """Track Chrome tabs on macOS"""
-        try:
-            # Get URLs and titles separately for better accuracy
-            url_script = '''
-            tell application "Google Chrome"
-                set tabInfo to {}
-                repeat with w in windows
-                    repeat with t in tabs of w
-                        set end of tabInfo to (URL of t)
-                    end repeat
-                end repeat
-                return tabInfo
-            end tell
-            '''
-
-            title_script = '''
-            tell application "Google Chrome"
-                set tabInfo to {}
-                repeat with w in windows
-                    repeat with t in tabs of w
-                        set end of tabInfo to (title of t)
-                    end repeat
-                end repeat
-                return tabInfo
-            end tell
-            '''
-
-            # Get URLs
-            url_result = subprocess.run(
-                ['osascript', '-e', url_script],
-                capture_output=True,
-                text=True,
-                timeout=30  # Increased from 10s to handle many tabs (minimized windows included)
-            )
+        self._track_browser_tabs_macos('Chrome')
 
-            # Get titles
-            title_result = subprocess.run(
-                ['osascript', '-e', title_script],
-                capture_output=True,
-                text=True,
-                timeout=30  # Increased from 10s to handle many tabs (minimized windows included)
-            )
-            
-            if url_result.returncode == 0 and url_result.stdout.strip():
-                urls = [url.strip() for url in url_result.stdout.split(',') if url.strip()]
-                titles = []
-                
-                if title_result.returncode == 0 and title_result.stdout.strip():
-                    titles = [title.strip() for title in title_result.stdout.split(',') if title.strip()]
-                
-                # Match URLs with titles
-                current_time = datetime.now()
-                for i, url in enumerate(urls):
-                    clean_url = url.strip().strip('"').strip("'")
-                    if clean_url.startswith('http'):
-                        title = titles[i] if i < len(titles) else self._extract_title_from_url(clean_url)
-                        title = title.strip().strip('"').strip("'")
-                        self._track_url_activity('Chrome', clean_url, title, current_time)
-                
-        except Exception as e:
-            self.logger.debug(f"Chrome tabs not accessible: {e}")
-            
     def _track_safari_tabs_macos(self):
         """Track Safari tabs on macOS"""
-        try:
-            # Get URLs and titles separately for better accuracy
-            url_script = '''
-            tell application "Safari"
-                set tabInfo to {}
-                repeat with w in windows
-                    repeat with t in tabs of w
-                        set end of tabInfo to (URL of t)
-                    end repeat
-                end repeat
-                return tabInfo
-            end tell
-            '''
-            
-            title_script = '''
-            tell application "Safari"
-                set tabInfo to {}
-                repeat with w in windows
-                    repeat with t in tabs of w
-                        set end of tabInfo to (name of t)
-                    end repeat
-                end repeat
-                return tabInfo
-            end tell
-            '''
-            
-            # Get URLs
-            url_result = subprocess.run(
-                ['osascript', '-e', url_script],
-                capture_output=True,
-                text=True,
-                timeout=30  # Increased from 10s to handle many tabs (minimized windows included)
-            )
-
-            # Get titles
-            title_result = subprocess.run(
-                ['osascript', '-e', title_script],
-                capture_output=True,
-                text=True,
-                timeout=30  # Increased from 10s to handle many tabs (minimized windows included)
-            )
-
-            if url_result.returncode == 0 and url_result.stdout.strip():
-                urls = [url.strip() for url in url_result.stdout.split(',') if url.strip()]
-                titles = []
+        self._track_browser_tabs_macos('Safari')
 
-                if title_result.returncode == 0 and title_result.stdout.strip():
-                    titles = [title.strip() for title in title_result.stdout.split(',') if title.strip()]
-
-                # Match URLs with titles
-                current_time = datetime.now()
-                for i, url in enumerate(urls):
-                    clean_url = url.strip().strip('"').strip("'")
-                    if clean_url.startswith('http'):
-                        title = titles[i] if i < len(titles) else self._extract_title_from_url(clean_url)
-                        title = title.strip().strip('"').strip("'")
-                        self._track_url_activity('Safari', clean_url, title, current_time)
+    def _track_browser_tabs_macos(self, browser_name: str):
+        """One osascript call lists every tab of the browser as url/title records"""
+        try:
+            current_time = datetime.now()
+            for tab in fetch_tabs(browser_name):
+                if tab.url.startswith('http'):
+                    title = tab.title or self.urls.title(tab.url)
+                    self._track_url_activity(browser_name, tab.url, title, current_time)
+                    if tab.active:
+                        self._active_tabs[browser_name] = title
 
         except Exception as e:
-            self.logger.debug(f"Safari tabs not accessible: {e}")
+            self.logger.debug(f"{browser_name} tabs not accessible: {e}")
             
     def _track_windows_tabs(self):
         """Track browser tabs on Windows (enhanced with history parsing)"""
@@ -437,38 +416,23 @@ class BrowserTracker:
             import win32gui
             import win32process
 
-            def enum_windows_callback(hwnd, windows):
+            # Win32 side only collects (hwnd, pid, title); classification uses the PID cache
+            def enum_windows_callback(hwnd, visible):
                 if win32gui.IsWindowVisible(hwnd):
-                    window_title = win32gui.GetWindowText(hwnd)
                     _, pid = win32process.GetWindowThreadProcessId(hwnd)
-
-                    try:
-                        process = psutil.Process(pid)
-                        proc_name = process.name().lower()
-
-                        # Check if it's a browser window
-                        for browser_name, process_names in self.browser_processes.items():
-                            if any(pname.lower() in proc_name for pname in process_names):
-                                windows.append({
-                                    'browser': browser_name,
-                                    'title': window_title,
-                                    'pid': pid
-                                })
-                                break
-
-                    except psutil.NoSuchProcess:
-                        pass
-
+                    visible.append((hwnd, pid, win32gui.GetWindowText(hwnd)))
                 return True
 
-            windows = []
-            win32gui.EnumWindows(enum_windows_callback, windows)
-            
+            visible = []
+            win32gui.EnumWindows(enum_windows_callback, visible)
+            self.browser_pids.sync()
+            windows = classify_windows(visible, self.browser_pids.browser_of, self.browser_processes)
+
             # FIX BUG #64: Log how many browser windows found for debugging
             if windows:
                 self.logger.debug(f"Found {len(windows)} browser windows")
                 for window in windows:
-                    self._extract_url_from_title(window['browser'], window['title'])
+                    self._extract_url_from_title(window.browser, window.title)
             else:
                 # No browsers detected - this might be normal or might be an issue
                 pass
@@ -493,30 +457,29 @@ class BrowserTracker:
             if self.history_parser and time_since_last_history_check >= 120:  # Every 2 minutes
                 self.logger.debug("Parsing browser history for full URLs...")
 
-                # FIX #3: Get recent activities from browser history (last 5 minutes to ensure no gaps)
-                # Parse interval = 2min, so lookback should be at least 5min for safety
-                recent_activities = self.history_parser.get_recent_activities(minutes_back=5)
+                # Only visits recorded since the last read (per-profile watermarks, no lookback window)
+                new_visits = self.history_parser.get_recent_activities()
 
-                if recent_activities:
-                    self.logger.info(f"Found {len(recent_activities)} URLs from browser history")
-
-                    # Track each activity from history
-                    for activity in recent_activities:
-                        # FIX #13: Use current_time (not visit_time) to avoid inflated durations
-                        # visit_time from history is historical, if we use it as start_time,
-                        # duration calculation will be inflated (current_time - old_visit_time)
+                if new_visits:
+                    self.logger.info(f"Found {len(new_visits)} new visits in browser history")
 
-                        # Only track if visit is recent (within last 5 minutes)
-                        visit_time = activity.get('visit_time', current_time)
-                        time_diff = (current_time - visit_time).total_seconds()
+                    # One update per (browser, url): repeated visits in the batch collapse to the newest
+                    latest = {}
+                    for visit in new_visits:
+                        # Visits recorded while the client was not running are not "current" activity
+                        visit_time = visit.get('visit_time', current_time)
+                        if (current_time - visit_time).total_seconds() > 300:
+                            continue
+                        latest[(visit['browser_name'], visit['url'])] = visit
 
-                        if time_diff <= 300:  # 5 minutes (300 seconds)
-                            self._track_url_activity(
-                                browser_name=activity['browser_name'],
-                                url=activity['url'],
-                                title=activity['title'],
-                                current_time=current_time  # FIX #13: Use NOW, not historical time
-                            )
+                    for visit in latest.values():
+                        # FIX #13: Use current_time (not visit_time) to avoid inflated durations
+                        self._track_url_activity(
+                            browser_name=visit['browser_name'],
+                            url=visit['url'],
+                            title=visit['title'],
+                            current_time=current_time
+                        )
 
                 self.last_history_check = current_time
 
@@ -524,7 +487,31 @@ class BrowserTracker:
             self.logger.error(f"Error parsing browser history: {e}")
             
     def _track_linux_tabs(self):
-        """Track browser tabs on Linux"""
+        """Track browser tabs on Linux (window titles via EWMH, wmctrl without an X connection)"""
+        if self.x11_windows is None and not self._x11_unavailable:
+            self.x11_windows = open_ewmh()
+            # No display / no python-xlib: don't retry every cycle
+            self._x11_unavailable = self.x11_windows is None
+
+        if self.x11_windows is not None:
+            try:
+                self.browser_pids.sync()
+                windows = classify_windows(self.x11_windows.windows(), self.browser_pids.browser_of,
+                                           self.browser_processes)
+                for window in windows:
+                    self._extract_url_from_title(window.browser, window.title)
+                return
+            except Exception as e:
+                # Connection lost (X server restarted, session ended): reconnect next cycle
+                self.logger.debug(f"X11 window enumeration failed: {e}")
+                self.x11_windows.close()
+                self.x11_windows = None
+                return
+
+        self._track_linux_tabs_wmctrl()
+
+    def _track_linux_tabs_wmctrl(self):
+        """Fallback: match browser names against `wmctrl -l` window titles"""
         # Linux tab tracking is complex and browser-specific
         # For now, we'll track window titles
         try:
@@ -553,69 +540,6 @@ class BrowserTracker:
         except Exception as e:
             self.logger.error(f"Error tracking Linux tabs: {e}")
             
-    def _parse_chrome_tabs_output(self, output: str):
-        """Parse Chrome tabs output from AppleScript"""
-        try:
-            # AppleScript returns URLs separated by commas
-            # Example: "https://google.com, https://github.com, https://stackoverflow.com"
-            
-            current_time = datetime.now()
-            
-            # Split by comma and clean each URL
-            urls = [url.strip() for url in output.split(',') if url.strip()]
-            
-            for url in urls:
-                # Clean up the URL (remove any quotes or extra spaces)
-                clean_url = url.strip().strip('"').strip("'")
-                
-                if clean_url.startswith('http'):
-                    # Extract title from URL or use domain as title
-                    title = self._extract_title_from_url(clean_url)
-                    self._track_url_activity('Chrome', clean_url, title, current_time)
-                
-        except Exception as e:
-            self.logger.error(f"Error parsing Chrome tabs: {e}")
-            
-    def _parse_safari_tabs_output(self, output: str):
-        """Parse Safari tabs output from AppleScript"""
-        try:
-            # AppleScript returns URLs separated by commas
-            # Example: "https://google.com, https://github.com, https://stackoverflow.com"
-            
-            current_time = datetime.now()
-            
-            # Split by comma and clean each URL
-            urls = [url.strip() for url in output.split(',') if url.strip()]
-            
-            for url in urls:
-                # Clean up the URL (remove any quotes or extra spaces)
-                clean_url = url.strip().strip('"').strip("'")
-                
-                if clean_url.startswith('http'):
-                    # Extract title from URL or use domain as title
-                    title = self._extract_title_from_url(clean_url)
-                    self._track_url_activity('Safari', clean_url, title, current_time)
-                
-        except Exception as e:
-            self.logger.error(f"Error parsing Safari tabs: {e}")
-            
-    def _extract_title_from_url(self, url: str) -> str:
-        """Extract a readable title from URL"""
-        try:
-            from urllib.parse import urlparse
-            parsed = urlparse(url)
-            domain = parsed.netloc
-            
-            # Remove www. prefix
-            if domain.startswith('www.'):
-                domain = domain[4:]
-                
-            # Capitalize first letter
-            return domain.capitalize()
-            
-        except Exception:
-            return "Unknown Page"
-            
     def _extract_url_from_title(self, browser_name: str, window_title: str):
         """Extract URL from window title where possible"""
         try:
@@ -641,36 +565,14 @@ class BrowserTracker:
     def _track_url_activity(self, browser_name: str, url: str, title: str, current_time: datetime):
         """Track URL activity"""
         try:
-            domain = self._extract_domain(url)
-            url_key = f"{browser_name}_{url}"
-            
-            if url_key not in self.url_activities:
-                # New URL activity
-                self.url_activities[url_key] = {
-                    'browser_name': browser_name,
-                    'url': url,
-                    'domain': domain,
-                    'title': title,
-                    'start_time': current_time,
-                    'last_seen': current_time,
-                    'total_time': 0,
-                    'is_active': True
-                }
-            else:
-                # Update existing activity
-                activity = self.url_activities[url_key]
-                activity['last_seen'] = current_time
-                activity['title'] = title  # Update title in case it changed
-
-                # FIX #12: Reactivate if was inactive (user came back to same URL)
-                if not activity['is_active']:
-                    activity['is_active'] = True
-                    # Reset start_time for new active session
-                    activity['start_time'] = current_time
-                    activity['total_time'] = 0  # Reset duration
-                    # FIX #14: Reset sent flag so reactivated activity is sent again
-                    activity['sent_as_inactive'] = False
-                    self.logger.debug(f"Reactivated URL activity: {url}")
+            # Same page under different tracking params / fragments is one activity
+            url, domain, _ = self.urls.parse(url)
+            category = self.categorizer.categorize(domain) if self.categorizer else None
+            _, reactivated = self.url_activities.touch(
+                browser_name, url, domain, title, int(current_time.timestamp()), category
+            )
+            if reactivated:
+                self.logger.debug(f"Reactivated URL activity: {url}")
 
         except Exception as e:
             self.logger.error(f"Error tracking URL activity: {e}")
@@ -678,30 +580,28 @@ class BrowserTracker:
     def _update_url_durations(self, current_time: datetime):
         """Update durations for active URL activities (smart pause when user inactive)"""
         try:
+            now = int(current_time.timestamp())
+
+            if self.focus_tracker:
+                # Credit each focused span (time + input) to the page that was in the foreground.
+                # Spans already stop at the pause (set_paused closes the open one), so the
+                # active time before it is credited even when the drain runs while paused.
+                for span in self.focus_tracker.drain():
+                    self.url_activities.credit_focus(span.browser, span.title, span.seconds,
+                                                     span.clicks, span.keystrokes, span.scroll_events)
+                self.url_activities.update_durations(now, wall_clock=False)
+                return
+
             # Skip duration updates if user is inactive (activity detector paused)
             if self.tracking_paused:
                 return
-            
-            for url_key, activity in self.url_activities.items():
-                if activity['is_active']:
-                    # Check if URL is still active (seen in last 30 seconds)
-                    time_since_seen = (current_time - activity['last_seen']).total_seconds()
-                    
-                    if time_since_seen > 30:  # Mark as inactive if not seen for 30 seconds
-                        activity['is_active'] = False
-                        activity['end_time'] = activity['last_seen']
-                    else:
-                        # Update total time ONLY if user is active
-                        time_since_start = (current_time - activity['start_time']).total_seconds()
-                        activity['total_time'] = int(time_since_start)
-                        
-                        # Add activity stats if activity detector is available
-                        if self.activity_detector:
-                            stats = self.activity_detector.get_activity_stats()
-                            activity['clicks'] = stats.get('mouse_clicks', 0)
-                            activity['keystrokes'] = stats.get('key_presses', 0)
-                            activity['scroll_events'] = stats.get('scroll_events', 0)
-                        
+
+            # Add activity stats if activity detector is available
+            stats = self.activity_detector.get_activity_stats() if self.activity_detector else None
+
+            # Mark as inactive if not seen for 30 seconds, otherwise update total time
+            self.url_activities.update_durations(now, stats)
+
         except Exception as e:
             self.logger.error(f"Error updating URL durations: {e}")
             
@@ -710,22 +610,9 @@ class BrowserTracker:
         try:
             # FIX #7 & #9: Cleanup activities < 5s AND older than 5 minutes
             # This matches the history parser lookback window
-            cutoff_time = current_time - timedelta(minutes=5)
-
-            # Clean URL activities that are:
-            # 1. Inactive AND too short (< 5s) - immediate cleanup for noise
-            # 2. Inactive AND older than 5 min - cleanup after send window
-            self.url_activities = {
-                key: activity
-                for key, activity in self.url_activities.items()
-                if not (
-                    # Remove if inactive AND (too short OR too old)
-                    not activity['is_active'] and (
-                        activity['total_time'] < 5 or  # Too short (noise)
-                        (current_time - activity.get('last_seen', activity['start_time'])).total_seconds() > 300  # Too old (>5min)
-                    )
-                )
-            }
+            # Drop URL activities that are inactive AND too short (< 5s, noise)
+            # or inactive for more than 5 minutes (after the send window)
+            self.url_activities.expire(int(current_time.timestamp()))
             
             # Clean old browser sessions that have ended
             self.active_sessions = {
@@ -738,7 +625,8 @@ class BrowserTracker:
             if hasattr(self, '_last_cleanup_log'):
                 time_since_log = (current_time - self._last_cleanup_log).total_seconds()
                 if time_since_log > 3600:  # Log every hour
-                    self.logger.info(f"Memory cleanup: {len(self.url_activities)} URL activities, {len(self.active_sessions)} sessions in memory")
+                    self.logger.info(f"Memory cleanup: {len(self.url_activities)} URL activities, {len(self.active_sessions)} sessions in memory, "
+                                     f"URL cache hit rate {self.urls.get_statistics()['hit_rate']:.0%}")
                     self._last_cleanup_log = current_time
             else:
                 self._last_cleanup_log = current_time
@@ -747,11 +635,17 @@ class BrowserTracker:
             self.logger.error(f"Error cleaning up old activities: {e}")
             
     def _send_tracking_data(self):
-        """Send tracking data to server"""
+        """
+        Send changes since the last successful send: sessions whose payload
+        changed, new URL activities in full, and {id, duration, clicks,
+        keystrokes} deltas for ones the server already has. With roll-up
+        enabled, activities not kept raw go into per-domain time buckets,
+        which are sent as url_activities rows of their own.
+        """
         try:
-            # Prepare browser sessions data
+            # Prepare browser sessions data (only new or changed sessions)
             sessions_data = []
-            for session in self.active_sessions.values():
+            for session in self._get_active_sessions_copy().values():
                 session_data = {
                     'session_id': session.session_id,
                     'browser_name': session.browser_name,
@@ -768,41 +662,59 @@ class BrowserTracker:
                     session_data['total_duration'] = session.total_time
                     session_data['is_active'] = False
 
-                sessions_data.append(session_data)
-                
+                if self._sent_sessions.get(session.session_id) != session_data:
+                    sessions_data.append(session_data)
+
             # Prepare URL activities data
-            # FIX #14: Only send activities that are active OR just became inactive (not sent yet)
+            # FIX #14: Only activities that changed since they were last sent
+            changed = self.url_activities.changed()
+            sent_ids = [activity.activity_id for activity in changed]
             url_data = []
-            for url_key, activity in self.url_activities.items():
-                # Send if:
-                # 1. Active (ongoing activity, need duration updates)
-                # 2. Inactive BUT not sent yet (final update with end_time)
-                should_send = activity['is_active'] or not activity.get('sent_as_inactive', False)
-
-                if should_send:
+            url_updates = []
+            now = int(time.time())
+            for activity in changed:
+                if self.rollup and not self.rollup.keep_raw(activity):
+                    # Counted into its domain's time bucket instead of its own row
+                    self.rollup.absorb(activity, now)
+                    continue
+                if not activity.sent_full:
                     url_activity = {
-                        'browser_name': activity['browser_name'],
-                        'url': activity['url'],
-                        'domain': activity['domain'],
-                        'title': activity['title'],
-                        'start_time': activity['start_time'].isoformat(),
-                        'duration': activity['total_time'],
-                        'is_active': activity['is_active'],
+                        'id': activity.activity_id,
+                        'browser_name': activity.browser_name,
+                        'url': activity.url,
+                        'domain': activity.domain,
+                        'title': activity.title,
+                        'start_time': datetime.fromtimestamp(activity.start_time).isoformat(),
+                        'duration': activity.total_time,
+                        'is_active': activity.is_active,
                         # FIX #18: Send activity engagement stats for KPI metrics
-                        'clicks': activity.get('clicks', 0),
-                        'keystrokes': activity.get('keystrokes', 0),
-                        'scroll_depth': activity.get('scroll_events', 0)  # Note: scroll_events→scroll_depth
+                        'clicks': activity.clicks,
+                        'keystrokes': activity.keystrokes,
+                        'scroll_depth': activity.scroll_events  # Note: scroll_events→scroll_depth
                     }
+                    if activity.category:
+                        url_activity['category'] = activity.category
+                    url_data.append(url_activity)
+                else:
+                    url_activity = {
+                        'id': activity.activity_id,
+                        'duration': activity.total_time,
+                        'clicks': activity.clicks,
+                        'keystrokes': activity.keystrokes
+                    }
+                    url_updates.append(url_activity)
 
-                    if not activity['is_active'] and 'end_time' in activity:
-                        url_activity['end_time'] = activity['end_time'].isoformat()
-                        # Mark as sent so we don't send again
-                        activity['sent_as_inactive'] = True
+                # Final update of a finished activity
+                if not activity.is_active and activity.end_time is not None:
+                    url_activity['is_active'] = False
+                    url_activity['end_time'] = datetime.fromtimestamp(activity.end_time).isoformat()
+                    url_activity['scroll_depth'] = activity.scroll_events
 
-                    url_data.append(url_activity)
-                    
-            # Send to server
-            if sessions_data or url_data:
+            rollup_rows = self.rollup.pending_rows(now) if self.rollup else []
+            url_data.extend(rollup_rows)
+
+            # Send to server (nothing at all when nothing changed)
+            if sessions_data or url_data or url_updates:
                 # Import Config using absolute import
                 import sys
                 import os
@@ -819,6 +731,7 @@ class BrowserTracker:
                     'client_id': client_id,
                     'browser_sessions': sessions_data,
                     'url_activities': url_data,
+                    'url_activity_updates': url_updates,
                     'timestamp': datetime.now().isoformat()
                 }
 
@@ -826,9 +739,15 @@ class BrowserTracker:
                 response = self.api_client.send_browser_tracking(tracking_data)
 
                 if response and isinstance(response, dict):
-                    if response.get('success') is False:
+                    if response.get('queued'):
+                        # Outbox delivers it in order; later deltas queue behind the full records
+                        self._mark_tracking_sent(sessions_data, changed, sent_ids, rollup_rows)
+                        self.logger.debug("Browser tracking queued for replay")
+                    elif response.get('success') is False:
                         self.logger.warning(f"Browser tracking send failed: {response.get('message', 'Unknown error')}")
                     elif response.get('status') == 'success':
+                        self._mark_tracking_sent(sessions_data, changed, sent_ids, rollup_rows)
+                        self.url_activities.mark_unknown(response.get('unknown_url_activities') or [])
                         self.logger.debug(f"Browser tracking sent: {response.get('processed', {})}")
                 else:
                     self.logger.warning("Browser tracking: No valid response from server")
@@ -836,48 +755,27 @@ class BrowserTracker:
         except Exception as e:
             self.logger.error(f"Error sending tracking data: {e}")
             
-    def _get_browser_version(self, browser_name: str, process: psutil.Process) -> str:
-        """Get browser version"""
+    def _mark_tracking_sent(self, sessions_data: List[Dict], activities, activity_ids: List[str],
+                            rollup_rows: Optional[List[Dict]] = None):
+        """Remember what the server has so the next cycle only sends changes"""
+        for session_data in sessions_data:
+            self._sent_sessions[session_data['session_id']] = session_data
+        live_sessions = self._get_active_sessions_copy()
+        for session_id in list(self._sent_sessions):
+            if session_id not in live_sessions:
+                del self._sent_sessions[session_id]
+        self.url_activities.mark_sent(activities, activity_ids)
+        if self.rollup:
+            self.rollup.mark_sent(rollup_rows or [], activity_ids)
+
+    def _get_browser_version(self, browser_name: str, process: ProcessInfo) -> str:
+        """Get browser version (cached per executable, re-read only after it changes)"""
         try:
-            if self.system == "Darwin":  # macOS
-                if browser_name == "Chrome":
-                    result = subprocess.run(
-                        ['/Applications/Google Chrome.app/Contents/MacOS/Google Chrome', '--version'],
-                        capture_output=True,
-                        text=True,
-                        timeout=5
-                    )
-                    return result.stdout.strip()
-                elif browser_name == "Safari":
-                    # Safari version detection on macOS
-                    return "Safari (macOS)"
-                    
-            elif self.system == "Windows":
-                # Windows version detection
-                if hasattr(process, 'exe'):
-                    try:
-                        import win32api
-                        version_info = win32api.GetFileVersionInfo(process.exe(), "\\")
-                        version = f"{version_info['FileVersionLS'] >> 16}.{version_info['FileVersionLS'] & 0xFFFF}"
-                        return version
-                    except:
-                        pass
-                        
-            return "Unknown"
-            
+            return self.browser_metadata.get(browser_name, process.exe).display_version()
         except Exception as e:
             self.logger.debug(f"Could not get browser version: {e}")
             return "Unknown"
-            
-    def _extract_domain(self, url: str) -> str:
-        """Extract domain from URL"""
-        try:
-            from urllib.parse import urlparse
-            parsed = urlparse(url)
-            return parsed.netloc or 'unknown'
-        except:
-            return 'unknown'
-            
+
     def _end_browser_session(self, session: BrowserSession):
         """End a browser session"""
         try:
@@ -907,9 +805,8 @@ class BrowserTracker:
                 }
                 summary['browser_sessions'].append(session_info)
                 
-            # Count active URLs
-            active_urls = sum(1 for activity in self.url_activities.values() if activity['is_active'])
-            summary['active_urls'] = active_urls
+            # Active URLs
+            summary['active_urls'] = self.url_activities.active_count
             
             return summary
             
@@ -0,0 +1,216 @@
+"""
+Domain Categories
+Classifies domains against rule sets of the form {domain: category}. Rules
+live in a suffix trie keyed on reversed labels, so a lookup walks at most
+one node per label of the queried domain and 'm.youtube.com' matches a
+'youtube.com' rule without scanning the rule list; the most specific rule
+wins. Recent results are memoised in a bounded LRU.
+
+Rules can be replaced at runtime (load_rules / refresh from the server); the
+new trie is built off to the side and swapped in together with a fresh cache,
+so lookups never see a half-built rule set. The last rules received are kept
+on disk so the agent starts with them when the server is unreachable.
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+from functools import lru_cache
+from typing import Dict, Iterable, List, Mapping, Optional
+
+CATEGORY_WORK = 'work'
+CATEGORY_SOCIAL = 'social_media'
+CATEGORY_SUSPICIOUS = 'suspicious'
+
+# Built-in rules until the server's rule set has been fetched
+DEFAULT_RULES = {
+    'youtube.com': CATEGORY_SOCIAL, 'youtu.be': CATEGORY_SOCIAL,
+    'instagram.com': CATEGORY_SOCIAL, 'tiktok.com': CATEGORY_SOCIAL,
+    'facebook.com': CATEGORY_SOCIAL, 'fb.com': CATEGORY_SOCIAL,
+    'twitter.com': CATEGORY_SOCIAL, 'x.com': CATEGORY_SOCIAL,
+}
+
+_LEAF = ''  # key of a node's own value; never a real label
+
+
+def normalize_domain(domain: str) -> str:
+    """Lowercase host without port, trailing dot or leading www."""
+    domain = (domain or '').strip().lower()
+    if ':' in domain and not domain.startswith('['):
+        domain = domain.split(':', 1)[0]
+    domain = domain.strip('.')
+    if domain.startswith('www.'):
+        domain = domain[4:]
+    return domain
+
+
+class DomainTrie:
+    """Domain suffix -> value, stored as nested dicts from the TLD down"""
+
+    __slots__ = ('_root', 'size')
+
+    def __init__(self, rules: Optional[Mapping[str, object]] = None):
+        self._root: Dict[str, dict] = {}
+        self.size = 0
+        for domain, value in (rules or {}).items():
+            self.add(domain, value)
+
+    @classmethod
+    def of(cls, domains: Iterable[str], value=True) -> 'DomainTrie':
+        """Trie giving the same value for every domain (a membership set)"""
+        return cls({domain: value for domain in domains})
+
+    def add(self, domain: str, value):
+        labels = normalize_domain(domain).split('.')
+        if not labels[-1]:
+            return
+        node = self._root
+        for label in reversed(labels):
+            node = node.setdefault(label, {})
+        if _LEAF not in node:
+            self.size += 1
+        node[_LEAF] = value
+
+    def lookup(self, domain: str):
+        """Value of the longest rule domain is equal to or a subdomain of, or None"""
+        node = self._root
+        found = None
+        for label in reversed(domain.split('.')):
+            node = node.get(label)
+            if node is None:
+                break
+            found = node.get(_LEAF, found)
+        return found
+
+    def __contains__(self, domain: str) -> bool:
+        return self.lookup(normalize_domain(domain)) is not None
+
+    def __len__(self) -> int:
+        return self.size
+
+
+class DomainCategorizer:
+    """
+    domain -> category (None when no rule matches), memoised per rule set.
+
+    version identifies the rule set the server sent; refresh() passes it back
+    so the server only answers with rules when they changed.
+    """
+
+    def __init__(self, rules: Optional[Mapping[str, str]] = None, version: Optional[str] = None,
+                 cache_size: int = 8192, state_path: Optional[str] = None, logger=None):
+        self.cache_size = cache_size
+        self.state_path = state_path
+        self.logger = logger or logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._last_refresh = 0.0
+        self.version = None
+        self._install(DEFAULT_RULES if rules is None else rules, version)
+        if rules is None:
+            self._load_state()
+
+    def _install(self, rules: Mapping[str, str], version: Optional[str]):
+        trie = DomainTrie(rules)
+        cached = lru_cache(maxsize=self.cache_size)(lambda domain: trie.lookup(normalize_domain(domain)))
+        # One assignment: concurrent lookups use either the old or the new rule set
+        self._rules = (trie, cached)
+        self.version = version
+
+    def categorize(self, domain: str) -> Optional[str]:
+        """Category of the most specific rule matching domain, or None"""
+        return self._rules[1](domain or '')
+
+    def categorize_many(self, domains: Iterable[str]) -> List[Optional[str]]:
+        """categorize() for a batch; cache hits stay in C, ~100 ns per domain"""
+        return list(map(self._rules[1], domains))
+
+    def in_category(self, domain: str, category: str) -> bool:
+        return self.categorize(domain) == category
+
+    @property
+    def rule_count(self) -> int:
+        return len(self._rules[0])
+
+    def get_cache_statistics(self) -> Dict:
+        info = self._rules[1].cache_info()
+        lookups = info.hits + info.misses
+        return {
+            'hits': info.hits,
+            'misses': info.misses,
+            'hit_rate': info.hits / lookups if lookups else 0.0,
+            'cached': info.currsize,
+            'rules': self.rule_count,
+            'version': self.version,
+        }
+
+    def load_rules(self, rules: Mapping[str, str], version: Optional[str] = None, persist: bool = True):
+        """Replace the whole rule set"""
+        clean = {normalize_domain(domain): str(category) for domain, category in rules.items()
+                 if domain and category}
+        with self._lock:
+            self._install(clean, version)
+        self.logger.info(f"Loaded {len(clean)} domain category rules (version {version})")
+        if persist:
+            self._save_state(clean, version)
+
+    def refresh(self, api_client, min_interval: float = 0) -> bool:
+        """
+        Pull the server's rule set if it changed; True if new rules were loaded.
+        Skipped when the previous refresh was under min_interval seconds ago.
+        """
+        now = time.time()
+        if now - self._last_refresh < min_interval:
+            return False
+        self._last_refresh = now
+
+        try:
+            response = api_client.get_category_rules(self.version)
+        except Exception as e:
+            self.logger.debug(f"Category rules not refreshed: {e}")
+            return False
+        if not isinstance(response, dict) or not response.get('changed', True):
+            return False
+        rules = response.get('rules')
+        if not isinstance(rules, dict):
+            return False
+
+        self.load_rules(rules, response.get('version'))
+        return True
+
+    def _load_state(self):
+        if not self.state_path or not os.path.exists(self.state_path):
+            return
+        try:
+            with open(self.state_path, 'r') as f:
+                data = json.load(f)
+            self.load_rules(data['rules'], data.get('version'), persist=False)
+        except Exception as e:
+            self.logger.warning(f"Ignoring unreadable category rules: {e}")
+
+    def _save_state(self, rules: Dict[str, str], version: Optional[str]):
+        if not self.state_path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.state_path), exist_ok=True)
+            tmp_path = f"{self.state_path}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump({'version': version, 'rules': rules}, f)
+            os.replace(tmp_path, self.state_path)
+        except Exception as e:
+            self.logger.warning(f"Failed to save category rules: {e}")
+
+
+_shared_categorizer: Optional[DomainCategorizer] = None
+_shared_categorizer_lock = threading.Lock()
+
+
+def get_domain_categorizer(state_path: Optional[str] = None, logger=None) -> DomainCategorizer:
+    """Get the process-wide shared categorizer (state_path applies on first use)"""
+    global _shared_categorizer
+    if _shared_categorizer is None:
+        with _shared_categorizer_lock:
+            if _shared_categorizer is None:
+                _shared_categorizer = DomainCategorizer(state_path=state_path, logger=logger)
+    return _shared_categorizer
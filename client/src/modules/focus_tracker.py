@@ -0,0 +1,255 @@
+"""
+Focus Tracker Module
+Follows the foreground window and keeps an interval log of focused browser
+spans (browser, window title, start, end, input counts), so time and input
+are credited only to the page the user actually had in front of them.
+
+On Linux with an X display the tracker sleeps on PropertyNotify events for
+_NET_ACTIVE_WINDOW and the focused window's title, waking only on changes.
+Windows (win32gui) and macOS (AppKit) poll the foreground window every
+poll_interval seconds instead.
+"""
+
+import time
+import logging
+import platform
+import threading
+from collections import deque
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .x11_windows import open_ewmh
+
+# ActivityDetector counters credited to the focused span
+INPUT_COUNTERS = ('mouse_clicks', 'key_presses', 'scroll_events')
+
+
+class FocusSpan:
+    """One interval with a browser window in the foreground (epoch seconds)"""
+
+    __slots__ = ('browser', 'title', 'started', 'ended', 'clicks', 'keystrokes', 'scroll_events')
+
+    def __init__(self, browser: str, title: str, started: float):
+        self.browser = browser
+        self.title = title
+        self.started = started
+        self.ended: Optional[float] = None
+        self.clicks = 0
+        self.keystrokes = 0
+        self.scroll_events = 0
+
+    @property
+    def seconds(self) -> float:
+        return max(0.0, (self.ended or time.time()) - self.started)
+
+
+class FocusLog:
+    """
+    Interval log of focused spans. switch() closes the open span and opens the
+    next; drain() hands back closed spans plus the open span's elapsed part,
+    which is split off so every second is reported exactly once.
+    """
+
+    def __init__(self, max_spans: int = 2000):
+        self._lock = threading.Lock()
+        self._closed: deque = deque(maxlen=max_spans)
+        self._open: Optional[FocusSpan] = None
+        self._counters: Optional[Tuple[int, int, int]] = None
+
+    def _close(self, now: float, counters):
+        span = self._open
+        if span is None:
+            return
+        span.ended = now
+        if counters is not None and self._counters is not None:
+            span.clicks, span.keystrokes, span.scroll_events = (
+                max(0, current - previous) for current, previous in zip(counters, self._counters)
+            )
+        if span.ended > span.started:
+            self._closed.append(span)
+        self._open = None
+
+    def switch(self, key: Optional[Tuple[str, str]], now: float, counters=None):
+        """Focus moved to key ((browser, title), or None for a non-browser window)"""
+        with self._lock:
+            self._close(now, counters)
+            if key is not None:
+                self._open = FocusSpan(key[0], key[1], now)
+            self._counters = counters
+
+    @property
+    def current(self) -> Optional[Tuple[str, str]]:
+        span = self._open
+        return (span.browser, span.title) if span else None
+
+    def drain(self, now: float, counters=None) -> List[FocusSpan]:
+        """All focus time since the previous drain, oldest first"""
+        with self._lock:
+            key = self.current
+            self._close(now, counters)
+            if key is not None:
+                self._open = FocusSpan(key[0], key[1], now)
+            self._counters = counters
+            spans = list(self._closed)
+            self._closed.clear()
+            return spans
+
+
+class _X11Source:
+    """Event-driven: wakes on focus / title PropertyNotify"""
+
+    def __init__(self, ewmh):
+        self.ewmh = ewmh
+
+    def foreground(self) -> Optional[Tuple[int, str]]:
+        return self.ewmh.foreground()
+
+    def wait(self, timeout: float):
+        self.ewmh.wait_for_focus_change(timeout)
+
+    def close(self):
+        self.ewmh.close()
+
+
+class _PollingSource:
+    """Polls a foreground() callable every poll_interval seconds"""
+
+    def __init__(self, foreground: Callable[[], Optional[Tuple[int, str]]], poll_interval: float,
+                 stop_event: threading.Event):
+        self.foreground = foreground
+        self.poll_interval = poll_interval
+        self._stop_event = stop_event
+
+    def wait(self, timeout: float):
+        self._stop_event.wait(min(timeout, self.poll_interval))
+
+    def close(self):
+        pass
+
+
+def _windows_foreground() -> Optional[Tuple[int, str]]:
+    import win32gui
+    import win32process
+
+    hwnd = win32gui.GetForegroundWindow()
+    if not hwnd:
+        return None
+    _, pid = win32process.GetWindowThreadProcessId(hwnd)
+    return pid, win32gui.GetWindowText(hwnd)
+
+
+def _macos_foreground() -> Optional[Tuple[int, str]]:
+    # Window titles need accessibility permission; the app is enough to pick the browser,
+    # and FocusTracker.title_of supplies that browser's active tab
+    from AppKit import NSWorkspace
+
+    app = NSWorkspace.sharedWorkspace().frontmostApplication()
+    if app is None:
+        return None
+    return int(app.processIdentifier()), ''
+
+
+class FocusTracker:
+    """
+    Foreground-window follower feeding a FocusLog.
+
+    browser_of maps a pid to a browser name (BrowserPidCache.browser_of);
+    title_of gives a browser's current page title where the foreground
+    window has none (macOS), so a span is tagged with its page when it
+    opens; counters returns the ActivityDetector stats dict (or None) so
+    input counts are split at focus changes.
+    """
+
+    def __init__(self, logger, browser_of: Callable[[int], Optional[str]],
+                 counters: Optional[Callable[[], Optional[Dict]]] = None,
+                 poll_interval: float = 0.5,
+                 title_of: Optional[Callable[[str], str]] = None):
+        self.logger = logger or logging.getLogger(__name__)
+        self.browser_of = browser_of
+        self.title_of = title_of
+        self.counters = counters
+        self.poll_interval = poll_interval
+        self.log = FocusLog()
+
+        self._stop_event = threading.Event()
+        self._paused = False
+        self._thread = None
+        self.source = self._create_source()
+
+    @property
+    def available(self) -> bool:
+        return self.source is not None
+
+    def _create_source(self):
+        system = platform.system()
+        try:
+            if system == 'Linux':
+                ewmh = open_ewmh()
+                return _X11Source(ewmh) if ewmh else None
+            if system == 'Windows':
+                import win32gui  # noqa: F401 - availability check
+                return _PollingSource(_windows_foreground, self.poll_interval, self._stop_event)
+            if system == 'Darwin':
+                from AppKit import NSWorkspace  # noqa: F401 - availability check
+                return _PollingSource(_macos_foreground, self.poll_interval, self._stop_event)
+        except Exception as e:
+            self.logger.debug(f"Focus tracking unavailable: {e}")
+        return None
+
+    def start(self):
+        if not self.available or self._thread is not None:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name='focus-tracker', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=3)
+            self._thread = None
+        if self.source:
+            self.source.close()
+
+    def set_paused(self, paused: bool):
+        """While paused (user idle) no span is open, so idle time is not credited"""
+        self._paused = paused
+        if paused:
+            self.log.switch(None, time.time(), self._read_counters())
+
+    def drain(self) -> List[FocusSpan]:
+        return self.log.drain(time.time(), self._read_counters())
+
+    def _read_counters(self) -> Optional[Tuple[int, int, int]]:
+        if self.counters is None:
+            return None
+        try:
+            stats = self.counters()
+        except Exception:
+            return None
+        if not stats:
+            return None
+        return tuple(int(stats.get(name, 0)) for name in INPUT_COUNTERS)
+
+    def _focused_key(self) -> Optional[Tuple[str, str]]:
+        foreground = self.source.foreground()
+        if not foreground:
+            return None
+        pid, title = foreground
+        browser = self.browser_of(pid)
+        if not browser:
+            return None
+        if not title and self.title_of:
+            title = self.title_of(browser) or ''
+        return browser, title
+
+    def _run(self):
+        # Short wait timeout bounds how late a missed event is noticed and lets stop() return promptly
+        while not self._stop_event.is_set():
+            try:
+                key = None if self._paused else self._focused_key()
+                if key != self.log.current:
+                    self.log.switch(key, time.time(), self._read_counters())
+                self.source.wait(1.0)
+            except Exception as e:
+                self.logger.debug(f"Focus tracking error: {e}")
+                self._stop_event.wait(self.poll_interval * 4)
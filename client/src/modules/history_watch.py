@@ -0,0 +1,163 @@
+"""
+History Change Detection
+Tells the history parser whether a browser database was written since it was
+last parsed, so idle profiles cost nothing. Uses inotify on Linux (via libc,
+no extra dependency) and falls back to comparing size/mtime of the database
+and its -wal / -journal files everywhere else.
+"""
+
+import os
+import struct
+import logging
+import threading
+import platform
+from typing import Dict, Optional, Set, Tuple
+
+# inotify event mask: anything that can change database content
+_IN_MODIFY = 0x00000002
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_WATCH_MASK = _IN_MODIFY | _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+# Kernel event queue overflowed (wd == -1): events were lost, any file may have changed
+_IN_Q_OVERFLOW = 0x00004000
+_EVENT_HEADER = struct.Struct('iIII')  # wd, mask, cookie, name length
+
+# Side files SQLite writes next to the database
+SIDE_SUFFIXES = ('-wal', '-journal')
+
+
+def file_state(db_path: str) -> Optional[Tuple]:
+    """(size, mtime_ns) of the database and each side file; None if the database is missing"""
+    try:
+        st = os.stat(db_path)
+    except OSError:
+        return None
+
+    state = [st.st_size, st.st_mtime_ns]
+    for suffix in SIDE_SUFFIXES:
+        try:
+            side = os.stat(db_path + suffix)
+            state.extend((side.st_size, side.st_mtime_ns))
+        except OSError:
+            state.extend((None, None))
+    return tuple(state)
+
+
+class _Inotify:
+    """Minimal non-blocking inotify wrapper on directories (Linux only)"""
+
+    def __init__(self):
+        import ctypes
+        import ctypes.util
+
+        self._libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self.fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._dirs: Dict[int, str] = {}
+
+    def watch(self, directory: str) -> bool:
+        if directory in self._dirs.values():
+            return True
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(directory), _WATCH_MASK)
+        if wd < 0:
+            return False
+        self._dirs[wd] = directory
+        return True
+
+    def changed_files(self) -> Tuple[Set[str], bool]:
+        """Drain pending events; returns (full paths of files touched, queue overflowed)"""
+        paths = set()
+        overflowed = False
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset + _EVENT_HEADER.size <= len(data):
+                wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+                offset += _EVENT_HEADER.size
+                name = data[offset:offset + length].rstrip(b'\0')
+                offset += length
+                if mask & _IN_Q_OVERFLOW:
+                    overflowed = True
+                    continue
+                directory = self._dirs.get(wd)
+                if directory and name:
+                    paths.add(os.path.join(directory, os.fsdecode(name)))
+        return paths, overflowed
+
+
+class HistoryChangeDetector:
+    """
+    Per-database change tracking.
+
+    check() returns a state token when the database changed since the last
+    commit() (or has never been committed) and None when it is unchanged;
+    the caller commits the token only after a successful parse so a failed
+    parse is retried next cycle.
+    """
+
+    def __init__(self, logger=None, use_inotify: bool = True):
+        self.logger = logger or logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._committed: Dict[str, Tuple] = {}
+        self._returned: Dict[str, Tuple] = {}
+        self._dirty: Set[str] = set()
+        self._watched: Set[str] = set()
+        self.skipped = 0
+
+        self._inotify = None
+        if use_inotify and platform.system() == 'Linux':
+            try:
+                self._inotify = _Inotify()
+            except Exception as e:
+                self.logger.debug(f"inotify unavailable, polling history files: {e}")
+
+    @property
+    def using_inotify(self) -> bool:
+        return self._inotify is not None
+
+    def _collect_events(self):
+        paths, overflowed = self._inotify.changed_files()
+        if overflowed:
+            # Lost events: every watched database may have changed - let file_state() decide
+            self.logger.debug("inotify queue overflowed, re-checking all history databases")
+            self._dirty.update(self._watched)
+            return
+        for path in paths:
+            for db_path in self._watched:
+                if path == db_path or any(path == db_path + suffix for suffix in SIDE_SUFFIXES):
+                    self._dirty.add(db_path)
+
+    def check(self, db_path: str) -> Optional[Tuple]:
+        """State token if db_path needs parsing, else None"""
+        with self._lock:
+            if self._inotify:
+                if db_path not in self._watched and self._inotify.watch(os.path.dirname(db_path)):
+                    self._watched.add(db_path)
+                self._collect_events()
+
+                committed = self._committed.get(db_path)
+                quiet = db_path in self._watched and db_path not in self._dirty
+                if quiet and committed is not None and committed == self._returned.get(db_path):
+                    self.skipped += 1
+                    return None
+                self._dirty.discard(db_path)
+
+            state = file_state(db_path)
+            if state is None or state == self._committed.get(db_path):
+                self._returned[db_path] = self._committed.get(db_path)
+                self.skipped += 1
+                return None
+
+            self._returned[db_path] = state
+            return state
+
+    def commit(self, db_path: str, state: Tuple):
+        """Record that db_path was parsed successfully at this state"""
+        with self._lock:
+            self._committed[db_path] = state
@@ -0,0 +1,106 @@
+"""
+macOS Tab Enumeration
+One JavaScript for Automation (JXA) call per browser returns every tab as a
+JSON record (url, title, window index, active flag), so URLs and titles stay
+paired and commas in either cannot break parsing. Only fetch_tabs() touches
+osascript; parse_tab_records() is plain Python and can be exercised with
+captured output on any platform.
+"""
+
+import json
+import logging
+import subprocess
+from dataclasses import dataclass
+from typing import List
+
+# Scriptable browsers: app name, tab title property, how to read the active tab of each window
+MACOS_BROWSERS = {
+    'Chrome': ('Google Chrome', 'title', 'app.windows.activeTabIndex()'),
+    'Safari': ('Safari', 'name', 'app.windows.currentTab.index()'),
+}
+
+# Property reads on whole collections (app.windows.tabs.url()) are a single Apple
+# event each, instead of one round trip per tab. Windows are listed front to back.
+_JXA_TEMPLATE = '''
+(function () {
+    var app = Application(%(app)s);
+    if (!app.running()) { return "[]"; }
+    var urls = app.windows.tabs.url();
+    var titles = app.windows.tabs.%(title)s();
+    var active = [];
+    try { active = %(active)s; } catch (e) {}
+    var records = [];
+    for (var w = 0; w < urls.length; w++) {
+        var row = urls[w] || [];
+        for (var t = 0; t < row.length; t++) {
+            records.push({
+                url: row[t] || "",
+                title: (titles[w] && titles[w][t]) || "",
+                window: w,
+                active: w === 0 && active[w] === t + 1
+            });
+        }
+    }
+    return JSON.stringify(records);
+})();
+'''
+
+
+@dataclass
+class TabRecord:
+    """One open tab"""
+    url: str
+    title: str
+    window_index: int  # 0 = frontmost window
+    active: bool  # selected tab of the frontmost window
+
+
+def build_tab_script(browser_name: str) -> str:
+    """JXA source listing all tabs of browser_name as JSON"""
+    app, title_property, active_expression = MACOS_BROWSERS[browser_name]
+    return _JXA_TEMPLATE % {'app': json.dumps(app), 'title': title_property, 'active': active_expression}
+
+
+def parse_tab_records(output: str) -> List[TabRecord]:
+    """Parse the script's JSON output; malformed entries are skipped"""
+    output = (output or '').strip()
+    if not output:
+        return []
+
+    try:
+        records = json.loads(output)
+    except ValueError:
+        logging.debug(f"Unparseable tab list from osascript: {output[:200]}")
+        return []
+    if not isinstance(records, list):
+        return []
+
+    tabs = []
+    for record in records:
+        if not isinstance(record, dict) or not isinstance(record.get('url'), str):
+            continue
+        try:
+            window_index = int(record.get('window', 0))
+        except (TypeError, ValueError):
+            window_index = 0
+        tabs.append(TabRecord(
+            url=record['url'].strip(),
+            title=str(record.get('title') or '').strip(),
+            window_index=window_index,
+            active=bool(record.get('active'))
+        ))
+    return tabs
+
+
+def fetch_tabs(browser_name: str, timeout: float = 30) -> List[TabRecord]:
+    """All tabs of a running browser (empty if it is not running or not scriptable)"""
+    result = subprocess.run(
+        ['osascript', '-l', 'JavaScript', '-e', build_tab_script(browser_name)],
+        capture_output=True,
+        text=True,
+        timeout=timeout  # Many tabs (minimized windows included) can take a while
+    )
+    if result.returncode != 0:
+        logging.debug(f"{browser_name} tab script failed: {result.stderr.strip()}")
+        return []
+    return parse_tab_records(result.stdout)
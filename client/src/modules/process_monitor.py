@@ -12,6 +12,7 @@ from collections import defaultdict
 # Add src to path for imports
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 from core.config import Config
+from .process_snapshot import MONITORED_APP_NAMES, get_process_snapshot_service, is_monitored_app
 
 class ProcessMonitor:
     def __init__(self, api_client):
@@ -19,32 +20,13 @@ class ProcessMonitor:
         self.is_running = False
         self.active_processes = {}
         self.check_interval = 10  # seconds
+        self._last_snapshot_version = None  # skip start/end diff when process set unchanged
         
         # Applications we want to monitor
-        self.monitored_apps = [
-            # Browsers
-            'chrome.exe', 'firefox.exe', 'msedge.exe', 'opera.exe', 'safari.exe',
-            'Chrome', 'Firefox', 'Safari', 'Opera', 'Microsoft Edge',
-            
-            # Office applications
-            'winword.exe', 'excel.exe', 'powerpnt.exe', 'outlook.exe',
-            'Microsoft Word', 'Microsoft Excel', 'Microsoft PowerPoint', 'Microsoft Outlook',
-            
-            # Development tools
-            'code.exe', 'devenv.exe', 'notepad++.exe', 'sublime_text.exe',
-            'Visual Studio Code', 'Visual Studio', 'Sublime Text', 'PyCharm',
-            
-            # Media
-            'vlc.exe', 'wmplayer.exe', 'spotify.exe',
-            'VLC', 'Windows Media Player', 'Spotify',
-            
-            # Communication
-            'discord.exe', 'slack.exe', 'teams.exe', 'zoom.exe',
-            'Discord', 'Slack', 'Microsoft Teams', 'Zoom',
-            
-            # Other
-            'notepad.exe', 'calc.exe', 'explorer.exe'
-        ]
+        self.monitored_apps = list(MONITORED_APP_NAMES)
+
+        # Shared process snapshot (one psutil scan per tick for all monitors)
+        self.process_snapshots = get_process_snapshot_service()
         
     def start_monitoring(self):
         """Start process monitoring"""
@@ -62,7 +44,14 @@ class ProcessMonitor:
     def monitor_processes(self):
         """Monitor running processes"""
         current_time = datetime.now()
-        current_processes = self.get_monitored_processes()
+        snapshot = self.process_snapshots.get_snapshot()
+        current_processes = self.get_monitored_processes(snapshot)
+
+        # Process set unchanged since last cycle - only refresh stats
+        if snapshot.version == self._last_snapshot_version:
+            self.update_process_stats(current_processes, current_time)
+            return
+        self._last_snapshot_version = snapshot.version
         
         # Check for new processes
         for proc_info in current_processes:
@@ -98,37 +87,27 @@ class ProcessMonitor:
         # Update process statistics
         self.update_process_stats(current_processes, current_time)
         
-    def get_monitored_processes(self):
+    def get_monitored_processes(self, snapshot=None):
         """Get all monitored running processes"""
-        processes = []
-        
         try:
-            for proc in psutil.process_iter(['pid', 'name', 'cpu_times', 'memory_info', 'create_time']):
-                try:
-                    proc_info = proc.info
-                    proc_name = proc_info['name']
-                    
-                    if self.should_monitor_process(proc_name):
-                        processes.append({
-                            'pid': proc_info['pid'],
-                            'name': proc_name,
-                            'cpu_times': proc_info.get('cpu_times'),
-                            'memory_info': proc_info.get('memory_info'),
-                            'create_time': proc_info.get('create_time')
-                        })
-                        
-                except (psutil.NoSuchProcess, psutil.AccessDenied):
-                    continue
-                    
+            snapshot = snapshot or self.process_snapshots.get_snapshot()
+            return [
+                {
+                    'pid': proc.pid,
+                    'name': proc.name,
+                    'cpu_times': proc.cpu_times,
+                    'memory_info': proc.memory_info,
+                    'create_time': proc.create_time
+                }
+                for proc in snapshot.monitored
+            ]
         except Exception as e:
             logging.error(f"Error getting processes: {str(e)}")
-            
-        return processes
+            return []
         
     def should_monitor_process(self, proc_name):
         """Check if process should be monitored"""
-        return any(app.lower() in proc_name.lower() or proc_name.lower() in app.lower() 
-                  for app in self.monitored_apps)
+        return is_monitored_app(proc_name)
         
     def update_process_stats(self, current_processes, timestamp):
         """Update process statistics"""
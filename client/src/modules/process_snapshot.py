@@ -0,0 +1,259 @@
+"""
+Process Snapshot Service
+Takes one psutil scan per tick and shares an immutable, pre-classified
+snapshot with every monitor (screen capture, browser tracker, process monitor,
+browser monitor, history parser) instead of each walking the process table.
+"""
+
+import time
+import threading
+import logging
+from types import MappingProxyType
+from typing import Dict, Mapping, NamedTuple, Optional, Tuple
+import psutil
+
+# Canonical browser name -> process name patterns (case-insensitive substring match)
+BROWSER_PROCESS_NAMES: Dict[str, Tuple[str, ...]] = {
+    'Chrome': ('chrome', 'Google Chrome', 'chrome.exe'),
+    'Firefox': ('firefox', 'Firefox', 'firefox.exe'),
+    'Safari': ('Safari',),
+    'Edge': ('msedge', 'Microsoft Edge', 'msedge.exe'),
+    'Opera': ('opera', 'Opera', 'opera.exe'),
+    'Brave': ('brave', 'Brave Browser', 'brave.exe'),
+    'Vivaldi': ('vivaldi', 'Vivaldi', 'vivaldi.exe'),
+}
+
+# Office / business applications, by category
+OFFICE_APP_NAMES: Dict[str, Tuple[str, ...]] = {
+    'microsoft_office': ('winword', 'excel', 'powerpnt', 'outlook', 'WINWORD.EXE', 'EXCEL.EXE', 'POWERPNT.EXE', 'OUTLOOK.EXE', 'Microsoft Word', 'Microsoft Excel', 'Microsoft PowerPoint', 'Microsoft Outlook'),
+    'libreoffice': ('soffice', 'libreoffice', 'soffice.bin', 'LibreOffice'),
+    'accounting': ('quickbooks', 'QuickBooks', 'sage', 'Sage', 'xero', 'Xero', 'peachtree', 'freshbooks', 'FreshBooks'),
+    'adobe': ('photoshop', 'illustrator', 'acrobat', 'indesign', 'premiere', 'after effects', 'Adobe Photoshop', 'Adobe Illustrator', 'Adobe Acrobat', 'Adobe InDesign'),
+    'text_editors': ('notepad++', 'Notepad++', 'TextEdit', 'gedit', 'nano'),
+}
+
+# Helper/system processes never counted as office applications
+OFFICE_SKIP_KEYWORDS: Tuple[str, ...] = (
+    'agent', 'service', 'helper', 'daemon', 'xpc', 'extension',
+    'settings', 'authentication', 'usage', 'managed', 'thumbnail',
+    'icon', 'decoder', 'encoder', 'plugin'
+)
+
+# Applications reported by the process monitor
+MONITORED_APP_NAMES: Tuple[str, ...] = (
+    # Browsers
+    'chrome.exe', 'firefox.exe', 'msedge.exe', 'opera.exe', 'safari.exe',
+    'Chrome', 'Firefox', 'Safari', 'Opera', 'Microsoft Edge',
+
+    # Office applications
+    'winword.exe', 'excel.exe', 'powerpnt.exe', 'outlook.exe',
+    'Microsoft Word', 'Microsoft Excel', 'Microsoft PowerPoint', 'Microsoft Outlook',
+
+    # Development tools
+    'code.exe', 'devenv.exe', 'notepad++.exe', 'sublime_text.exe',
+    'Visual Studio Code', 'Visual Studio', 'Sublime Text', 'PyCharm',
+
+    # Media
+    'vlc.exe', 'wmplayer.exe', 'spotify.exe',
+    'VLC', 'Windows Media Player', 'Spotify',
+
+    # Communication
+    'discord.exe', 'slack.exe', 'teams.exe', 'zoom.exe',
+    'Discord', 'Slack', 'Microsoft Teams', 'Zoom',
+
+    # Other
+    'notepad.exe', 'calc.exe', 'explorer.exe'
+)
+
+
+class ProcessInfo(NamedTuple):
+    """One classified process from a snapshot scan"""
+    pid: int
+    name: str
+    exe: Optional[str]
+    create_time: Optional[float]
+    cpu_times: Optional[object]
+    memory_info: Optional[object]
+    browser: Optional[str]  # canonical browser name, e.g. 'Chrome'
+    office_category: Optional[str]  # e.g. 'microsoft_office'
+    monitored: bool
+
+
+class ProcessSnapshot(NamedTuple):
+    """Immutable result of a single process table scan"""
+    version: int
+    taken_at: float
+    processes: Tuple[ProcessInfo, ...]
+    browsers: Mapping[str, Tuple[ProcessInfo, ...]]
+    office_apps: Tuple[ProcessInfo, ...]
+    monitored: Tuple[ProcessInfo, ...]
+
+    def has_browser(self, browser_name: Optional[str] = None) -> bool:
+        """Check if any browser (or the given canonical browser) is running"""
+        if browser_name is None:
+            return bool(self.browsers)
+        return browser_name in self.browsers
+
+    def browser_process_count(self) -> int:
+        """Total number of browser processes"""
+        return sum(len(procs) for procs in self.browsers.values())
+
+
+def classify_browser(proc_name: str) -> Optional[str]:
+    """Return canonical browser name for a process name, or None"""
+    name_lower = proc_name.lower()
+    for browser_name, patterns in _BROWSER_PATTERNS:
+        if any(pattern in name_lower for pattern in patterns):
+            return browser_name
+    return None
+
+
+def classify_office_app(proc_name: str) -> Optional[str]:
+    """Return office app category for a process name, or None"""
+    name_lower = proc_name.lower()
+    if any(skip in name_lower for skip in OFFICE_SKIP_KEYWORDS):
+        return None
+
+    for category, patterns in _OFFICE_PATTERNS:
+        if any(name_lower == pattern or (len(pattern) > 5 and pattern in name_lower)
+               for pattern in patterns):
+            return category
+    return None
+
+
+def is_monitored_app(proc_name: str) -> bool:
+    """Check if process should be reported by the process monitor"""
+    name_lower = proc_name.lower()
+    return any(app in name_lower or name_lower in app for app in _MONITORED_PATTERNS)
+
+
+# Pre-lowered pattern tables so classification doesn't lowercase per process
+_BROWSER_PATTERNS = tuple(
+    (name, tuple(p.lower() for p in patterns)) for name, patterns in BROWSER_PROCESS_NAMES.items()
+)
+_OFFICE_PATTERNS = tuple(
+    (category, tuple(p.lower() for p in patterns)) for category, patterns in OFFICE_APP_NAMES.items()
+)
+_MONITORED_PATTERNS = tuple(app.lower() for app in MONITORED_APP_NAMES)
+
+_SCAN_ATTRS = ['pid', 'name', 'exe', 'create_time', 'cpu_times', 'memory_info']
+
+
+class ProcessSnapshotService:
+    """
+    Shared process table scanner.
+
+    Callers ask for a snapshot; if the cached one is younger than the tick
+    interval it is returned as-is, otherwise exactly one thread rescans while
+    the others wait for the fresh result. The version counter only moves when
+    the set of processes (pid, create_time, name) changes.
+    """
+
+    def __init__(self, tick_interval: float = 5.0):
+        self.tick_interval = tick_interval
+        self._scan_lock = threading.Lock()
+        self._snapshot: Optional[ProcessSnapshot] = None
+        self._identity: frozenset = frozenset()
+        self._version = 0
+        self.scan_count = 0
+
+    @property
+    def version(self) -> int:
+        """Current snapshot version (increments only when processes change)"""
+        return self._version
+
+    def changed_since(self, version: int) -> bool:
+        """Check if the process set changed since the given version"""
+        return self.get_snapshot().version != version
+
+    def get_snapshot(self, max_age: Optional[float] = None) -> ProcessSnapshot:
+        """Get the current snapshot, rescanning if older than max_age (default: tick interval)"""
+        max_age = self.tick_interval if max_age is None else max_age
+
+        snapshot = self._snapshot
+        if snapshot is not None and (time.monotonic() - snapshot.taken_at) < max_age:
+            return snapshot
+
+        with self._scan_lock:
+            # Another thread may have refreshed while we waited for the lock
+            snapshot = self._snapshot
+            if snapshot is not None and (time.monotonic() - snapshot.taken_at) < max_age:
+                return snapshot
+
+            self._snapshot = self._scan()
+            return self._snapshot
+
+    def refresh(self) -> ProcessSnapshot:
+        """Force a new scan regardless of snapshot age"""
+        return self.get_snapshot(max_age=0)
+
+    def _scan(self) -> ProcessSnapshot:
+        """Walk the process table once and classify every process"""
+        processes = []
+        browsers: Dict[str, list] = {}
+        office_apps = []
+        monitored = []
+
+        try:
+            for proc in psutil.process_iter(_SCAN_ATTRS):
+                try:
+                    info = proc.info
+                    proc_name = info.get('name') or ''
+
+                    browser = classify_browser(proc_name) if proc_name else None
+                    office_category = classify_office_app(proc_name) if proc_name else None
+                    record = ProcessInfo(
+                        pid=info['pid'],
+                        name=proc_name,
+                        exe=info.get('exe'),
+                        create_time=info.get('create_time'),
+                        cpu_times=info.get('cpu_times'),
+                        memory_info=info.get('memory_info'),
+                        browser=browser,
+                        office_category=office_category,
+                        monitored=bool(proc_name) and is_monitored_app(proc_name)
+                    )
+
+                    processes.append(record)
+                    if browser:
+                        browsers.setdefault(browser, []).append(record)
+                    if office_category:
+                        office_apps.append(record)
+                    if record.monitored:
+                        monitored.append(record)
+
+                except (psutil.NoSuchProcess, psutil.AccessDenied):
+                    continue
+
+        except Exception as e:
+            logging.error(f"Error scanning processes: {e}")
+
+        identity = frozenset((p.pid, p.create_time, p.name) for p in processes)
+        if identity != self._identity or self._snapshot is None:
+            self._identity = identity
+            self._version += 1
+
+        self.scan_count += 1
+
+        return ProcessSnapshot(
+            version=self._version,
+            taken_at=time.monotonic(),
+            processes=tuple(processes),
+            browsers=MappingProxyType({name: tuple(procs) for name, procs in browsers.items()}),
+            office_apps=tuple(office_apps),
+            monitored=tuple(monitored)
+        )
+
+
+_shared_service: Optional[ProcessSnapshotService] = None
+_shared_service_lock = threading.Lock()
+
+
+def get_process_snapshot_service() -> ProcessSnapshotService:
+    """Get the process-wide shared snapshot service"""
+    global _shared_service
+    if _shared_service is None:
+        with _shared_service_lock:
+            if _shared_service is None:
+                _shared_service = ProcessSnapshotService()
+    return _shared_service
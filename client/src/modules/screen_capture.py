@@ -10,11 +10,13 @@ from datetime import datetime
 import logging
 import sys
 import os
-import psutil
 
 # Add src to path for imports
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 from core.config import Config
+from .process_snapshot import get_process_snapshot_service
+from .screenshot_pipeline import RawFrame, ScreenshotPipeline
+from ..utils.image_hash import dhash_from_bgra, hamming_distance
 
 class ScreenCapture:
     def __init__(self, api_client=None):
@@ -31,25 +33,25 @@ class ScreenCapture:
         self._state_lock = threading.RLock()  # Reentrant lock for state variables
         self._capture_lock = threading.Lock()  # Lock for capture operations
         
-        # Common browser process names across platforms
-        self.browser_processes = {
-            'chrome': ['chrome', 'chrome.exe', 'Google Chrome'],
-            'firefox': ['firefox', 'firefox.exe', 'Firefox'],
-            'safari': ['safari', 'Safari'],
-            'edge': ['msedge', 'msedge.exe', 'Microsoft Edge'],
-            'brave': ['brave', 'brave.exe', 'Brave Browser'],
-            'opera': ['opera', 'opera.exe', 'Opera'],
-            'vivaldi': ['vivaldi', 'vivaldi.exe', 'Vivaldi']
-        }
-        
-        # Non-browser applications that we want to ignore for screen capture
-        self.office_apps = {
-            'microsoft_office': ['winword', 'excel', 'powerpnt', 'outlook', 'WINWORD.EXE', 'EXCEL.EXE', 'POWERPNT.EXE', 'OUTLOOK.EXE', 'Microsoft Word', 'Microsoft Excel', 'Microsoft PowerPoint', 'Microsoft Outlook'],
-            'libreoffice': ['soffice', 'libreoffice', 'soffice.bin', 'LibreOffice'],
-            'accounting': ['quickbooks', 'QuickBooks', 'sage', 'Sage', 'xero', 'Xero', 'peachtree', 'freshbooks', 'FreshBooks'],
-            'adobe': ['photoshop', 'illustrator', 'acrobat', 'indesign', 'premiere', 'after effects', 'Adobe Photoshop', 'Adobe Illustrator', 'Adobe Acrobat', 'Adobe InDesign'],
-            'text_editors': ['notepad++', 'Notepad++', 'TextEdit', 'gedit', 'nano']
-        }
+        # Shared process snapshot (one psutil scan per tick for all monitors)
+        self.process_snapshots = get_process_snapshot_service()
+
+        # Perceptual de-duplication: monitor index -> last uploaded fingerprint
+        self.dedup_enabled = getattr(Config, 'SCREENSHOT_DEDUP_ENABLED', True)
+        self.dedup_max_distance = getattr(Config, 'SCREENSHOT_DEDUP_MAX_DISTANCE', 3)
+        self.dedup_max_age = getattr(Config, 'SCREENSHOT_DEDUP_MAX_AGE', self.capture_interval)
+        self._last_fingerprints = {}
+        self.screenshots_skipped = 0
+
+        # Staged capture -> encode -> upload pipeline (bounded queues)
+        self.pipeline = ScreenshotPipeline(
+            encode_fn=self._encode_frame,
+            upload_fn=self._upload_frame,
+            spill_fn=self._spill_frame,
+            on_uploaded=self._on_frame_uploaded,
+            encode_queue_size=getattr(Config, 'SCREENSHOT_ENCODE_QUEUE_SIZE', 4),
+            upload_queue_size=getattr(Config, 'SCREENSHOT_UPLOAD_QUEUE_SIZE', 8)
+        )
         
     def _set_running(self, value: bool):
         """Thread-safe setter for is_running"""
@@ -71,7 +73,7 @@ class ScreenCapture:
         with self._state_lock:
             return self.is_capturing
         
-    def has_active_browsers(self):
+    def has_active_browsers(self, snapshot=None):
         """Check if any browser processes are currently running"""
         try:
             # Use browser tracker if available for more accurate detection
@@ -83,77 +85,33 @@ class ScreenCapture:
                     return True
             
             # Fallback to process-based detection
-            for proc in psutil.process_iter(['pid', 'name']):
-                try:
-                    proc_name = proc.info['name'] or ''
-                    
-                    # Check if process name matches any browser
-                    for browser_name, process_names in self.browser_processes.items():
-                        if any(pname.lower() in proc_name.lower() for pname in process_names):
-                            logging.debug(f"Found active browser process: {proc_name}")
-                            return True
-                            
-                except (psutil.NoSuchProcess, psutil.AccessDenied):
-                    continue
+            snapshot = snapshot or self.process_snapshots.get_snapshot()
+            if snapshot.has_browser():
+                logging.debug(f"Found active browser processes: {', '.join(snapshot.browsers)}")
+                return True
                     
         except Exception as e:
             logging.error(f"Error checking for browsers: {e}")
             
         return False
         
-    def get_active_browser_count(self):
+    def get_active_browser_count(self, snapshot=None):
         """Get count of active browser processes for logging"""
-        count = 0
         try:
-            for proc in psutil.process_iter(['pid', 'name']):
-                try:
-                    proc_name = proc.info['name'] or ''
-                    
-                    # Check if process name matches any browser
-                    for browser_name, process_names in self.browser_processes.items():
-                        if any(pname.lower() in proc_name.lower() for pname in process_names):
-                            count += 1
-                            break
-                            
-                except (psutil.NoSuchProcess, psutil.AccessDenied):
-                    continue
-                    
+            snapshot = snapshot or self.process_snapshots.get_snapshot()
+            return snapshot.browser_process_count()
         except Exception as e:
             logging.error(f"Error counting browsers: {e}")
-            
-        return count
+            return 0
         
-    def get_non_browser_apps(self):
+    def get_non_browser_apps(self, snapshot=None):
         """Get list of running non-browser applications for logging"""
-        non_browser_apps = []
         try:
-            for proc in psutil.process_iter(['pid', 'name']):
-                try:
-                    proc_name = proc.info['name'] or ''
-                    
-                    # Skip system processes and helper processes
-                    if any(skip in proc_name.lower() for skip in [
-                        'agent', 'service', 'helper', 'daemon', 'xpc', 'extension', 
-                        'settings', 'authentication', 'usage', 'managed', 'thumbnail',
-                        'icon', 'decoder', 'encoder', 'plugin'
-                    ]):
-                        continue
-                    
-                    # Check if process name matches any non-browser app
-                    for app_category, process_names in self.office_apps.items():
-                        if any(proc_name.lower() == pname.lower() or 
-                               (len(pname) > 5 and pname.lower() in proc_name.lower()) 
-                               for pname in process_names):
-                            non_browser_apps.append(f"{proc_name} ({app_category})")
-                            break
-                            
-                except (psutil.NoSuchProcess, psutil.AccessDenied):
-                    continue
-                    
+            snapshot = snapshot or self.process_snapshots.get_snapshot()
+            return [f"{proc.name} ({proc.office_category})" for proc in snapshot.office_apps]
         except Exception as e:
             logging.error(f"Error getting non-browser apps: {e}")
-            
-        return non_browser_apps
+            return []
         
     def check_disk_space(self):
         """FIX ISSUE #68: Check if enough disk space available (check every 5 minutes)"""
@@ -184,24 +142,26 @@ class ScreenCapture:
             logging.error(f"Failed to check disk space: {e}")
             return True  # Continue anyway to avoid blocking
     
-    def should_capture_screen(self):
+    def should_capture_screen(self, snapshot=None):
         """Determine if screen capture should be active based on running applications"""
+        snapshot = snapshot or self.process_snapshots.get_snapshot()
+
         # Check if browser-only capture mode is enabled
         if self.only_capture_with_browser:
-            browsers_active = self.has_active_browsers()
+            browsers_active = self.has_active_browsers(snapshot)
             if not browsers_active:
                 logging.debug("Screenshot skipped: No active browsers detected (browser-only mode)")
                 return False
             return True
             
         # Legacy behavior: capture if browsers active
-        browsers_active = self.has_active_browsers()
+        browsers_active = self.has_active_browsers(snapshot)
         
         if browsers_active:
             return True
             
         # If no browsers but office/accounting apps are running, don't capture
-        non_browser_apps = self.get_non_browser_apps()
+        non_browser_apps = self.get_non_browser_apps(snapshot)
         if non_browser_apps:
             logging.debug(f"Non-browser apps running: {non_browser_apps}")
             return False
@@ -220,10 +180,11 @@ class ScreenCapture:
         
         while self._get_running():
             try:
-                # Check if screen capture should be active
-                should_capture = self.should_capture_screen()
-                browser_count = self.get_active_browser_count()
-                non_browser_apps = self.get_non_browser_apps()
+                # Check if screen capture should be active (one process scan per cycle)
+                snapshot = self.process_snapshots.get_snapshot()
+                should_capture = self.should_capture_screen(snapshot)
+                browser_count = self.get_active_browser_count(snapshot)
+                non_browser_apps = self.get_non_browser_apps(snapshot)
                 
                 if should_capture:
                     if not self._get_capturing():
@@ -258,6 +219,10 @@ class ScreenCapture:
             logging.warning("Skipping screenshot due to low disk space")
             return
         
+        if not self.pipeline.start():
+            logging.debug("Screenshot pipeline still stopping - skipping this capture")
+            return False
+
         try:
             # Double-check browsers are still active before capturing
             if not self.should_capture_screen():
@@ -270,42 +235,99 @@ class ScreenCapture:
                 
                 for i, monitor in enumerate(monitors):
                     # Capture screenshot
+                    grab_started = time.monotonic()
                     screenshot = sct.grab(monitor)
-                    
-                    # Convert to PIL Image
-                    img = Image.frombytes("RGB", screenshot.size, screenshot.bgra, "raw", "BGRX")
-                    
-                    # Compress and convert to base64
-                    screenshot_data = self.compress_image(img)
+
+                    # Skip frames that look the same as the last upload (before any encoding)
+                    fingerprint = self._fingerprint(screenshot)
+                    if self._is_duplicate(i, fingerprint):
+                        self.screenshots_skipped += 1
+                        logging.debug(f"Screenshot {i+1} unchanged since last upload - skipped")
+                        continue
                     
                     # Prepare metadata for production API
                     metadata = {
                         'client_id': Config.CLIENT_ID,
                         'resolution': f"{screenshot.width}x{screenshot.height}",
+                        'monitor': i + 1,
                         'timestamp': datetime.now().isoformat(),
                         'browser_active': True  # Mark that this was captured during browser activity
                     }
                     
-                    # Send to server using production API
+                    # Hand raw pixels to the encoder stage - encode and upload never block capture
                     if self.api_client:
-                        try:
-                            response = self.api_client.upload_screenshot(screenshot_data, metadata)
-                            if response and response.get('success'):
-                                logging.info(f"Screenshot {i+1} uploaded successfully")
-                            else:
-                                logging.error(f"Failed to upload screenshot {i+1}")
-                        except Exception as upload_error:
-                            logging.error(f"Error uploading screenshot {i+1}: {str(upload_error)}")
+                        self.pipeline.submit(
+                            RawFrame(
+                                monitor_index=i,
+                                size=screenshot.size,
+                                pixels=screenshot.raw,
+                                metadata=metadata,
+                                fingerprint=fingerprint
+                            ),
+                            capture_seconds=time.monotonic() - grab_started
+                        )
                     
-            logging.info("Screenshot capture cycle completed")
+            logging.info("Screenshot capture cycle completed (encode/upload continue in background)")
             return True
             
         except Exception as e:
             logging.error(f"Error capturing screenshot: {str(e)}")
             return False
             
-    def compress_image(self, img, quality=65, max_size=(1920, 1080)):
-        """Compress image to reduce file size - quality 65 provides 50% smaller files while maintaining good quality"""
+    def _fingerprint(self, screenshot):
+        """Perceptual hash of a raw mss grab, or None when dedup is disabled"""
+        if not self.dedup_enabled:
+            return None
+        try:
+            return dhash_from_bgra(screenshot.raw, screenshot.size)
+        except Exception as e:
+            logging.debug(f"Screenshot fingerprint failed: {e}")
+            return None
+
+    def _is_duplicate(self, monitor_index, fingerprint):
+        """Check if a frame is near-identical to the last one uploaded for this monitor"""
+        previous = self._last_fingerprints.get(monitor_index)
+        if fingerprint is None or previous is None:
+            return False
+
+        previous_hash, uploaded_at = previous
+        if time.time() - uploaded_at >= self.dedup_max_age:
+            return False
+
+        return hamming_distance(previous_hash, fingerprint) <= self.dedup_max_distance
+
+    def _remember_fingerprint(self, monitor_index, fingerprint):
+        """Record fingerprint of a successfully uploaded frame"""
+        if fingerprint is not None:
+            self._last_fingerprints[monitor_index] = (fingerprint, time.time())
+
+    def _encode_frame(self, frame):
+        """Encoder stage: raw BGRA grab -> compressed image data"""
+        img = Image.frombytes("RGB", frame.size, frame.pixels, "raw", "BGRX")
+        return self.compress_image_bytes(img)
+
+    def _upload_frame(self, image_data, metadata):
+        """Uploader stage: send one encoded screenshot"""
+        return self.api_client.upload_screenshot(image_data, metadata)
+
+    def _spill_frame(self, image_data, metadata):
+        """Upload queue overflow: keep the screenshot on disk"""
+        self.api_client._store_screenshot_locally(image_data, metadata)
+
+    def _on_frame_uploaded(self, frame, response):
+        """Uploader stage callback: remember fingerprint for de-duplication"""
+        # Kept on disk or queued is not on the server yet - a later near-identical
+        # frame must still be uploaded in case this one never arrives
+        if response.get('stored_locally') or response.get('queued'):
+            return
+        self._remember_fingerprint(frame.monitor_index, frame.fingerprint)
+
+    def get_pipeline_statistics(self):
+        """Per-stage counters and latencies for the capture pipeline"""
+        return {**self.pipeline.get_statistics(), 'dedup_skipped': self.screenshots_skipped}
+
+    def compress_image_bytes(self, img, quality=65, max_size=(1920, 1080)):
+        """Compress image to raw JPEG bytes - quality 65 provides 50% smaller files while maintaining good quality"""
         # Resize if too large
         if img.size[0] > max_size[0] or img.size[1] > max_size[1]:
             img.thumbnail(max_size, Image.Resampling.LANCZOS)
@@ -313,15 +335,18 @@ class ScreenCapture:
         # Convert to JPEG and compress with optimized quality
         buffer = io.BytesIO()
         img.save(buffer, format='JPEG', quality=quality, optimize=True)
-        
-        # Convert to base64
-        image_data = base64.b64encode(buffer.getvalue()).decode('utf-8')
-        return image_data
+        return buffer.getvalue()
+
+    def compress_image(self, img, quality=65, max_size=(1920, 1080)):
+        """Compress image and return base64 JPEG (legacy JSON upload format)"""
+        image_bytes = self.compress_image_bytes(img, quality, max_size)
+        return base64.b64encode(image_bytes).decode('utf-8')
         
     def stop_capture(self):
         """Stop screenshot capture"""
         self._set_running(False)
         self._set_capturing(False)
+        self.pipeline.stop()
         logging.info("Screenshot capture stopped")
         
     def capture_and_upload(self):
@@ -335,8 +360,8 @@ class ScreenCapture:
                 # Convert to PIL Image
                 img = Image.frombytes("RGB", screenshot.size, screenshot.bgra, "raw", "BGRX")
                 
-                # Compress and convert to base64
-                screenshot_data = self.compress_image(img)
+                # Compress to raw JPEG bytes (sent as binary multipart)
+                screenshot_data = self.compress_image_bytes(img)
                 
                 # Prepare metadata
                 metadata = {
@@ -0,0 +1,273 @@
+"""
+Screenshot Pipeline Module
+Staged capture -> encode -> upload so slow networks never delay capture.
+Stages are connected by bounded queues with explicit overflow policies:
+- encode queue full: the oldest raw frame is dropped (newest screen wins)
+- upload queue full: the encoded frame is spilled to local storage
+- stop: frames still queued are spilled too, so a shutdown loses nothing
+"""
+
+import time
+import queue
+import threading
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional
+
+
+@dataclass
+class RawFrame:
+    """Raw screen grab handed from the capture thread to the encoder"""
+    monitor_index: int
+    size: tuple
+    pixels: bytes  # BGRA (bytes-like, e.g. mss ScreenShot.raw)
+    metadata: Dict[str, Any]
+    fingerprint: Optional[int] = None
+    captured_at: float = field(default_factory=time.monotonic)
+
+
+@dataclass
+class EncodedFrame:
+    """Encoded screenshot handed from the encoder to the uploader"""
+    monitor_index: int
+    image_data: Any
+    metadata: Dict[str, Any]
+    fingerprint: Optional[int] = None
+    captured_at: float = field(default_factory=time.monotonic)
+
+
+class StageStats:
+    """Per-stage counters and latency (seconds)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.processed = 0
+        self.failed = 0
+        self.dropped = 0
+        self.spilled = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.last_seconds = 0.0
+
+    def record(self, seconds: float, ok: bool = True):
+        with self._lock:
+            if ok:
+                self.processed += 1
+            else:
+                self.failed += 1
+            self.total_seconds += seconds
+            self.last_seconds = seconds
+            self.max_seconds = max(self.max_seconds, seconds)
+
+    def record_drop(self):
+        with self._lock:
+            self.dropped += 1
+
+    def record_spill(self):
+        with self._lock:
+            self.spilled += 1
+
+    def as_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            handled = self.processed + self.failed
+            return {
+                'processed': self.processed,
+                'failed': self.failed,
+                'dropped': self.dropped,
+                'spilled': self.spilled,
+                'avg_latency': self.total_seconds / handled if handled else 0.0,
+                'max_latency': self.max_seconds,
+                'last_latency': self.last_seconds
+            }
+
+
+class ScreenshotPipeline:
+    """Encoder and uploader worker threads fed by bounded queues"""
+
+    def __init__(self,
+                 encode_fn: Callable[[RawFrame], Any],
+                 upload_fn: Callable[[Any, Dict], Optional[Dict]],
+                 spill_fn: Optional[Callable[[Any, Dict], None]] = None,
+                 on_uploaded: Optional[Callable[[EncodedFrame, Dict], None]] = None,
+                 encode_queue_size: int = 4,
+                 upload_queue_size: int = 8):
+        self.encode_fn = encode_fn
+        self.upload_fn = upload_fn
+        self.spill_fn = spill_fn
+        self.on_uploaded = on_uploaded
+
+        self.encode_queue: queue.Queue = queue.Queue(maxsize=max(1, encode_queue_size))
+        self.upload_queue: queue.Queue = queue.Queue(maxsize=max(1, upload_queue_size))
+
+        self.capture_stats = StageStats()
+        self.encode_stats = StageStats()
+        self.upload_stats = StageStats()
+
+        self._running = False
+        self._state_lock = threading.Lock()
+        self._threads = []
+
+    def start(self) -> bool:
+        """
+        Start encoder and uploader threads (no-op if already running). Refused
+        while workers from a previous stop() are still finishing, so two
+        encoders/uploaders never run at once; returns whether the pipeline runs.
+        """
+        with self._state_lock:
+            if self._running:
+                return True
+            self._threads = [thread for thread in self._threads if thread.is_alive()]
+            if self._threads:
+                logging.warning("Screenshot pipeline workers still stopping - not restarting yet")
+                return False
+            self._running = True
+            self._threads = [
+                threading.Thread(target=self._encode_worker, daemon=True, name="ScreenshotEncoder"),
+                threading.Thread(target=self._upload_worker, daemon=True, name="ScreenshotUploader")
+            ]
+            for thread in self._threads:
+                thread.start()
+            return True
+
+    def stop(self, timeout: float = 5.0):
+        """Stop worker threads and spill frames still queued"""
+        with self._state_lock:
+            self._running = False
+            threads = list(self._threads)
+        for thread in threads:
+            thread.join(timeout=timeout)
+
+        with self._state_lock:
+            # Workers stuck in a slow upload stay tracked until they exit (see start)
+            self._threads = [thread for thread in self._threads if thread.is_alive()]
+            if self._threads:
+                logging.warning(f"{len(self._threads)} screenshot pipeline worker(s) did not stop within {timeout}s")
+
+        self._spill_queued()
+
+    def is_running(self) -> bool:
+        with self._state_lock:
+            return self._running
+
+    def submit(self, frame: RawFrame, capture_seconds: float = 0.0) -> bool:
+        """Hand a raw frame to the encoder; never blocks the capture thread"""
+        self.capture_stats.record(capture_seconds)
+        try:
+            self.encode_queue.put_nowait(frame)
+            return True
+        except queue.Full:
+            pass
+
+        # Drop oldest: a newer view of the screen is worth more than a stale one
+        try:
+            stale = self.encode_queue.get_nowait()
+            self.encode_stats.record_drop()
+            logging.warning(f"Screenshot encoder behind - dropped frame for monitor {stale.monitor_index + 1}")
+        except queue.Empty:
+            pass
+
+        try:
+            self.encode_queue.put_nowait(frame)
+            return True
+        except queue.Full:
+            self.encode_stats.record_drop()
+            return False
+
+    def _encode_worker(self):
+        while self.is_running():
+            try:
+                frame = self.encode_queue.get(timeout=1)
+            except queue.Empty:
+                continue
+
+            started = time.monotonic()
+            try:
+                image_data = self.encode_fn(frame)
+            except Exception as e:
+                self.encode_stats.record(time.monotonic() - started, ok=False)
+                logging.error(f"Error encoding screenshot {frame.monitor_index + 1}: {e}")
+                continue
+            self.encode_stats.record(time.monotonic() - started)
+
+            encoded = EncodedFrame(
+                monitor_index=frame.monitor_index,
+                image_data=image_data,
+                metadata=frame.metadata,
+                fingerprint=frame.fingerprint,
+                captured_at=frame.captured_at
+            )
+            try:
+                self.upload_queue.put_nowait(encoded)
+            except queue.Full:
+                self._spill(encoded)
+
+    def _upload_worker(self):
+        while self.is_running():
+            try:
+                frame = self.upload_queue.get(timeout=1)
+            except queue.Empty:
+                continue
+
+            started = time.monotonic()
+            try:
+                response = self.upload_fn(frame.image_data, frame.metadata)
+            except Exception as e:
+                self.upload_stats.record(time.monotonic() - started, ok=False)
+                logging.error(f"Error uploading screenshot {frame.monitor_index + 1}: {str(e)}")
+                continue
+
+            ok = bool(response and response.get('success'))
+            self.upload_stats.record(time.monotonic() - started, ok=ok)
+            if ok:
+                logging.info(f"Screenshot {frame.monitor_index + 1} uploaded successfully")
+                if self.on_uploaded:
+                    self.on_uploaded(frame, response)
+            else:
+                logging.error(f"Failed to upload screenshot {frame.monitor_index + 1}")
+
+    def _spill(self, frame: EncodedFrame, reason: str = "uploader behind"):
+        """Keep the frame on disk (upload queue full, or pipeline stopping) instead of blocking or losing it"""
+        self.upload_stats.record_spill()
+        logging.warning(f"Screenshot {reason} - spilling screenshot {frame.monitor_index + 1} to local storage")
+        if not self.spill_fn:
+            return
+        try:
+            self.spill_fn(frame.image_data, frame.metadata)
+        except Exception as e:
+            logging.error(f"Failed to spill screenshot: {e}")
+
+    def _spill_queued(self):
+        """Spill everything left in the queues (raw frames are encoded first)"""
+        spilled = 0
+        while True:
+            try:
+                raw = self.encode_queue.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                image_data = self.encode_fn(raw)
+            except Exception as e:
+                logging.error(f"Error encoding screenshot {raw.monitor_index + 1} on stop: {e}")
+                continue
+            self._spill(EncodedFrame(raw.monitor_index, image_data, raw.metadata, raw.fingerprint, raw.captured_at),
+                        reason="pipeline stopping")
+            spilled += 1
+
+        while True:
+            try:
+                frame = self.upload_queue.get_nowait()
+            except queue.Empty:
+                break
+            self._spill(frame, reason="pipeline stopping")
+            spilled += 1
+
+        if spilled:
+            logging.info(f"Spilled {spilled} queued screenshot(s) to local storage on stop")
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Per-stage counters, latencies and current queue depths"""
+        return {
+            'capture': self.capture_stats.as_dict(),
+            'encode': {**self.encode_stats.as_dict(), 'queue_depth': self.encode_queue.qsize()},
+            'upload': {**self.upload_stats.as_dict(), 'queue_depth': self.upload_queue.qsize()}
+        }
@@ -0,0 +1,197 @@
+"""
+Stream Controller Module
+Congestion-aware pacing for live streaming: a latest-frame slot between
+capture and send (never a backlog) and a controller that adapts frame rate,
+JPEG quality and resolution to the measured send latency.
+"""
+
+import time
+import threading
+from collections import deque
+from typing import Any, Dict, Optional, Tuple
+
+
+class LatestFrameSlot:
+    """
+    Single-item hand-off: a new frame replaces one the sender has not taken yet.
+    Only the reference to the already-encoded frame changes hands; the pixels
+    were copied during encoding (resize / tile crops to JPEG), not here.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._item = None
+        self.replaced = 0
+
+    def put(self, item):
+        with self._cond:
+            if self._item is not None:
+                self.replaced += 1
+            self._item = item
+            self._cond.notify()
+
+    def take(self, timeout: Optional[float] = None):
+        """Wait for and remove the newest frame; None on timeout"""
+        with self._cond:
+            if self._item is None:
+                self._cond.wait(timeout)
+            item, self._item = self._item, None
+            return item
+
+    def clear(self):
+        with self._cond:
+            self._item = None
+
+
+class AdaptiveStreamController:
+    """
+    Adjusts fps, JPEG quality and resolution within bounds.
+
+    Every adjust_interval seconds the smoothed send latency is compared with
+    the target. Over target (or frames overwritten in the slot) steps quality
+    down first, then fps, then resolution; comfortably under target steps back
+    up in the reverse order, so fidelity returns before frame rate is spent.
+    """
+
+    def __init__(self,
+                 max_resolution: Tuple[int, int] = (1280, 720),
+                 min_resolution: Tuple[int, int] = (640, 360),
+                 max_fps: float = 15,
+                 min_fps: float = 2,
+                 max_quality: int = 70,
+                 min_quality: int = 35,
+                 target_latency: float = 0.25,
+                 adjust_interval: float = 1.0):
+        self.target_latency = target_latency
+        self.adjust_interval = adjust_interval
+        self._lock = threading.Lock()
+        self.set_bounds(max_resolution, min_resolution, max_fps, min_fps, max_quality, min_quality)
+
+        self._send_latency: Optional[float] = None  # EWMA seconds
+        self._window_started = time.monotonic()
+        self._window_overwrites = 0
+        self._sent_times: deque = deque(maxlen=120)
+        self._latencies: deque = deque(maxlen=120)
+        self.bytes_sent = 0
+
+    def set_bounds(self, max_resolution, min_resolution, max_fps, min_fps, max_quality, min_quality):
+        """Apply new limits and restart at the top of them"""
+        with self._lock:
+            self.max_fps = max_fps
+            self.min_fps = min(min_fps, max_fps)
+            self.max_quality = max_quality
+            self.min_quality = min(min_quality, max_quality)
+            self.resolutions = self._resolution_steps(max_resolution, min_resolution)
+
+            self.fps = float(max_fps)
+            self.quality = max_quality
+            self._resolution_index = 0
+
+    @staticmethod
+    def _resolution_steps(max_resolution, min_resolution):
+        """Candidate sizes from max down to min (same aspect as max)"""
+        max_w, max_h = max_resolution
+        steps = []
+        for scale in (1.0, 0.75, 0.5, 0.375, 0.25):
+            size = (int(max_w * scale) // 2 * 2, int(max_h * scale) // 2 * 2)
+            if size[0] < min_resolution[0] or size[1] < min_resolution[1]:
+                break
+            steps.append(size)
+        return steps or [tuple(max_resolution)]
+
+    @property
+    def resolution(self) -> Tuple[int, int]:
+        return self.resolutions[self._resolution_index]
+
+    @property
+    def frame_interval(self) -> float:
+        return 1.0 / max(0.1, self.fps)
+
+    def settings(self) -> Tuple[Tuple[int, int], int, float]:
+        """Current (resolution, jpeg quality, fps)"""
+        with self._lock:
+            return self.resolution, self.quality, self.fps
+
+    def record_send(self, send_seconds: float, frame_bytes: int, captured_at: float):
+        """Record one delivered frame (captured_at is time.monotonic() at capture)"""
+        self._update_latency(send_seconds)
+        now = time.monotonic()
+        with self._lock:
+            self._sent_times.append(now)
+            self._latencies.append(now - captured_at)
+            self.bytes_sent += frame_bytes
+
+    def record_failure(self, send_seconds: float):
+        """A failed send counts as congestion (at least twice the target latency)"""
+        self._update_latency(max(send_seconds, self.target_latency * 2))
+
+    def _update_latency(self, send_seconds: float):
+        with self._lock:
+            if self._send_latency is None:
+                self._send_latency = send_seconds
+            else:
+                self._send_latency = 0.7 * self._send_latency + 0.3 * send_seconds
+
+    def record_overwrite(self):
+        """The sender fell behind and a frame was replaced in the slot"""
+        with self._lock:
+            self._window_overwrites += 1
+
+    def adjust(self) -> bool:
+        """Re-evaluate settings once per adjust interval; returns True if anything changed"""
+        now = time.monotonic()
+        with self._lock:
+            if now - self._window_started < self.adjust_interval or self._send_latency is None:
+                return False
+
+            congested = self._send_latency > self.target_latency or self._window_overwrites > 0
+            headroom = self._send_latency < self.target_latency * 0.5 and self._window_overwrites == 0
+            self._window_started = now
+            self._window_overwrites = 0
+
+            if congested:
+                return self._step_down()
+            if headroom:
+                return self._step_up()
+            return False
+
+    def _step_down(self) -> bool:
+        if self.quality > self.min_quality:
+            self.quality = max(self.min_quality, self.quality - 10)
+        elif self.fps > self.min_fps:
+            self.fps = max(self.min_fps, self.fps * 0.75)
+        elif self._resolution_index < len(self.resolutions) - 1:
+            self._resolution_index += 1
+        else:
+            return False
+        return True
+
+    def _step_up(self) -> bool:
+        if self._resolution_index > 0:
+            self._resolution_index -= 1
+        elif self.fps < self.max_fps:
+            self.fps = min(self.max_fps, self.fps * 1.25 + 0.5)
+        elif self.quality < self.max_quality:
+            self.quality = min(self.max_quality, self.quality + 5)
+        else:
+            return False
+        return True
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Achieved fps (last ~120 frames) and capture-to-sent latency"""
+        with self._lock:
+            sent = list(self._sent_times)
+            latencies = list(self._latencies)
+            achieved_fps = 0.0
+            if len(sent) > 1 and sent[-1] > sent[0]:
+                achieved_fps = (len(sent) - 1) / (sent[-1] - sent[0])
+            return {
+                'achieved_fps': round(achieved_fps, 2),
+                'target_fps': round(self.fps, 2),
+                'resolution': '%dx%d' % self.resolution,
+                'quality': self.quality,
+                'send_latency': self._send_latency or 0.0,
+                'latency_avg': sum(latencies) / len(latencies) if latencies else 0.0,
+                'latency_max': max(latencies) if latencies else 0.0,
+                'bytes_sent': self.bytes_sent
+            }
@@ -16,16 +16,43 @@ import traceback
 # Add src to path for imports
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 from core.config import Config
+from .stream_controller import AdaptiveStreamController, LatestFrameSlot
+from .tile_delta import TileDeltaEncoder, pack_delta
+from .stream_quality import DEFAULT_QUALITY, STREAM_QUALITY_PROFILES, resolve_quality_profile
 
 class StreamHandler:
     def __init__(self, api_client):
         self.api_client = api_client
         self.is_streaming = False
         self.video_streaming = False
-        self.stream_quality = 'medium'
+        self.quality_profile = (resolve_quality_profile(getattr(Config, 'STREAM_DEFAULT_QUALITY', DEFAULT_QUALITY))
+                                or STREAM_QUALITY_PROFILES[DEFAULT_QUALITY])
+        self.stream_quality = self.quality_profile.name
         self.sequence = 0
+        self.server_requested = False  # streaming was started by a server command (not auto-start)
         self.video_thread = None
+        self.sender_thread = None
         self.chunks_sent = 0
+        self.chunks_delivered = 0
+        self.deltas_sent = 0
+        # Sequence of the keyframe the server holds; deltas patch it and stay
+        # valid only while every frame since then reached the server
+        self._keyframe_sequence = None
+
+        # Capture -> send hand-off keeps only the newest frame; the controller
+        # adapts fps/quality/resolution (within the quality profile) to how fast frames actually leave
+        self.frame_slot = LatestFrameSlot()
+        self.controller = AdaptiveStreamController(
+            target_latency=getattr(Config, 'STREAM_TARGET_LATENCY', 0.25),
+            **self.quality_profile.controller_bounds()
+        )
+
+        # Dirty-tile deltas; keyframes periodically, on quality change and after a lost frame
+        self.delta_enabled = getattr(Config, 'STREAM_DELTA_ENABLED', True)
+        self.encoder = TileDeltaEncoder(
+            tile_size=getattr(Config, 'STREAM_TILE_SIZE', 64),
+            keyframe_interval=getattr(Config, 'STREAM_KEYFRAME_INTERVAL', 10)
+        )
 
         # Enhanced logging
         self.logger = logging.getLogger(f"SimpleStreamHandler-{Config.CLIENT_ID}")
@@ -48,38 +75,51 @@ class StreamHandler:
         else:
             self.logger.info("Waiting for manual server requests...")
 
-        # Super simple main loop
-        loop_count = 0
+        # Check server commands with If-None-Match: an unchanged command is an
+        # empty 304. A server that advertises X-Long-Poll holds the check until
+        # the command changes, so the next one goes out straight away; otherwise
+        # checks stay at the 15 s interval
+        etag = None
+        error_delay = 5
+        poll_interval = getattr(Config, 'STREAM_POLL_INTERVAL', 15)
+        long_poll_wait = getattr(Config, 'STREAM_LONG_POLL_WAIT', 20)
         while True:
             try:
-                loop_count += 1
-                
-                if loop_count % 20 == 0:  # Log less frequently
-                    self.logger.info(f"Super simple loop #{loop_count} - streaming: {self.is_streaming}")
-                
-                # Simple server check only
-                try:
-                    response = self.api_client.get(f"/api/stream/request/{Config.CLIENT_ID}")
-                    if response and response.get('quality') and not self.is_streaming:
-                        self.logger.info("Manual start requested from server")
-                        self.is_streaming = True
-                        self.video_streaming = True
-                        self._start_simple_worker()
-                    elif self.is_streaming and not response:
-                        self.logger.info("Stop requested from server")
-                        self._stop_simple_worker()
-                except Exception as e:
-                    # Just ignore errors silently
-                    pass
-                
-                time.sleep(15)  # Longer interval - 15 seconds
-                
+                response, etag, held = self.api_client.get_if_changed(
+                    f"/api/stream/request/{Config.CLIENT_ID}", etag, wait=long_poll_wait)
+                error_delay = 5
+                if response is not None:
+                    self._apply_stream_command(response)
+                if not held:
+                    time.sleep(poll_interval)
+
             except KeyboardInterrupt:
                 self.logger.info("Interrupted by user")
                 break
             except Exception as e:
-                self.logger.error(f"Main loop error: {e}")
-                time.sleep(20)
+                self.logger.debug(f"Stream command poll failed: {e}")
+                time.sleep(error_delay)
+                error_delay = min(60, error_delay * 2)
+
+    def _apply_stream_command(self, response):
+        """Start, stop or re-tune streaming from the server's stream request"""
+        # Idle answer is {'streaming': False}; an active request carries a quality
+        active = bool(response.get('quality')) and response.get('streaming', True) is not False
+
+        if active:
+            # Applied live - the worker keeps running
+            self.set_quality(response)
+            if not self.is_streaming:
+                self.logger.info("Manual start requested from server")
+                self.server_requested = True
+                self.is_streaming = True
+                self.video_streaming = True
+                self._start_simple_worker()
+        elif self.is_streaming and self.server_requested:
+            # Auto-started streams are not stopped by an idle server request
+            self.logger.info("Stop requested from server")
+            self.server_requested = False
+            self._stop_simple_worker()
 
     def _start_simple_worker(self):
         """Start ONLY MSS worker - no FFmpeg complexity"""
@@ -95,6 +135,14 @@ class StreamHandler:
         )
         self.video_thread.start()
 
+        if not (self.sender_thread and self.sender_thread.is_alive()):
+            self.sender_thread = threading.Thread(
+                target=self._frame_sender,
+                daemon=True,
+                name=f"StreamSender-{Config.CLIENT_ID}"
+            )
+            self.sender_thread.start()
+
     def _stop_simple_worker(self):
         """Stop worker"""
         self.is_streaming = False
@@ -106,8 +154,6 @@ class StreamHandler:
         self.logger.info("=== SIMPLE MSS WORKER STARTING ===")
         
         try:
-            frame_interval = 1.0 / 15  # 15 FPS
-            
             with mss.mss() as sct:
                 monitor = sct.monitors[1]  # Primary monitor
                 frame_count = 0
@@ -115,29 +161,43 @@ class StreamHandler:
                 while self.video_streaming:
                     try:
                         frame_start = time.time()
+                        captured_at = time.monotonic()
+                        resolution, quality, _ = self.controller.settings()
                         
-                        # Simple screen capture
+                        # Screen capture (mss allocates a new BGRA buffer per grab; the encoder
+                        # wraps it in place but resizing/cropping for JPEG copies the pixels)
                         img = sct.grab(monitor)
-                        img_pil = Image.frombytes('RGB', img.size, img.bgra, 'raw', 'BGRX')
-                        
-                        # Simple resize to 1280x720
-                        img_pil = img_pil.resize((1280, 720), Image.Resampling.LANCZOS)
 
-                        # Convert to JPEG
-                        buffer = io.BytesIO()
-                        img_pil.save(buffer, format='JPEG', quality=70)
-                        
-                        # Send chunk
-                        self._simple_send_chunk(buffer.getvalue())
-                        frame_count += 1
+                        # An older frame the sender has not taken yet is replaced, never queued;
+                        # its dirty tiles are folded into this frame so the viewer loses nothing
+                        carry = None
+                        unsent = self.frame_slot.take(timeout=0)
+                        if unsent is not None:
+                            self.controller.record_overwrite()
+                            if unsent.keyframe:
+                                self.encoder.request_keyframe()
+                            else:
+                                carry = unsent.dirty
+
+                        frame = self.encoder.encode(
+                            img.raw, img.size, resolution, quality,
+                            resample=self.quality_profile.resample_filter,
+                            allow_delta=self.delta_enabled, carry=carry, captured_at=captured_at
+                        )
+                        if frame is not None:
+                            self.frame_slot.put(frame)
+                            frame_count += 1
+
+                        if self.controller.adjust():
+                            self.logger.debug(f"Stream adapted: {self.controller.get_statistics()}")
                         
                         # Simple logging every 100 frames
                         if frame_count % 100 == 0:
                             self.logger.info(f"Simple MSS: {frame_count} frames processed")
                         
-                        # Simple frame rate control
+                        # Frame rate control at the controller's current fps
                         elapsed = time.time() - frame_start
-                        sleep_time = max(0, frame_interval - elapsed)
+                        sleep_time = max(0, self.controller.frame_interval - elapsed)
                         if sleep_time > 0:
                             time.sleep(sleep_time)
                         
@@ -149,37 +209,115 @@ class StreamHandler:
             self.logger.error(f"Simple MSS worker failed: {e}")
         finally:
             self.video_streaming = False
+            self.frame_slot.clear()
             self.logger.info("Simple MSS worker finished")
 
-    def _simple_send_chunk(self, chunk_data):
-        """Send video chunk - SIMPLE version with no hanging"""
+    def _frame_sender(self):
+        """Send the newest captured frame, timing each send for the controller"""
+        while self.video_streaming:
+            frame = self.frame_slot.take(timeout=0.5)
+            if frame is None:
+                continue
+
+            started = time.monotonic()
+            if self._send_frame(frame):
+                self.controller.record_send(time.monotonic() - started, frame.byte_size, frame.captured_at)
+            else:
+                self.controller.record_failure(time.monotonic() - started)
+
+    def _send_frame(self, frame):
+        """Send a keyframe as a JPEG chunk, or a delta packed against the server's keyframe"""
+        if frame.keyframe:
+            return self._simple_send_chunk(frame.jpeg)
+
+        if self._keyframe_sequence is None:
+            # The delta builds on a frame the server never got - the next frame must be complete
+            self.request_keyframe()
+            return False
+        width, height = frame.size
+        message = pack_delta(frame.tiles, self.sequence, width, height)
+        return self._simple_send_chunk(message, delta=True)
+
+    def set_quality(self, spec):
+        """
+        Switch quality tier live (name or server dict incl. 'custom' settings).
+        The running worker picks the new bounds up on its next frame.
+        """
+        profile = resolve_quality_profile(spec, base=self.quality_profile)
+        if profile is None:
+            self.logger.warning(f"Ignoring unknown stream quality: {spec}")
+            return False
+        if profile == self.quality_profile:
+            return True
+
+        self.quality_profile = profile
+        self.stream_quality = profile.name
+        self.controller.set_bounds(**profile.controller_bounds())
+        self.request_keyframe()
+        self.logger.info(f"Stream quality set to {profile.name}")
+        return True
+
+    def request_keyframe(self):
+        """Send the next frame in full (viewer joined or stream socket reconnected)"""
+        self.encoder.request_keyframe()
+
+    def _simple_send_chunk(self, chunk_data, delta=False):
+        """
+        Send one frame as an HTTP chunk: a JPEG keyframe, or (delta=True) a packed
+        delta against the keyframe the server holds. A failed or refused frame
+        breaks the delta chain, so the next frame is sent in full.
+        """
+        sequence = self.sequence
         try:
             encoded_chunk = base64.b64encode(chunk_data).decode('utf-8')
-            
+
             payload = {
-                'chunk': encoded_chunk,
-                'sequence': self.sequence,
-                'quality': 'medium',
+                'sequence': sequence,
+                'quality': self.stream_quality,
             }
-            
+            if delta:
+                payload['delta'] = encoded_chunk
+                payload['base'] = self._keyframe_sequence
+            else:
+                payload['chunk'] = encoded_chunk
+
             self.sequence += 1
             self.chunks_sent += 1
-            
-            # Simple send with timeout (no waiting for response)
-            try:
-                self.api_client.post(f"/api/stream/chunk/{Config.CLIENT_ID}", payload)
-                
+
+            # Single short attempt - no retries that would stall the capture loop
+            status = self.api_client.send_stream_chunk(Config.CLIENT_ID, payload)
+            if status in (200, 201):
+                self.chunks_delivered += 1
+                if delta:
+                    self.deltas_sent += 1
+                else:
+                    self._keyframe_sequence = sequence
                 if self.chunks_sent % 50 == 0:
                     self.logger.info(f"Simple chunks sent: {self.chunks_sent}")
-                    
-            except Exception as network_error:
-                # Ignore network errors to prevent hanging
-                if self.chunks_sent % 20 == 0:
-                    self.logger.debug(f"Simple network error: {network_error}")
-            
+                return True
+            if status == 409:
+                self.logger.debug("Server has no matching keyframe for the delta - sending a keyframe next")
+
         except Exception as e:
             self.logger.error(f"Simple chunk error: {e}")
 
+        self._keyframe_sequence = None
+        self.request_keyframe()
+        return False
+
+    def get_stream_statistics(self):
+        """Achieved fps, capture-to-send latency and current adaptive settings"""
+        stats = self.controller.get_statistics()
+        stats.update(self.encoder.get_statistics())
+        stats.update({
+            'streaming': self.video_streaming,
+            'frames_sent': self.chunks_sent,
+            'chunks_delivered': self.chunks_delivered,
+            'deltas_sent': self.deltas_sent,
+            'frames_replaced': self.frame_slot.replaced,
+        })
+        return stats
+
     # Legacy compatibility methods
     def start_video_streaming(self):
         self._start_simple_worker()
@@ -0,0 +1,94 @@
+"""
+Stream Quality Profiles
+Named tiers (low / medium / high / custom) setting the live stream's
+resolution, frame rate and JPEG quality bounds and resampling filter.
+The adaptive controller moves within the bounds of the active profile.
+"""
+
+from dataclasses import dataclass, replace
+from typing import Any, Dict, Optional, Tuple
+
+from PIL import Image
+
+RESAMPLE_FILTERS = {
+    'nearest': Image.Resampling.NEAREST,
+    'bilinear': Image.Resampling.BILINEAR,
+    'bicubic': Image.Resampling.BICUBIC,
+    'lanczos': Image.Resampling.LANCZOS,
+}
+
+
+@dataclass(frozen=True)
+class StreamQualityProfile:
+    """Bounds for one quality tier"""
+    name: str
+    max_resolution: Tuple[int, int]
+    min_resolution: Tuple[int, int]
+    max_fps: float
+    min_fps: float
+    max_quality: int
+    min_quality: int
+    resample: str = 'lanczos'
+
+    @property
+    def resample_filter(self):
+        return RESAMPLE_FILTERS.get(self.resample, Image.Resampling.LANCZOS)
+
+    def controller_bounds(self) -> Dict[str, Any]:
+        """Keyword arguments for AdaptiveStreamController.set_bounds"""
+        return {
+            'max_resolution': self.max_resolution,
+            'min_resolution': self.min_resolution,
+            'max_fps': self.max_fps,
+            'min_fps': self.min_fps,
+            'max_quality': self.max_quality,
+            'min_quality': self.min_quality,
+        }
+
+
+STREAM_QUALITY_PROFILES: Dict[str, StreamQualityProfile] = {
+    'low': StreamQualityProfile('low', (854, 480), (426, 240), 8, 1, 50, 25, 'bilinear'),
+    'medium': StreamQualityProfile('medium', (1280, 720), (640, 360), 15, 2, 70, 35, 'lanczos'),
+    'high': StreamQualityProfile('high', (1920, 1080), (960, 540), 24, 5, 85, 50, 'lanczos'),
+}
+DEFAULT_QUALITY = 'medium'
+
+
+def resolve_quality_profile(spec, base: Optional[StreamQualityProfile] = None) -> Optional[StreamQualityProfile]:
+    """
+    Turn a server quality selection into a profile.
+
+    spec is a tier name ('low', 'medium', 'high') or a dict with 'quality'
+    and, for 'custom', any of width, height, fps, jpeg_quality and resample
+    overriding the base (default: medium) tier. Returns None if unrecognised.
+    """
+    if isinstance(spec, str):
+        spec = {'quality': spec}
+    if not isinstance(spec, dict):
+        return None
+
+    name = str(spec.get('quality') or '').lower()
+    if name in STREAM_QUALITY_PROFILES:
+        return STREAM_QUALITY_PROFILES[name]
+    if name != 'custom':
+        return None
+
+    settings = spec.get('settings') if isinstance(spec.get('settings'), dict) else spec
+    profile = replace(base or STREAM_QUALITY_PROFILES[DEFAULT_QUALITY], name='custom')
+    try:
+        if settings.get('width') and settings.get('height'):
+            size = (int(settings['width']), int(settings['height']))
+            profile = replace(profile, max_resolution=size,
+                              min_resolution=(min(size[0], profile.min_resolution[0]),
+                                              min(size[1], profile.min_resolution[1])))
+        if settings.get('fps'):
+            fps = max(1.0, min(30.0, float(settings['fps'])))
+            profile = replace(profile, max_fps=fps, min_fps=min(profile.min_fps, fps))
+        if settings.get('jpeg_quality'):
+            quality = max(10, min(95, int(settings['jpeg_quality'])))
+            profile = replace(profile, max_quality=quality, min_quality=min(profile.min_quality, quality))
+        if settings.get('resample') in RESAMPLE_FILTERS:
+            profile = replace(profile, resample=settings['resample'])
+    except (TypeError, ValueError):
+        return None
+    return profile
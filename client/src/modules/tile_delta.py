@@ -0,0 +1,223 @@
+"""
+Tile Delta Module
+Dirty-rectangle encoding for the live stream: the BGRA capture is compared
+with the previous one in 64x64 tiles (vectorized with NumPy), and only the
+changed tiles are JPEG-encoded. Full keyframes are sent periodically, on
+request (quality change / lost frame) and whenever deltas are not possible.
+Deltas travel as packed TJD1 frames (pack_delta / unpack_delta).
+NumPy is optional - without it every frame is a keyframe.
+"""
+
+import io
+import time
+import struct
+import logging
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+from PIL import Image
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+    logging.debug("numpy not available - live stream sends full frames only")
+
+# Delta frame: header, then per tile TILE_HEADER + JPEG bytes (viewer patches its canvas)
+# magic, sequence, capture timestamp, full width, full height, tile count
+DELTA_HEADER = struct.Struct('!4sIdHHH')
+DELTA_MAGIC = b'TJD1'
+# x, y, width, height, jpeg length
+TILE_HEADER = struct.Struct('!HHHHI')
+
+
+def pack_delta(tiles, sequence, width, height, timestamp=None):
+    """Build a binary delta frame from (x, y, w, h, jpeg_bytes) tiles"""
+    parts = [DELTA_HEADER.pack(DELTA_MAGIC, sequence & 0xFFFFFFFF,
+                               time.time() if timestamp is None else timestamp,
+                               width & 0xFFFF, height & 0xFFFF, len(tiles))]
+    for x, y, w, h, jpeg in tiles:
+        parts.append(TILE_HEADER.pack(x, y, w, h, len(jpeg)))
+        parts.append(jpeg)
+    return b''.join(parts)
+
+
+def unpack_delta(message):
+    """Split a delta frame into (sequence, timestamp, width, height, [(x, y, w, h, jpeg_bytes), ...])"""
+    magic, sequence, timestamp, width, height, count = DELTA_HEADER.unpack_from(message)
+    if magic != DELTA_MAGIC:
+        raise ValueError("Not a Tenjo delta frame")
+
+    tiles = []
+    offset = DELTA_HEADER.size
+    for _ in range(count):
+        x, y, w, h, length = TILE_HEADER.unpack_from(message, offset)
+        offset += TILE_HEADER.size
+        if offset + length > len(message):
+            raise ValueError("Truncated Tenjo delta frame")
+        tiles.append((x, y, w, h, bytes(message[offset:offset + length])))
+        offset += length
+    return sequence, timestamp, width, height, tiles
+
+
+@dataclass
+class StreamFrame:
+    """One encoded live frame: a full JPEG keyframe or a list of changed tiles"""
+    keyframe: bool
+    size: Tuple[int, int]  # output (width, height)
+    captured_at: float
+    jpeg: Optional[bytes] = None
+    tiles: List[Tuple[int, int, int, int, bytes]] = field(default_factory=list)  # x, y, w, h, jpeg
+    dirty: object = None  # tile grid (numpy bool array) for merging an unsent delta
+
+    @property
+    def byte_size(self) -> int:
+        if self.keyframe:
+            return len(self.jpeg or b'')
+        return sum(len(tile[4]) for tile in self.tiles)
+
+
+class TileDeltaEncoder:
+    """Encodes captures as keyframes or dirty-tile deltas against the previous capture"""
+
+    def __init__(self, tile_size: int = 64, keyframe_interval: float = 10.0, max_dirty_ratio: float = 0.5):
+        self.tile_size = tile_size
+        self.keyframe_interval = keyframe_interval
+        self.max_dirty_ratio = max_dirty_ratio
+
+        self._prev_raw = None
+        self._prev_src_size = None
+        self._prev_out_size = None
+        self._last_keyframe = 0.0
+        self._keyframe_requested = True
+
+        self.keyframes = 0
+        self.delta_frames = 0
+        self.skipped_frames = 0
+        self.tiles_sent = 0
+
+    @property
+    def available(self) -> bool:
+        return NUMPY_AVAILABLE
+
+    def request_keyframe(self):
+        """Next frame is sent in full (quality changed, delta lost)"""
+        self._keyframe_requested = True
+
+    def encode(self, raw, src_size, out_size, quality, resample=Image.Resampling.LANCZOS,
+               allow_delta=True, carry=None, captured_at=None) -> Optional[StreamFrame]:
+        """
+        Encode one BGRA capture. Returns None when nothing changed and no
+        keyframe is due. carry is the dirty grid of an unsent delta this frame
+        replaces, so its tiles are re-encoded from the current pixels.
+        """
+        captured_at = time.monotonic() if captured_at is None else captured_at
+        now = time.monotonic()
+
+        keyframe = (
+            not allow_delta
+            or not NUMPY_AVAILABLE
+            or self._keyframe_requested
+            or self._prev_raw is None
+            or src_size != self._prev_src_size
+            or out_size != self._prev_out_size
+            or now - self._last_keyframe >= self.keyframe_interval
+        )
+
+        dirty = None
+        if not keyframe:
+            dirty = self._dirty_tiles(raw, src_size)
+            if carry is not None and carry.shape == dirty.shape:
+                dirty |= carry
+            if not dirty.any():
+                self._prev_raw = raw
+                self.skipped_frames += 1
+                return None
+            if dirty.mean() > self.max_dirty_ratio:
+                keyframe = True
+
+        image = Image.frombuffer('RGB', src_size, raw, 'raw', 'BGRX', 0, 1)
+        self._prev_raw = raw
+        self._prev_src_size = src_size
+        self._prev_out_size = out_size
+
+        if keyframe:
+            self._keyframe_requested = False
+            self._last_keyframe = now
+            self.keyframes += 1
+            return StreamFrame(
+                keyframe=True,
+                size=out_size,
+                captured_at=captured_at,
+                jpeg=self._jpeg(image.resize(out_size, resample), quality)
+            )
+
+        tiles = [
+            (x, y, crop.width, crop.height, self._jpeg(crop, quality))
+            for x, y, crop in self._crop_dirty(image, dirty, src_size, out_size, resample)
+        ]
+        self.delta_frames += 1
+        self.tiles_sent += len(tiles)
+        return StreamFrame(keyframe=False, size=out_size, captured_at=captured_at, tiles=tiles, dirty=dirty)
+
+    def _dirty_tiles(self, raw, src_size):
+        """Boolean (rows, cols) grid of tiles that differ from the previous capture"""
+        width, height = src_size
+        ts = self.tile_size
+        # One uint32 per BGRA pixel - a single vectorized compare per pixel
+        current = np.frombuffer(raw, dtype=np.uint32, count=width * height).reshape(height, width)
+        previous = np.frombuffer(self._prev_raw, dtype=np.uint32, count=width * height).reshape(height, width)
+        changed = current != previous
+
+        row_starts = np.arange(0, height, ts)
+        col_starts = np.arange(0, width, ts)
+        rows = np.logical_or.reduceat(changed, row_starts, axis=0)
+        return np.logical_or.reduceat(rows, col_starts, axis=1)
+
+    def _crop_dirty(self, image, dirty, src_size, out_size, resample):
+        """Yield (out_x, out_y, resized crop) for each horizontal run of dirty tiles"""
+        src_w, src_h = src_size
+        out_w, out_h = out_size
+        ts = self.tile_size
+
+        def scale_x(x):
+            return x * out_w // src_w
+
+        def scale_y(y):
+            return y * out_h // src_h
+
+        for row, cols in enumerate(dirty):
+            y0, y1 = row * ts, min(src_h, (row + 1) * ts)
+            col = 0
+            while col < len(cols):
+                if not cols[col]:
+                    col += 1
+                    continue
+                start = col
+                while col < len(cols) and cols[col]:
+                    col += 1
+                x0, x1 = start * ts, min(src_w, col * ts)
+
+                # Scale tile edges with the same rounding so neighbouring tiles meet exactly
+                ox0, ox1, oy0, oy1 = scale_x(x0), scale_x(x1), scale_y(y0), scale_y(y1)
+                if ox1 <= ox0 or oy1 <= oy0:
+                    continue
+                crop = image.crop((x0, y0, x1, y1)).resize((ox1 - ox0, oy1 - oy0), resample)
+                yield ox0, oy0, crop
+
+    @staticmethod
+    def _jpeg(image, quality) -> bytes:
+        buffer = io.BytesIO()
+        image.save(buffer, format='JPEG', quality=quality)
+        return buffer.getvalue()
+
+    def get_statistics(self):
+        return {
+            'delta_available': NUMPY_AVAILABLE,
+            'keyframes': self.keyframes,
+            'delta_frames': self.delta_frames,
+            'skipped_frames': self.skipped_frames,
+            'tiles_sent': self.tiles_sent
+        }
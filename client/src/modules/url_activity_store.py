@@ -0,0 +1,244 @@
+"""
+URL Activity Store
+Compact in-memory table of per-URL browsing activity for the browser tracker:
+slotted records with interned browser/domain strings and integer epoch
+timestamps, an index of active records so duration updates skip idle ones,
+a min-heap of expiry deadlines so cleanup only touches expired records, and
+dirty flags so only changed records are sent to the server.
+"""
+
+import sys
+import uuid
+import heapq
+import threading
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+class UrlActivity:
+    """Time spent on one URL in one browser (timestamps are epoch seconds)"""
+
+    __slots__ = ('activity_id', 'browser_name', 'url', 'domain', 'title', 'start_time', 'last_seen',
+                 'end_time', 'total_time', 'focused', 'is_active', 'clicks', 'keystrokes', 'scroll_events',
+                 'category', 'sent_full', 'dirty', 'generation')
+
+    def __init__(self, browser_name: str, url: str, domain: str, title: str, now: int):
+        self.activity_id = uuid.uuid4().hex  # one id per active span; delta updates refer to it
+        self.browser_name = browser_name
+        self.url = url
+        self.domain = domain
+        self.title = title
+        self.start_time = now
+        self.last_seen = now
+        self.end_time: Optional[int] = None
+        self.total_time = 0
+        self.focused = 0.0  # foreground seconds, when durations come from focus tracking
+        self.is_active = True
+        self.clicks = 0
+        self.keystrokes = 0
+        self.scroll_events = 0
+        self.category: Optional[str] = None  # domain category, None when no rule matched
+        self.sent_full = False  # server has the full record; later changes go as deltas
+        self.dirty = True  # changed since last sent
+        self.generation = 0  # bumped on each deactivation; stale heap entries are skipped
+
+    @property
+    def key(self) -> Tuple[str, str]:
+        return self.browser_name, self.url
+
+
+class UrlActivityStore:
+    """
+    URL activities keyed on (browser, url).
+
+    A record becomes inactive when not seen for inactive_after seconds. Inactive
+    records are dropped once they are older than retain_seconds, or right away
+    if they lasted under min_duration seconds (noise). The deadline is pushed on
+    a heap when a record is deactivated, so expire() is O(k log n) in the number
+    of records actually expiring rather than a rebuild of the whole table.
+    """
+
+    def __init__(self, inactive_after: int = 30, retain_seconds: int = 300, min_duration: int = 5):
+        self.inactive_after = inactive_after
+        self.retain_seconds = retain_seconds
+        self.min_duration = min_duration
+
+        self._lock = threading.Lock()
+        self._records: Dict[Tuple[str, str], UrlActivity] = {}
+        self._active: Dict[Tuple[str, str], UrlActivity] = {}
+        self._expiry: List[Tuple[int, int, int, Tuple[str, str]]] = []  # (deadline, seq, generation, key)
+        self._seq = 0
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    @property
+    def active_count(self) -> int:
+        return len(self._active)
+
+    def touch(self, browser_name: str, url: str, domain: str, title: str, now: int,
+              category: Optional[str] = None) -> Tuple[UrlActivity, bool]:
+        """
+        Record that url is open now. Returns (record, reactivated) - reactivated
+        when an inactive record came back, which restarts its duration.
+        """
+        key = (browser_name, url)
+        with self._lock:
+            record = self._records.get(key)
+            if record is None:
+                record = UrlActivity(sys.intern(browser_name), url, sys.intern(domain), title, now)
+                record.category = category
+                self._records[key] = record
+                self._active[key] = record
+                return record, False
+
+            record.last_seen = now
+            record.title = title  # Update title in case it changed
+            record.category = category  # Rules may have been reloaded
+            if record.is_active:
+                return record, False
+
+            # FIX #12: user came back to the same URL - start a new active span
+            record.activity_id = uuid.uuid4().hex
+            record.is_active = True
+            record.start_time = now
+            record.total_time = 0
+            record.focused = 0.0
+            record.end_time = None
+            record.clicks = record.keystrokes = record.scroll_events = 0
+            # FIX #14: reactivated activity is sent again (as a new record)
+            record.sent_full = False
+            record.dirty = True
+            self._active[key] = record
+            return record, True
+
+    def update_durations(self, now: int, stats: Optional[Dict] = None, wall_clock: bool = True):
+        """
+        Deactivate records not seen for inactive_after seconds. With wall_clock,
+        active records are also credited the whole time since they started and
+        the given input stats; otherwise durations come from credit_focus().
+        """
+        cutoff = now - self.inactive_after
+        with self._lock:
+            if not wall_clock:
+                for key, record in [item for item in self._active.items() if item[1].last_seen < cutoff]:
+                    self._deactivate(key, record)
+                return
+
+            if stats is not None:
+                clicks = stats.get('mouse_clicks', 0)
+                keystrokes = stats.get('key_presses', 0)
+                scroll_events = stats.get('scroll_events', 0)
+
+            idle = []
+            for key, record in self._active.items():
+                if record.last_seen < cutoff:
+                    idle.append((key, record))
+                    continue
+
+                total_time = now - record.start_time
+                if total_time != record.total_time:
+                    record.total_time = total_time
+                    record.dirty = True
+                if stats is not None and (record.clicks != clicks or record.keystrokes != keystrokes
+                                          or record.scroll_events != scroll_events):
+                    record.clicks = clicks
+                    record.keystrokes = keystrokes
+                    record.scroll_events = scroll_events
+                    record.dirty = True
+
+            for key, record in idle:
+                self._deactivate(key, record)
+
+    def credit_focus(self, browser_name: str, title: str, seconds: float,
+                     clicks: int = 0, keystrokes: int = 0, scroll_events: int = 0) -> bool:
+        """
+        Credit foreground time and input to the active record of browser_name
+        whose title the focused window shows: an exact title match, else the
+        longest record title the window title starts with (window titles carry
+        a browser suffix such as " - Google Chrome"). False if none matches.
+        """
+        if not title:
+            return False
+        with self._lock:
+            best = None
+            for record in self._active.values():
+                # History-parsed records name the profile too, e.g. "Chrome (Profile 1)"
+                if not record.title or not (record.browser_name == browser_name
+                                            or record.browser_name.startswith(browser_name + ' (')):
+                    continue
+                if record.title == title:
+                    best = record
+                    break
+                if title.startswith(record.title) and (best is None or len(record.title) > len(best.title)):
+                    best = record
+            if best is None:
+                return False
+
+            best.focused += seconds
+            best.total_time = int(best.focused)
+            best.clicks += clicks
+            best.keystrokes += keystrokes
+            best.scroll_events += scroll_events
+            best.dirty = True
+            return True
+
+    def _deactivate(self, key, record: UrlActivity):
+        record.is_active = False
+        record.end_time = record.last_seen
+        record.dirty = True
+        record.generation += 1
+        del self._active[key]
+
+        if record.total_time < self.min_duration:
+            deadline = record.last_seen
+        else:
+            deadline = record.last_seen + self.retain_seconds
+        self._seq += 1
+        heapq.heappush(self._expiry, (deadline, self._seq, record.generation, key))
+
+    def expire(self, now: int) -> int:
+        """Drop inactive records past their deadline; returns how many were removed"""
+        removed = 0
+        with self._lock:
+            while self._expiry and self._expiry[0][0] < now:
+                _, _, generation, key = heapq.heappop(self._expiry)
+                record = self._records.get(key)
+                # Reactivated since (or already gone): this deadline no longer applies
+                if record is None or record.is_active or record.generation != generation:
+                    continue
+                del self._records[key]
+                removed += 1
+        return removed
+
+    def changed(self) -> List[UrlActivity]:
+        """Records that changed since they were last marked sent"""
+        with self._lock:
+            return [record for record in self._records.values() if record.dirty]
+
+    def mark_sent(self, records: List[UrlActivity], activity_ids: List[str]):
+        """
+        Records were delivered as of activity_ids (their ids when the payload was
+        built); a record whose span restarted since keeps its pending changes.
+        """
+        with self._lock:
+            for record, activity_id in zip(records, activity_ids):
+                if record.activity_id == activity_id:
+                    record.sent_full = True
+                    record.dirty = False
+
+    def mark_unknown(self, activity_ids):
+        """Server has no record of these activities - send them in full next time"""
+        unknown = set(activity_ids)
+        with self._lock:
+            for record in self._records.values():
+                if record.activity_id in unknown:
+                    record.sent_full = False
+                    record.dirty = True
+
+    def values(self) -> List[UrlActivity]:
+        """Snapshot of all records"""
+        with self._lock:
+            return list(self._records.values())
+
+    def __iter__(self) -> Iterator[UrlActivity]:
+        return iter(self.values())
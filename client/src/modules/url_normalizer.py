@@ -0,0 +1,134 @@
+"""
+URL Normalizer
+Shared, memoised URL canonicalisation for the browser tracker and history
+parser. A URL is split once into (canonical_url, domain, registrable_domain)
+and the interned result is kept in a bounded LRU, so the same open tabs seen
+every cycle are not re-parsed.
+
+Canonical form: lowercase scheme and host, no 'www.', no credentials, no
+fragment, and no tracking query parameters (utm_*, gclid, fbclid, ...);
+the remaining query is left exactly as it was.
+"""
+
+import sys
+import threading
+from functools import lru_cache
+from typing import Dict, NamedTuple, Optional
+from urllib.parse import urlsplit, urlunsplit
+
+# Query parameters that only identify the campaign / click, never the page
+TRACKING_PARAMS = frozenset((
+    'gclid', 'gclsrc', 'dclid', 'fbclid', 'msclkid', 'yclid', 'twclid', 'ttclid', 'igshid',
+    'mc_cid', 'mc_eid', '_ga', '_gl', '_hsenc', '_hsmi', 'mkt_tok', 'ref_src', 'oly_enc_id', 'oly_anon_id',
+))
+TRACKING_PREFIXES = ('utm_',)
+
+# Second-level labels under which ccTLDs register names (example.co.id, example.com.au)
+_GENERIC_SLDS = frozenset(('co', 'com', 'net', 'org', 'gov', 'edu', 'ac', 'go', 'or', 'web', 'sch', 'my',
+                           'biz', 'ne', 'mil', 'gob', 'nic', 'ltd', 'plc'))
+
+UNKNOWN_DOMAIN = 'unknown'
+
+
+class ParsedUrl(NamedTuple):
+    """Canonical URL plus its host (without www.) and registrable domain"""
+    canonical_url: str
+    domain: str
+    registrable_domain: str
+
+
+def registrable_domain(host: str) -> str:
+    """
+    Registrable part of host: the last two labels, or three under a ccTLD
+    second level such as co.id / com.au. An approximation of the public
+    suffix list that covers the domains seen in practice; IPs are returned as-is.
+    """
+    labels = host.split('.')
+    if len(labels) <= 2 or host.replace('.', '').isdigit() or ':' in host:
+        return host
+    if len(labels[-1]) == 2 and labels[-2] in _GENERIC_SLDS:
+        return '.'.join(labels[-3:])
+    return '.'.join(labels[-2:])
+
+
+def _is_tracking_param(pair: str) -> bool:
+    name = pair.split('=', 1)[0].lower()
+    return name in TRACKING_PARAMS or name.startswith(TRACKING_PREFIXES)
+
+
+def normalize_url(url: str) -> ParsedUrl:
+    """Canonicalise url (uncached; see UrlNormalizer)"""
+    url = (url or '').strip()
+    try:
+        parts = urlsplit(url)
+        host = parts.hostname or ''
+        port = parts.port
+    except ValueError:
+        # Malformed (e.g. bad IPv6 literal or port): keep it as it is
+        return ParsedUrl(url, UNKNOWN_DOMAIN, UNKNOWN_DOMAIN)
+
+    if host.startswith('www.'):
+        host = host[4:]
+    if not host:
+        return ParsedUrl(url.split('#', 1)[0], UNKNOWN_DOMAIN, UNKNOWN_DOMAIN)
+
+    netloc = f"[{host}]" if ':' in host else host
+    if port is not None:
+        netloc = f"{netloc}:{port}"
+
+    query = parts.query
+    if query:
+        pairs = query.split('&')
+        kept = [pair for pair in pairs if not _is_tracking_param(pair)]
+        if len(kept) != len(pairs):
+            query = '&'.join(kept)
+
+    domain = sys.intern(host)
+    canonical = urlunsplit((parts.scheme.lower(), netloc, parts.path, query, ''))
+    return ParsedUrl(canonical, domain, sys.intern(registrable_domain(host)))
+
+
+def title_from_domain(domain: str) -> str:
+    """Readable stand-in title for a page without one"""
+    return domain.capitalize() if domain and domain != UNKNOWN_DOMAIN else "Unknown Page"
+
+
+class UrlNormalizer:
+    """normalize_url() behind a bounded LRU, with hit-rate counters"""
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self._parse = lru_cache(maxsize=max_entries)(normalize_url)
+
+    def parse(self, url: str) -> ParsedUrl:
+        return self._parse(url or '')
+
+    def domain(self, url: str) -> str:
+        return self._parse(url or '').domain
+
+    def title(self, url: str) -> str:
+        return title_from_domain(self._parse(url or '').domain)
+
+    def get_statistics(self) -> Dict:
+        info = self._parse.cache_info()
+        lookups = info.hits + info.misses
+        return {
+            'hits': info.hits,
+            'misses': info.misses,
+            'hit_rate': info.hits / lookups if lookups else 0.0,
+            'cached': info.currsize,
+        }
+
+
+_shared_normalizer: Optional[UrlNormalizer] = None
+_shared_normalizer_lock = threading.Lock()
+
+
+def get_url_normalizer() -> UrlNormalizer:
+    """Get the process-wide shared normalizer"""
+    global _shared_normalizer
+    if _shared_normalizer is None:
+        with _shared_normalizer_lock:
+            if _shared_normalizer is None:
+                _shared_normalizer = UrlNormalizer()
+    return _shared_normalizer
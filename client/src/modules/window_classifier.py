@@ -0,0 +1,107 @@
+"""
+Window Classifier
+Maps top-level windows to browsers by owning PID. PIDs are resolved through a
+cache keyed on (pid, create_time) that is seeded from the shared process
+snapshot, so a window enumeration pass does no per-window process lookups.
+The classification itself works on plain (handle, pid, title) tuples and has
+no platform dependencies; the Win32 / X11 enumeration lives with the callers.
+"""
+
+import threading
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import psutil
+
+from .process_snapshot import ProcessSnapshotService, classify_browser
+
+
+class BrowserWindow(NamedTuple):
+    """A top-level window owned by a browser process"""
+    handle: int
+    pid: int
+    browser: str
+    title: str
+
+
+def _psutil_identity(pid: int) -> Optional[Tuple[float, str]]:
+    """(create_time, name) of a live process, None if it is gone or inaccessible"""
+    try:
+        process = psutil.Process(pid)
+        return process.create_time(), process.name()
+    except (psutil.NoSuchProcess, psutil.AccessDenied):
+        return None
+
+
+class BrowserPidCache:
+    """
+    pid -> canonical browser name (or None), classified once per process.
+
+    Entries come from the shared process snapshot whenever its version moves;
+    entries whose (pid, create_time) is no longer in the snapshot are dropped,
+    which handles process exit and PID reuse. A PID newer than the last scan
+    is resolved through `resolve` (psutil by default) and cached until the
+    next snapshot confirms or evicts it; a failed resolution (process gone or
+    inaccessible) is not cached, so the PID is retried rather than pinned to
+    'not a browser' if it is reused before the next scan.
+    """
+
+    def __init__(self, snapshots: ProcessSnapshotService,
+                 resolve: Callable[[int], Optional[Tuple[float, str]]] = _psutil_identity):
+        self.snapshots = snapshots
+        self.resolve = resolve
+        self._lock = threading.Lock()
+        self._entries: Dict[int, Tuple[float, Optional[str]]] = {}  # pid -> (create_time, browser)
+        self._version = None
+        self.hits = 0
+        self.misses = 0
+
+    def sync(self):
+        """Reconcile with the current process snapshot (cheap when nothing changed)"""
+        snapshot = self.snapshots.get_snapshot()
+        with self._lock:
+            if snapshot.version == self._version:
+                return
+            self._version = snapshot.version
+            self._entries = {p.pid: (p.create_time, p.browser) for p in snapshot.processes}
+
+    def browser_of(self, pid: int) -> Optional[str]:
+        """Canonical browser name for the process owning pid, or None"""
+        with self._lock:
+            entry = self._entries.get(pid)
+            if entry is not None:
+                self.hits += 1
+                return entry[1]
+
+        # Started after the last scan: resolve once
+        self.misses += 1
+        identity = self.resolve(pid)
+        if identity is None:
+            return None
+        create_time, name = identity
+        browser = classify_browser(name) if name else None
+        with self._lock:
+            self._entries[pid] = (create_time, browser)
+        return browser
+
+
+def classify_windows(windows: Iterable[Tuple[int, int, str]],
+                     browser_of: Callable[[int], Optional[str]],
+                     browsers: Optional[Iterable[str]] = None) -> List[BrowserWindow]:
+    """
+    Keep the windows owned by browser processes.
+
+    windows are (handle, pid, title) tuples; browser_of maps a pid to a browser
+    name (e.g. BrowserPidCache.browser_of) and is called once per distinct pid.
+    browsers optionally restricts the result to those browser names.
+    """
+    allowed = set(browsers) if browsers is not None else None
+    per_pid: Dict[int, Optional[str]] = {}
+    result = []
+    for handle, pid, title in windows:
+        if pid not in per_pid:
+            browser = browser_of(pid)
+            per_pid[pid] = browser if allowed is None or browser in allowed else None
+        browser = per_pid[pid]
+        if browser:
+            result.append(BrowserWindow(handle, pid, browser, title))
+    return result
@@ -0,0 +1,153 @@
+"""
+X11 Window Enumeration
+Reads top-level windows straight from the window manager's EWMH properties
+(_NET_CLIENT_LIST, _NET_WM_NAME, _NET_WM_PID, _NET_ACTIVE_WINDOW) over the X
+protocol, so the Linux browser tracker needs neither wmctrl nor a fork per
+cycle, and can sleep on PropertyNotify events to follow focus changes.
+python-xlib is optional - without it (or without an X display) callers
+fall back to wmctrl.
+"""
+
+import os
+import select
+import logging
+from typing import List, Optional, Tuple
+
+try:
+    from Xlib import X, display as xdisplay, error as xerror
+    XLIB_AVAILABLE = True
+except ImportError:
+    X = xdisplay = xerror = None
+    XLIB_AVAILABLE = False
+    logging.debug("python-xlib not available - Linux window tracking uses wmctrl")
+
+
+class EwmhWindows:
+    """EWMH view of one X display"""
+
+    def __init__(self, display_name: Optional[str] = None):
+        self.display = xdisplay.Display(display_name)
+        self.root = self.display.screen().root
+        atom = self.display.intern_atom
+        self.NET_CLIENT_LIST = atom('_NET_CLIENT_LIST')
+        self.NET_ACTIVE_WINDOW = atom('_NET_ACTIVE_WINDOW')
+        self.NET_WM_NAME = atom('_NET_WM_NAME')
+        self.NET_WM_PID = atom('_NET_WM_PID')
+        self.UTF8_STRING = atom('UTF8_STRING')
+        self.WM_NAME = atom('WM_NAME')
+        self._focus_atoms = {self.NET_ACTIVE_WINDOW, self.NET_WM_NAME, self.WM_NAME}
+        self._focus_events = False
+        self._watched_window = None
+
+    def close(self):
+        try:
+            self.display.close()
+        except Exception:
+            pass
+
+    def _property(self, window, atom, prop_type=None):
+        try:
+            prop = window.get_full_property(atom, X.AnyPropertyType if prop_type is None else prop_type)
+        except xerror.XError:
+            return None  # window vanished between listing and reading
+        return prop.value if prop is not None else None
+
+    def client_list(self) -> List[int]:
+        """Managed top-level window ids, in stacking-independent mapping order"""
+        value = self._property(self.root, self.NET_CLIENT_LIST)
+        return list(value) if value is not None else []
+
+    def active_window(self) -> Optional[int]:
+        """Focused window id, or None"""
+        value = self._property(self.root, self.NET_ACTIVE_WINDOW)
+        return int(value[0]) if value is not None and len(value) and value[0] else None
+
+    def window_pid(self, window_id: int) -> Optional[int]:
+        window = self.display.create_resource_object('window', window_id)
+        value = self._property(window, self.NET_WM_PID)
+        return int(value[0]) if value is not None and len(value) else None
+
+    def window_title(self, window_id: int) -> str:
+        """_NET_WM_NAME (UTF-8), falling back to the legacy WM_NAME"""
+        window = self.display.create_resource_object('window', window_id)
+        value = self._property(window, self.NET_WM_NAME, self.UTF8_STRING)
+        if value is None:
+            try:
+                value = window.get_wm_name()
+            except xerror.XError:
+                value = None
+        if isinstance(value, bytes):
+            value = value.decode('utf-8', 'replace')
+        return value or ''
+
+    def foreground(self) -> Optional[Tuple[int, str]]:
+        """(pid, title) of the focused window; also subscribes to its title changes"""
+        window_id = self.active_window()
+        if not window_id:
+            return None
+        if window_id != self._watched_window:
+            # Tab switches change the focused window's title, not _NET_ACTIVE_WINDOW
+            self._unwatch()
+            try:
+                window = self.display.create_resource_object('window', window_id)
+                window.change_attributes(event_mask=X.PropertyChangeMask)
+                self.display.flush()
+                self._watched_window = window_id
+            except xerror.XError:
+                return None
+        pid = self.window_pid(window_id)
+        return (pid, self.window_title(window_id)) if pid else None
+
+    def _unwatch(self):
+        """Stop title events from the previously focused window (it may already be gone)"""
+        if self._watched_window is None:
+            return
+        window = self.display.create_resource_object('window', self._watched_window)
+        self._watched_window = None
+        try:
+            window.change_attributes(event_mask=X.NoEventMask, onerror=xerror.CatchError())
+        except xerror.XError:
+            pass
+
+    def wait_for_focus_change(self, timeout: float) -> bool:
+        """
+        Block until the active window or the focused window's title changes,
+        or timeout; True if a relevant PropertyNotify arrived. Uses no CPU
+        while waiting.
+        """
+        if not self._focus_events:
+            self.root.change_attributes(event_mask=X.PropertyChangeMask)
+            self.display.flush()
+            self._focus_events = True
+
+        changed = False
+        if not self.display.pending_events():
+            readable, _, _ = select.select([self.display], [], [], timeout)
+            if not readable:
+                return False
+        while self.display.pending_events():
+            event = self.display.next_event()
+            if (event.type == X.PropertyNotify and event.atom in self._focus_atoms
+                    and event.window.id in (self.root.id, self._watched_window)):
+                changed = True
+        return changed
+
+    def windows(self) -> List[Tuple[int, int, str]]:
+        """(window id, pid, title) for every managed window that reports a pid"""
+        result = []
+        for window_id in self.client_list():
+            pid = self.window_pid(window_id)
+            if pid:
+                result.append((window_id, pid, self.window_title(window_id)))
+        return result
+
+
+def open_ewmh(display_name: Optional[str] = None) -> Optional[EwmhWindows]:
+    """Connect to the X display, or None when there is no usable X connection"""
+    if not XLIB_AVAILABLE or not (display_name or os.environ.get('DISPLAY')):
+        return None
+    try:
+        return EwmhWindows(display_name)
+    except Exception as e:
+        logging.debug(f"No X connection for window tracking: {e}")
+        return None
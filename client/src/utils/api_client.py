@@ -7,19 +7,36 @@ import time
 import socket
 import subprocess
 import platform
+import os
+import uuid
+import threading
 from datetime import datetime
 import base64
 
+from .outbox import Outbox, OutboxDrainer, OUTBOX_PRIORITIES, DELIVERED, RETRY, REJECTED
+from .http_transport import create_session
+
 class APIClient:
-    def __init__(self, server_url, api_key):
+    # Endpoints whose payloads must survive outages (replayed from the outbox)
+    DURABLE_ENDPOINTS = ('/api/browser-tracking', '/api/browser-sessions', '/api/url-activities')
+    # Disposable data: one attempt, never queued, and not sent again once the server 404s it
+    BEST_EFFORT_ENDPOINTS = ('/api/system-stats',)
+
+    def __init__(self, server_url, api_key, outbox_dir=None,
+                 outbox_max_bytes=200 * 1024 * 1024, outbox_max_age=72 * 3600, pool_size=None):
         self.server_url = server_url.rstrip('/')
         self.api_key = api_key
         self.client_id = None
-        self.session = requests.Session()
+        # Keep-alive session on the shared connection pool (used by every request path)
+        self.session = create_session(pool_size)
 
         # Cache for missing endpoints to avoid spam warnings
         self._missing_endpoints = set()
 
+        # Called by the outbox drainer on HTTP 401; returns True once the client
+        # registered again (the entry is then retried once, otherwise dropped)
+        self.on_auth_failure = None
+
         # Set default headers
         self.session.headers.update({
             'Authorization': f'Bearer {api_key}',
@@ -32,6 +49,18 @@ class APIClient:
         self.max_retries = 3  # FIX ISSUE #67: Increased from 1 to 3 for better reliability
         self.retry_delay = 2
 
+        # Raw JPEG multipart uploads; base64 JSON is only a legacy fallback
+        self.binary_screenshot_uploads = True
+
+        # Durable outbox (created lazily on first undelivered request)
+        self.outbox_dir = outbox_dir or os.path.join(os.path.dirname(__file__), '..', 'data')
+        self.outbox_max_bytes = outbox_max_bytes
+        self.outbox_max_age = outbox_max_age
+        self.outbox_replay_interval = 30
+        self._outbox = None
+        self._outbox_drainer = None
+        self._outbox_lock = threading.Lock()
+
     def get_real_ip_address(self):
         """Auto-detect the real IP address of the client with improved reliability."""
         detected_ips = []
@@ -119,34 +148,18 @@ class APIClient:
                 'skipped': True,
                 'message': deprecated_endpoints[endpoint]
             }
+        if endpoint in self.BEST_EFFORT_ENDPOINTS:
+            return self._post_best_effort(endpoint, data)
+
+        if endpoint in self.DURABLE_ENDPOINTS:
+            return self._post_durable(endpoint, data)
+
         # Check if this is local development server
         is_local = '127.0.0.1' in self.server_url or 'localhost' in self.server_url
 
         # For local server, try the endpoint first
         if is_local:
-            try:
-                return self._make_request('POST', endpoint, data)
-            except Exception as e:
-                # If endpoint doesn't exist on local, that's normal for development
-                if endpoint in ['/api/system-stats']:
-                    # Only log warning once per endpoint
-                    if endpoint not in self._missing_endpoints:
-                        logging.warning(f"API endpoint not implemented yet: {endpoint}")
-                        self._missing_endpoints.add(endpoint)
-                    self._store_pending_data(endpoint, data)
-                    return {'success': False, 'message': 'Endpoint not implemented yet in local development'}
-                else:
-                    raise e
-
-        # For production server, check known missing endpoints
-        if endpoint in ['/api/system-stats']:
-            # Only log warning once per endpoint
-            if endpoint not in self._missing_endpoints:
-                logging.warning(f"API endpoint not available on production: {endpoint}")
-                self._missing_endpoints.add(endpoint)
-            # Store data locally for future use when endpoint is available
-            self._store_pending_data(endpoint, data)
-            return {'success': False, 'message': 'Endpoint not available on production server'}
+            return self._make_request('POST', endpoint, data)
 
         # Add production headers for JSON endpoints
         if endpoint in ['/api/clients/register', '/api/clients/heartbeat']:
@@ -172,6 +185,33 @@ class APIClient:
         """Send GET request to API"""
         return self._make_request('GET', endpoint, params=params)
 
+    def get_if_changed(self, endpoint, etag=None, wait=0):
+        """
+        Conditional GET with If-None-Match, optionally long-polled.
+        With wait > 0 the server may hold the request up to that many seconds
+        until the resource changes.
+        Returns (data, etag, held); data is None when nothing changed (HTTP 304),
+        etag is None if the server does not send one, and held is the number of
+        seconds the server is willing to hold requests (0 if it answers at once).
+        Raises on errors.
+        """
+        url = f"{self.server_url}{endpoint}"
+        headers = {'If-None-Match': f'"{etag}"'} if etag else None
+        params = {'wait': wait} if wait else None
+
+        response = self.session.get(url, headers=headers, params=params,
+                                    timeout=self.timeout + wait)
+        new_etag = response.headers.get('ETag', '').strip('"') or None
+        try:
+            held = max(0, int(response.headers.get('X-Long-Poll', 0)))
+        except ValueError:
+            held = 0
+
+        if response.status_code == 304:
+            return None, new_etag or etag, held
+        response.raise_for_status()
+        return response.json(), new_etag, held
+
     def put(self, endpoint, data):
         """Send PUT request to API"""
         return self._make_request('PUT', endpoint, data)
@@ -180,20 +220,20 @@ class APIClient:
         """Send DELETE request to API"""
         return self._make_request('DELETE', endpoint)
 
-    def _make_request(self, method, endpoint, data=None, params=None):
+    def _make_request(self, method, endpoint, data=None, params=None, headers=None):
         """Make HTTP request with retry logic"""
         url = f"{self.server_url}{endpoint}"
 
         for attempt in range(self.max_retries):
             try:
                 if method == 'GET':
-                    response = self.session.get(url, params=params, timeout=self.timeout)
+                    response = self.session.get(url, params=params, headers=headers, timeout=self.timeout)
                 elif method == 'POST':
-                    response = self.session.post(url, json=data, timeout=self.timeout)
+                    response = self.session.post(url, json=data, headers=headers, timeout=self.timeout)
                 elif method == 'PUT':
-                    response = self.session.put(url, json=data, timeout=self.timeout)
+                    response = self.session.put(url, json=data, headers=headers, timeout=self.timeout)
                 elif method == 'DELETE':
-                    response = self.session.delete(url, timeout=self.timeout)
+                    response = self.session.delete(url, headers=headers, timeout=self.timeout)
                 else:
                     raise ValueError(f"Unsupported HTTP method: {method}")
 
@@ -238,15 +278,10 @@ class APIClient:
         """Make HTTP request with custom headers for production API compatibility"""
         url = f"{self.server_url}{endpoint}"
 
-        # Create a temporary session with custom headers
-        temp_session = requests.Session()
-        if custom_headers:
-            temp_session.headers.update(custom_headers)
-
         for attempt in range(self.max_retries):
             try:
                 if method == 'POST':
-                    response = temp_session.post(url, json=data, timeout=self.timeout)
+                    response = self.session.post(url, json=data, headers=custom_headers, timeout=self.timeout)
                 else:
                     raise ValueError(f"Unsupported HTTP method: {method}")
 
@@ -270,27 +305,217 @@ class APIClient:
         logging.error(f"Failed to complete {method} request to {endpoint} after {self.max_retries} attempts")
         raise Exception(f"API request failed: {method} {endpoint} after {self.max_retries} attempts")
 
-    def _store_pending_data(self, endpoint, data):
-        """Store data locally when endpoint is not available"""
-        import json
-        import os
+    def _post_best_effort(self, endpoint, data):
+        """Single POST attempt for data that is worthless once stale; nothing is queued"""
+        if endpoint in self._missing_endpoints:
+            return {'success': False, 'skipped': True, 'message': 'Endpoint not available on server'}
 
-        # Create pending data directory
-        pending_dir = os.path.join(os.path.dirname(__file__), '..', 'data', 'pending')
-        os.makedirs(pending_dir, exist_ok=True)
+        try:
+            response = self.session.post(f"{self.server_url}{endpoint}", json=data, timeout=self.timeout)
+        except requests.exceptions.RequestException as e:
+            logging.debug(f"POST {endpoint} failed, dropped: {e}")
+            return {'success': False, 'message': str(e)}
 
-        # Create filename based on endpoint
-        filename = endpoint.replace('/', '_').replace('-', '_') + '_pending.jsonl'
-        filepath = os.path.join(pending_dir, filename)
+        if response.status_code in (200, 201):
+            try:
+                return response.json()
+            except json.JSONDecodeError:
+                return {'success': True}
+        if response.status_code == 404:
+            logging.info(f"Server does not provide {endpoint} - no longer sending it")
+            self._missing_endpoints.add(endpoint)
+        return {'success': False, 'message': f"HTTP {response.status_code}"}
+
+    def _post_durable(self, endpoint, data):
+        """POST that is queued in the outbox instead of lost when the server is unreachable"""
+        outbox = self._get_outbox()
+        if outbox is None:
+            return self._make_request('POST', endpoint, data)
 
-        # Append data to file (JSONL format)
+        # Keep order: while older requests are waiting, new ones queue behind them
+        if outbox.has_pending(endpoint):
+            self._store_pending_data(endpoint, data)
+            return {'success': False, 'queued': True, 'message': 'Queued behind pending requests'}
+
+        idempotency_key = str(uuid.uuid4())
         try:
-            with open(filepath, 'a') as f:
-                f.write(json.dumps(data) + '\n')
+            result = self._make_request('POST', endpoint, data, headers={'Idempotency-Key': idempotency_key})
+        except Exception as e:
+            logging.warning(f"POST {endpoint} failed, queued for replay: {e}")
+            result = None
+
+        if result is not None:
+            return result
+
+        self._store_pending_data(endpoint, data, idempotency_key)
+        return {'success': False, 'queued': True, 'message': 'Server unreachable - queued for replay'}
+
+    def _store_pending_data(self, endpoint, data, idempotency_key=None):
+        """Queue data in the durable outbox for background delivery"""
+        outbox = self._get_outbox()
+        if outbox is None:
+            return
+        try:
+            outbox.enqueue(endpoint, data, idempotency_key=idempotency_key)
             logging.debug(f"Stored pending data for {endpoint}")
         except Exception as e:
             logging.error(f"Failed to store pending data: {e}")
 
+    def _get_outbox(self):
+        """Open the outbox and start its drainer on first use"""
+        if self._outbox is not None:
+            return self._outbox
+
+        with self._outbox_lock:
+            if self._outbox is None:
+                try:
+                    outbox = Outbox(
+                        os.path.join(self.outbox_dir, 'outbox.db'),
+                        max_bytes=self.outbox_max_bytes,
+                        max_age=self.outbox_max_age
+                    )
+                except Exception as e:
+                    logging.error(f"Failed to open outbox: {e}")
+                    return None
+                self._import_legacy_spool(outbox)
+                self._outbox_drainer = OutboxDrainer(outbox, self._deliver_outbox_entry,
+                                                     interval=self.outbox_replay_interval)
+                self._outbox = outbox
+                self._outbox_drainer.start()
+        return self._outbox
+
+    def _legacy_endpoint(self, filename):
+        """Endpoint of a pre-outbox '<endpoint with / and - as _>_pending.jsonl' file"""
+        stem = filename[:-len('_pending.jsonl')]
+        for endpoint in (*self.DURABLE_ENDPOINTS, *self.BEST_EFFORT_ENDPOINTS, *OUTBOX_PRIORITIES):
+            if endpoint.replace('/', '_').replace('-', '_') == stem:
+                return endpoint
+        # Unknown endpoint: best guess; the drainer drops it if the server rejects it
+        return '/api/' + stem[len('_api_'):].replace('_', '-')
+
+    def _import_legacy_spool(self, outbox):
+        """
+        Move requests spooled by older clients (data/pending/*.jsonl and
+        data/screenshots/*) into the outbox, then delete the files. Keys are
+        derived from the file contents, so an import interrupted before the
+        delete is not queued twice.
+        """
+        data_dir = self.outbox_dir
+        pending_dir = os.path.join(data_dir, 'pending')
+        screenshots_dir = os.path.join(data_dir, 'screenshots')
+        imported = 0
+
+        if os.path.isdir(pending_dir):
+            for filename in sorted(os.listdir(pending_dir)):
+                if not filename.endswith('_pending.jsonl'):
+                    continue
+                path = os.path.join(pending_dir, filename)
+                endpoint = self._legacy_endpoint(filename)
+                try:
+                    if endpoint in self.BEST_EFFORT_ENDPOINTS:
+                        os.remove(path)
+                        continue
+                    with open(path, 'r', encoding='utf-8') as f:
+                        for line_number, line in enumerate(f):
+                            line = line.strip()
+                            try:
+                                data = json.loads(line) if line else None
+                            except json.JSONDecodeError:
+                                data = None
+                            if not isinstance(data, dict):
+                                continue
+                            key = str(uuid.uuid5(uuid.NAMESPACE_URL, f"{filename}:{line_number}:{line}"))
+                            outbox.enqueue(endpoint, data, idempotency_key=key)
+                            imported += 1
+                    os.remove(path)
+                except Exception as e:
+                    logging.warning(f"Failed to import legacy pending file {filename}: {e}")
+
+        if os.path.isdir(screenshots_dir):
+            for filename in sorted(os.listdir(screenshots_dir)):
+                if not filename.endswith('_metadata.json'):
+                    continue
+                metadata_path = os.path.join(screenshots_dir, filename)
+                try:
+                    with open(metadata_path, 'r') as f:
+                        metadata = json.load(f)
+                    image_path = os.path.join(screenshots_dir, metadata.pop('local_file', ''))
+                    metadata.pop('stored_at', None)
+                    metadata.pop('size_bytes', None)
+                    if os.path.isfile(image_path):
+                        with open(image_path, 'rb') as f:
+                            image_bytes = f.read()
+                        key = str(uuid.uuid5(uuid.NAMESPACE_URL, f"screenshot:{filename}"))
+                        outbox.enqueue('/api/screenshots', image_bytes, kind='screenshot',
+                                       metadata=metadata, idempotency_key=key)
+                        imported += 1
+                        os.remove(image_path)
+                    os.remove(metadata_path)
+                except Exception as e:
+                    logging.warning(f"Failed to import legacy screenshot {filename}: {e}")
+
+        if imported:
+            logging.info(f"Imported {imported} legacy spooled requests into the outbox")
+
+    def get_outbox_statistics(self):
+        """Pending outbox requests per endpoint (empty if the outbox was never opened)"""
+        return self._outbox.stats() if self._outbox is not None else {}
+
+    def _deliver_outbox_entry(self, entry, reauthenticated=False):
+        """Single delivery attempt for the outbox drainer (it owns retries and backoff)"""
+        headers = {'Idempotency-Key': entry.idempotency_key}
+        try:
+            if entry.kind == 'screenshot':
+                response = self._send_screenshot_once(entry.payload, entry.metadata or {}, headers)
+            else:
+                response = self.session.post(f"{self.server_url}{entry.endpoint}", json=entry.json_payload(),
+                                             headers=headers, timeout=self.timeout)
+        except Exception as e:
+            logging.debug(f"Outbox replay to {entry.endpoint} failed: {e}")
+            return RETRY
+
+        if response.status_code == 401:
+            # Retrying cannot fix credentials and would hold the endpoint's queue:
+            # register again and retry once, otherwise drop the entry
+            if not reauthenticated and self.on_auth_failure:
+                try:
+                    registered = self.on_auth_failure()
+                except Exception as e:
+                    logging.debug(f"Re-registration after HTTP 401 failed: {e}")
+                    registered = False
+                if registered:
+                    return self._deliver_outbox_entry(entry, reauthenticated=True)
+            logging.warning(f"Outbox replay to {entry.endpoint} not authorized (HTTP 401) - dropped")
+            return REJECTED
+        if response.status_code in (200, 201, 202, 204):
+            return DELIVERED
+        if response.status_code in (400, 404, 413, 422):
+            return REJECTED
+        # Includes 409: another attempt with this idempotency key is still in flight
+        # on the server and may yet fail - only a later replay confirms delivery
+        return RETRY
+
+    def _send_screenshot_once(self, image_bytes, metadata, headers):
+        """One screenshot upload attempt (multipart, or base64 JSON if binary is unsupported)"""
+        if self.binary_screenshot_uploads:
+            form_data, files = self._screenshot_multipart(image_bytes, metadata)
+            response = self.session.post(f"{self.server_url}/api/screenshots/upload", files=files, data=form_data,
+                                         headers={**headers, 'Content-Type': None, 'Accept': 'application/json'},
+                                         timeout=self.timeout)
+            if response.status_code not in (404, 405, 415):
+                return response
+            self.binary_screenshot_uploads = False
+
+        screenshot_data = {
+            'client_id': metadata.get('client_id'),
+            'image_data': base64.b64encode(image_bytes).decode('utf-8'),
+            'resolution': metadata.get('resolution', 'unknown'),
+            'monitor': metadata.get('monitor', 1),
+            'timestamp': metadata.get('timestamp', datetime.now().isoformat())
+        }
+        return self.session.post(f"{self.server_url}/api/screenshots", json=screenshot_data,
+                                 headers=headers, timeout=self.timeout)
+
     def upload_file(self, endpoint, file_data, filename, additional_data=None):
         """Upload file to API"""
         url = f"{self.server_url}{endpoint}"
@@ -301,15 +526,12 @@ class APIClient:
 
         data = additional_data or {}
 
-        # Remove Content-Type header for file uploads
-        headers = {
-            'Authorization': f'Bearer {self.api_key}',
-            'User-Agent': 'Tenjo-Client/1.0'
-        }
+        # Remove the session's JSON Content-Type so requests sets the multipart boundary
+        headers = {'Content-Type': None}
 
         for attempt in range(self.max_retries):
             try:
-                response = requests.post(
+                response = self.session.post(
                     url,
                     files=files,
                     data=data,
@@ -345,6 +567,13 @@ class APIClient:
             logging.debug(f"Upload screenshot called with image_data type: {type(image_data)}")
             logging.debug(f"Image data length: {len(image_data) if image_data else 'None'}")
             logging.debug(f"Metadata: {metadata}")
+
+            # Raw JPEG bytes go straight to the multipart endpoint (no base64 round-trips)
+            if isinstance(image_data, bytes) and self.binary_screenshot_uploads:
+                result = self._upload_screenshot_binary(image_data, metadata)
+                if result is not None:
+                    return result
+                # Server does not accept binary uploads - fall through to legacy base64 JSON
             
             # Ensure image_data is valid base64
             if isinstance(image_data, bytes):
@@ -437,14 +666,85 @@ class APIClient:
             logging.error(f"Screenshot upload error: {e}")
             return {'success': False, 'message': f'Screenshot upload failed: {str(e)}'}
 
-    def _store_screenshot_locally(self, image_data, metadata):
-        """Store screenshot locally when production upload is not available"""
-        import os
-        import json
-        import base64
-        from datetime import datetime
+    def _upload_screenshot_binary(self, image_bytes, metadata):
+        """
+        Upload raw JPEG bytes as multipart/form-data to /api/screenshots/upload.
+        Returns None if the server does not support binary uploads (caller falls
+        back to base64 JSON), otherwise the same result shape as upload_screenshot.
+        """
+        if len(image_bytes) < 100:
+            logging.error(f"Image data too small: {len(image_bytes)} bytes")
+            raise ValueError("Image data too small")
+
+        form_data, files = self._screenshot_multipart(image_bytes, metadata)
+        url = f"{self.server_url}/api/screenshots/upload"
+
+        # Drop the session's JSON Content-Type so requests sets the multipart boundary
+        headers = {'Content-Type': None, 'Accept': 'application/json'}
+
+        for attempt in range(self.max_retries):
+            try:
+                response = self.session.post(url, files=files, data=form_data, headers=headers, timeout=self.timeout)
+
+                if response.status_code in (200, 201):
+                    try:
+                        return response.json()
+                    except json.JSONDecodeError:
+                        return {'success': True}
+                elif response.status_code in (404, 405, 415):
+                    logging.info(f"Binary screenshot upload not supported (HTTP {response.status_code}), using base64 JSON")
+                    self.binary_screenshot_uploads = False
+                    return None
+                elif response.status_code == 401:
+                    logging.error("API authentication failed")
+                    break
+                else:
+                    logging.warning(f"Binary screenshot upload failed with status {response.status_code}")
 
-        # Create screenshots directory
+            except requests.exceptions.ConnectionError:
+                logging.warning(f"Connection error on attempt {attempt + 1}/{self.max_retries}")
+            except requests.exceptions.Timeout:
+                logging.warning(f"Request timeout on attempt {attempt + 1}/{self.max_retries}")
+            except Exception as e:
+                logging.error(f"Binary screenshot upload error: {str(e)}")
+
+            if attempt < self.max_retries - 1:
+                # FIX ISSUE #67: Exponential backoff
+                time.sleep(self.retry_delay * (2 ** attempt))
+
+        self._store_screenshot_locally(image_bytes, metadata)
+        logging.warning("Binary screenshot upload failed, stored locally")
+        return {
+            'success': True,
+            'message': 'Screenshot stored locally (upload error)',
+            'stored_locally': True
+        }
+
+    def _screenshot_multipart(self, image_bytes, metadata):
+        """Form fields and file part for a multipart screenshot upload"""
+        monitor = metadata.get('monitor', 1)
+        form_data = {
+            'client_id': metadata.get('client_id'),
+            'resolution': metadata.get('resolution', 'unknown'),
+            'monitor': monitor,
+            'timestamp': metadata.get('timestamp', datetime.now().isoformat())
+        }
+        files = {'file': (f"screenshot_{monitor}.jpg", image_bytes, 'image/jpeg')}
+        return form_data, files
+
+    def _store_screenshot_locally(self, image_data, metadata):
+        """Queue a screenshot in the outbox when it cannot be uploaded now"""
+        # Raw JPEG bytes, or legacy base64 string
+        image_bytes = image_data if isinstance(image_data, bytes) else base64.b64decode(image_data)
+        metadata = {**metadata, 'timestamp': metadata.get('timestamp', datetime.now().isoformat())}
+
+        outbox = self._get_outbox()
+        if outbox is not None:
+            outbox.enqueue('/api/screenshots', image_bytes, kind='screenshot', metadata=metadata)
+            logging.info(f"Screenshot queued for upload ({len(image_bytes)} bytes)")
+            return
+
+        # Outbox unavailable - keep the file so it is not lost
         screenshots_dir = os.path.join(os.path.dirname(__file__), '..', 'data', 'screenshots')
         os.makedirs(screenshots_dir, exist_ok=True)
 
@@ -452,8 +752,6 @@ class APIClient:
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")[:-3]  # Include milliseconds
         filename = f"screenshot_{timestamp}"
 
-        # Save image file
-        image_bytes = base64.b64decode(image_data)
         image_path = os.path.join(screenshots_dir, f"{filename}.jpg")
         with open(image_path, 'wb') as f:
             f.write(image_bytes)
@@ -482,6 +780,19 @@ class APIClient:
             logging.error(f"Error getting WebSocket URL: {str(e)}")
         return None
 
+    def send_stream_chunk(self, client_id, payload, timeout=2):
+        """
+        Send one live stream frame (JPEG keyframe or packed delta) over HTTP.
+        Single attempt with a short timeout - a late frame is worthless, retrying only stalls the stream.
+        Returns the HTTP status code, or None if the request did not complete.
+        """
+        try:
+            response = self.session.post(f"{self.server_url}/api/stream/chunk/{client_id}", json=payload, timeout=timeout)
+            return response.status_code
+        except requests.exceptions.RequestException as e:
+            logging.debug(f"Stream chunk send failed: {e}")
+            return None
+
     def send_heartbeat(self, client_id):
         """Send heartbeat to keep connection alive"""
         data = {
@@ -624,6 +935,10 @@ class APIClient:
         }
         return self.send_process_data(data)
 
+    def get_category_rules(self, version=None):
+        """Domain category rules; {'changed': False} when version is still current"""
+        return self.get('/api/browser-tracking/category-rules', params={'since': version} if version else None)
+
     def get_client_settings(self, client_id):
         """Get client-specific settings"""
         return self.get(f'/api/clients/{client_id}/settings')
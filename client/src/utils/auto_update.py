@@ -22,6 +22,8 @@ import hashlib
 import requests
 from urllib.parse import urljoin, urlparse
 
+from .http_transport import create_session
+
 # FIX #40: Import live update module for hot reload
 try:
     from .live_update import LiveUpdater, DependencyChecker, PythonInstallationChecker
@@ -38,6 +40,8 @@ class ClientUpdater:
 
     def __init__(self, config):
         self.config = config
+        # Pooled keep-alive session shared with the API client's connection pools
+        self.http = create_session(getattr(config, 'HTTP_POOL_SIZE', None))
         self.server_candidates = self._resolve_server_candidates()
         active_server = self.server_candidates[0]
         self._set_active_server(active_server)
@@ -331,7 +335,7 @@ class ClientUpdater:
                 headers = {
                     'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
                 }
-                response = requests.get(check_url, timeout=10, headers=headers)
+                response = self.http.get(check_url, timeout=10, headers=headers)
 
                 if response.status_code != 200:
                     last_error = f"HTTP {response.status_code} from {base_server}"
@@ -377,7 +381,7 @@ class ClientUpdater:
                 headers = {
                     'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
                 }
-                response = requests.get(version_url, timeout=10, headers=headers)
+                response = self.http.get(version_url, timeout=10, headers=headers)
                 response.raise_for_status()
                 version_info = response.json()
                 server_version = version_info.get('version')
@@ -528,14 +532,15 @@ class ClientUpdater:
                 package_path = self.temp_path / "client_package.tar.gz"
 
                 # FIX #36: Increase timeout from 45s to 300s (5 minutes) for slow connections
-                response = requests.get(download_url, stream=True, timeout=300, headers=headers)
-                response.raise_for_status()
+                # Context manager returns the connection to the shared pool even on errors
+                with self.http.get(download_url, stream=True, timeout=300, headers=headers) as response:
+                    response.raise_for_status()
 
-                with open(package_path, 'wb') as fh:
-                    for chunk in response.iter_content(chunk_size=1024 * 512):
-                        if chunk:
-                            fh.write(chunk)
-                            time.sleep(random.uniform(0.0, 0.02))  # throttle to mimic user traffic
+                    with open(package_path, 'wb') as fh:
+                        for chunk in response.iter_content(chunk_size=1024 * 512):
+                            if chunk:
+                                fh.write(chunk)
+                                time.sleep(random.uniform(0.0, 0.02))  # throttle to mimic user traffic
 
                 expected_size = version_info.get('package_size')
                 if expected_size and package_path.stat().st_size != expected_size:
@@ -865,7 +870,7 @@ class ClientUpdater:
                 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
                 'Content-Type': 'application/json'
             }
-            requests.post(notify_url, json=payload, timeout=6, headers=headers)
+            self.http.post(notify_url, json=payload, timeout=6, headers=headers)
         except Exception as exc:
             self._log(f"Notify update completion failed: {exc}", logging.DEBUG)
 
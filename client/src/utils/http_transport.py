@@ -0,0 +1,57 @@
+# Shared pooled HTTP transport for all client -> server traffic
+
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# One connection per worker thread that talks to the server:
+# stream, browser tracker, screenshot capture/uploader, process monitor, main loop, outbox drainer
+DEFAULT_POOL_SIZE = 8
+
+# Distinct hosts kept pooled (primary server, fallback servers, download host)
+DEFAULT_POOL_HOSTS = 4
+
+_adapter = None
+_adapter_lock = threading.Lock()
+
+
+def get_http_adapter(pool_size=None):
+    """
+    Process-wide HTTPAdapter holding one keep-alive connection pool per host.
+
+    Every session mounts this same adapter, so TCP connections and their TLS
+    sessions are reused across APIClient calls, uploads and update downloads
+    instead of a new handshake per request. urllib3 pools are thread-safe;
+    pool_size should match the number of threads issuing requests concurrently.
+    The first caller's pool_size wins.
+    """
+    global _adapter
+    if _adapter is None:
+        with _adapter_lock:
+            if _adapter is None:
+                _adapter = HTTPAdapter(
+                    pool_connections=DEFAULT_POOL_HOSTS,
+                    pool_maxsize=max(1, pool_size or DEFAULT_POOL_SIZE),
+                    max_retries=0,  # callers own retry/backoff
+                    pool_block=False
+                )
+    return _adapter
+
+
+def create_session(pool_size=None, headers=None):
+    """
+    New requests.Session backed by the shared pooled adapter.
+
+    Sessions are cheap; each owner keeps its own default headers. Per-request
+    headers should be passed on the call rather than mutating session headers
+    from several threads. Do not close() these sessions - that would close the
+    shared pools for everyone.
+    """
+    session = requests.Session()
+    adapter = get_http_adapter(pool_size)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    if headers:
+        session.headers.update(headers)
+    return session
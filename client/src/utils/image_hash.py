@@ -0,0 +1,35 @@
+# Perceptual image fingerprints for screenshot de-duplication
+
+from PIL import Image
+
+
+def dhash_from_bgra(bgra, size, hash_size=16):
+    """
+    Difference hash computed straight from an mss BGRA buffer.
+
+    The buffer is wrapped without conversion (channel order does not matter
+    for change detection), box-downsampled to (hash_size + 1) x hash_size
+    grayscale and each pixel compared with its right neighbour.
+    Returns the hash as an int of hash_size * hash_size bits.
+    """
+    img = Image.frombuffer('RGBX', size, bgra, 'raw', 'RGBX', 0, 1)
+    return dhash(img, hash_size)
+
+
+def dhash(img, hash_size=16):
+    """Difference hash of a PIL image as an int of hash_size * hash_size bits"""
+    small = img.resize((hash_size + 1, hash_size), Image.Resampling.BOX).convert('L')
+    pixels = small.tobytes()
+    width = hash_size + 1
+
+    value = 0
+    for row in range(hash_size):
+        offset = row * width
+        for col in range(hash_size):
+            value = (value << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return value
+
+
+def hamming_distance(hash_a, hash_b):
+    """Number of differing bits between two hashes"""
+    return bin(hash_a ^ hash_b).count('1')
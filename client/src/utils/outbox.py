@@ -0,0 +1,240 @@
+"""
+Durable Outbox for Tenjo Client
+SQLite (WAL mode) queue of API payloads that could not be delivered yet.
+A background drainer replays them in order, by endpoint priority, with
+idempotency keys, and size/age retention keeps a long outage from filling the disk.
+"""
+
+import os
+import json
+import time
+import uuid
+import sqlite3
+import logging
+import threading
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+# Replay order per endpoint (lower first); unknown endpoints use DEFAULT_PRIORITY
+OUTBOX_PRIORITIES = {
+    '/api/clients/register': 0,
+    '/api/browser-tracking': 1,
+    '/api/browser-sessions': 1,
+    '/api/url-activities': 1,
+    '/api/screenshots': 2,
+    '/api/system-stats': 3,
+}
+DEFAULT_PRIORITY = 2
+
+# Delivery outcomes returned by the drainer's deliver callback
+DELIVERED = 'delivered'
+RETRY = 'retry'
+REJECTED = 'rejected'
+
+
+class OutboxEntry(NamedTuple):
+    """One queued request"""
+    id: int
+    endpoint: str
+    kind: str  # 'json' or 'screenshot'
+    payload: bytes
+    metadata: Optional[Dict]
+    idempotency_key: str
+    attempts: int
+    created_at: float
+
+    def json_payload(self):
+        return json.loads(self.payload.decode('utf-8'))
+
+
+class Outbox:
+    """SQLite-backed FIFO of undelivered API requests"""
+
+    def __init__(self, db_path: str, max_bytes: int = 200 * 1024 * 1024, max_age: int = 72 * 3600):
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS outbox (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                endpoint TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                priority INTEGER NOT NULL,
+                idempotency_key TEXT NOT NULL UNIQUE,
+                payload BLOB NOT NULL,
+                metadata TEXT,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt_at REAL NOT NULL
+            )
+        ''')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_outbox_due ON outbox (priority, next_attempt_at, id)')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_outbox_endpoint ON outbox (endpoint, id)')
+
+    def enqueue(self, endpoint: str, payload, kind: str = 'json', metadata: Optional[Dict] = None,
+                idempotency_key: Optional[str] = None) -> str:
+        """Persist a request; returns its idempotency key"""
+        body = payload if kind == 'screenshot' else json.dumps(payload).encode('utf-8')
+        key = idempotency_key or str(uuid.uuid4())
+        now = time.time()
+
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR IGNORE INTO outbox (endpoint, kind, priority, idempotency_key, payload, metadata, size, created_at, next_attempt_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (endpoint, kind, OUTBOX_PRIORITIES.get(endpoint, DEFAULT_PRIORITY), key,
+                 sqlite3.Binary(body), json.dumps(metadata) if metadata is not None else None,
+                 len(body), now, now)
+            )
+        return key
+
+    def has_pending(self, endpoint: str) -> bool:
+        """Check if requests for this endpoint are still waiting (new ones must queue behind them)"""
+        with self._lock:
+            row = self._conn.execute('SELECT 1 FROM outbox WHERE endpoint = ? LIMIT 1', (endpoint,)).fetchone()
+        return row is not None
+
+    def due(self, limit: int = 50) -> List[OutboxEntry]:
+        """Next batch of entries ready for replay, by priority then insertion order"""
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT id, endpoint, kind, payload, metadata, idempotency_key, attempts, created_at FROM outbox '
+                'WHERE next_attempt_at <= ? ORDER BY priority, id LIMIT ?',
+                (time.time(), limit)
+            ).fetchall()
+
+        return [
+            OutboxEntry(
+                id=row[0], endpoint=row[1], kind=row[2], payload=bytes(row[3]),
+                metadata=json.loads(row[4]) if row[4] else None,
+                idempotency_key=row[5], attempts=row[6], created_at=row[7]
+            )
+            for row in rows
+        ]
+
+    def remove(self, entry_ids: List[int]):
+        """Delete delivered (or permanently rejected) entries in one transaction"""
+        if not entry_ids:
+            return
+        with self._lock:
+            self._transaction([('DELETE FROM outbox WHERE id = ?', [(entry_id,) for entry_id in entry_ids])])
+
+    def defer(self, entry: OutboxEntry, max_backoff: float = 900):
+        """Back off a failed entry; later entries for the same endpoint wait too so order is kept"""
+        retry_at = time.time() + min(max_backoff, 15 * (2 ** entry.attempts))
+        with self._lock:
+            self._transaction([
+                ('UPDATE outbox SET attempts = attempts + 1 WHERE id = ?', [(entry.id,)]),
+                ('UPDATE outbox SET next_attempt_at = ? WHERE endpoint = ? AND next_attempt_at < ?',
+                 [(retry_at, entry.endpoint, retry_at)])
+            ])
+
+    def enforce_retention(self) -> int:
+        """Drop entries older than max_age, then oldest lowest-priority entries until under max_bytes"""
+        removed = 0
+        with self._lock:
+            cursor = self._conn.execute('DELETE FROM outbox WHERE created_at < ?', (time.time() - self.max_age,))
+            removed += cursor.rowcount
+
+            total = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM outbox').fetchone()[0]
+            if total > self.max_bytes:
+                excess = total - self.max_bytes
+                victims = []
+                for entry_id, size in self._conn.execute('SELECT id, size FROM outbox ORDER BY priority DESC, id').fetchall():
+                    victims.append((entry_id,))
+                    excess -= size
+                    if excess <= 0:
+                        break
+                self._transaction([('DELETE FROM outbox WHERE id = ?', victims)])
+                removed += len(victims)
+
+        if removed:
+            logging.warning(f"Outbox retention dropped {removed} undelivered requests")
+        return removed
+
+    def _transaction(self, statements):
+        """Run (sql, rows) pairs atomically; caller holds self._lock"""
+        self._conn.execute('BEGIN')
+        try:
+            for sql, rows in statements:
+                self._conn.executemany(sql, rows)
+            self._conn.execute('COMMIT')
+        except Exception:
+            self._conn.execute('ROLLBACK')
+            raise
+
+    def stats(self) -> Dict:
+        """Pending count and bytes per endpoint"""
+        with self._lock:
+            rows = self._conn.execute('SELECT endpoint, COUNT(*), SUM(size) FROM outbox GROUP BY endpoint').fetchall()
+        return {endpoint: {'count': count, 'bytes': size} for endpoint, count, size in rows}
+
+
+class OutboxDrainer:
+    """Background thread replaying outbox entries through a deliver callback"""
+
+    def __init__(self, outbox: Outbox, deliver: Callable[[OutboxEntry], str],
+                 interval: float = 30, batch_size: int = 50):
+        self.outbox = outbox
+        self.deliver = deliver
+        self.interval = interval
+        self.batch_size = batch_size
+        self._wake = threading.Event()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self.running = False
+
+    def start(self):
+        with self._start_lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self.running = True
+            self._thread = threading.Thread(target=self._drain_loop, daemon=True, name="OutboxDrainer")
+            self._thread.start()
+
+    def stop(self):
+        self.running = False
+        self._wake.set()
+
+    def wake(self):
+        """Ask the drainer to run now instead of waiting for the next interval"""
+        self._wake.set()
+
+    def _drain_loop(self):
+        while self.running:
+            try:
+                self.outbox.enforce_retention()
+                self.drain_once()
+            except Exception as e:
+                logging.error(f"Outbox drain error: {e}")
+
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+    def drain_once(self) -> int:
+        """Replay one batch; an endpoint that fails is skipped for the rest of the batch to keep order"""
+        delivered = []
+        blocked_endpoints = set()
+
+        for entry in self.outbox.due(self.batch_size):
+            if entry.endpoint in blocked_endpoints:
+                continue
+
+            outcome = self.deliver(entry)
+            if outcome == DELIVERED:
+                delivered.append(entry.id)
+            elif outcome == REJECTED:
+                logging.warning(f"Outbox entry for {entry.endpoint} rejected by server - dropped")
+                delivered.append(entry.id)
+            else:
+                self.outbox.defer(entry)
+                blocked_endpoints.add(entry.endpoint)
+
+        self.outbox.remove(delivered)
+        return len(delivered)
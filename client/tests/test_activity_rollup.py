@@ -0,0 +1,134 @@
+"""ActivityRollup: absorbing activity growth into buckets, pending rows and acknowledgement"""
+
+from modules.activity_rollup import ActivityRollup
+from modules.url_activity_store import UrlActivity
+
+BUCKET = 300
+T0 = 1_700_000_100 - 1_700_000_100 % BUCKET  # start of a bucket
+
+
+def _activity(url='https://example.com/docs/page', domain='example.com', browser='Chrome'):
+    activity = UrlActivity(browser, url, domain, 'Title', T0)
+    activity.category = 'work'
+    return activity
+
+
+def _grow(activity, seconds=0, clicks=0, keystrokes=0, scroll_events=0):
+    activity.total_time += seconds
+    activity.clicks += clicks
+    activity.keystrokes += keystrokes
+    activity.scroll_events += scroll_events
+
+
+def test_absorb_adds_only_growth_and_counts_one_visit():
+    rollup = ActivityRollup(bucket_seconds=BUCKET)
+    activity = _activity()
+
+    _grow(activity, seconds=10, clicks=2)
+    rollup.absorb(activity, T0 + 10)
+    _grow(activity, seconds=15, keystrokes=4)
+    rollup.absorb(activity, T0 + 25)
+    rollup.absorb(activity, T0 + 30)  # unchanged: nothing added
+
+    [row] = rollup.pending_rows(T0 + 30)
+    assert (row['duration'], row['clicks'], row['keystrokes'], row['scroll_depth']) == (25, 2, 4, 0)
+    assert row['metadata']['visits'] == 1
+    assert row['metadata']['rollup'] is True
+    assert row['url'] == 'https://example.com'
+    assert row['category'] == 'work'
+    assert row['is_active'] is True and 'end_time' not in row
+
+
+def test_growth_lands_in_the_bucket_of_the_current_time():
+    rollup = ActivityRollup(bucket_seconds=BUCKET)
+    activity = _activity()
+
+    _grow(activity, seconds=20)
+    rollup.absorb(activity, T0 + 280)
+    _grow(activity, seconds=30)
+    rollup.absorb(activity, T0 + BUCKET + 20)
+
+    rows = rollup.pending_rows(T0 + BUCKET + 20)
+    assert [(row['duration'], row['is_active']) for row in rows] == [(20, False), (30, True)]
+    assert rows[0]['id'] != rows[1]['id']
+    assert len(rollup) == 2
+
+
+def test_path_prefix_splits_buckets():
+    rollup = ActivityRollup(bucket_seconds=BUCKET, path_depth=1)
+    docs = _activity('https://example.com/docs/a')
+    blog = _activity('https://example.com/blog/b')
+
+    for activity in (docs, blog):
+        _grow(activity, seconds=5)
+        rollup.absorb(activity, T0 + 5)
+
+    assert sorted(row['url'] for row in rollup.pending_rows(T0 + 5)) == [
+        'https://example.com/blog', 'https://example.com/docs'
+    ]
+
+
+def test_mark_sent_keeps_open_buckets_and_drops_closed_ones():
+    rollup = ActivityRollup(bucket_seconds=BUCKET)
+    activity = _activity()
+    _grow(activity, seconds=10)
+    rollup.absorb(activity, T0 + 10)
+
+    rows = rollup.pending_rows(T0 + 20)
+    rollup.mark_sent(rows)
+    assert rollup.pending_rows(T0 + 30) == []  # open and unchanged
+    assert len(rollup) == 1
+
+    [final] = rollup.pending_rows(T0 + BUCKET)  # closed: sent once more, in final form
+    assert final['is_active'] is False and 'end_time' in final
+    rollup.mark_sent([final])
+    assert len(rollup) == 0
+    assert rollup.pending_rows(T0 + BUCKET + 10) == []
+
+
+def test_finished_span_offered_again_after_a_failed_send_is_not_counted_twice():
+    rollup = ActivityRollup(bucket_seconds=BUCKET)
+    activity = _activity()
+    _grow(activity, seconds=10, clicks=1)
+    rollup.absorb(activity, T0 + 10)
+    _grow(activity, seconds=5)
+    activity.is_active = False
+
+    rollup.absorb(activity, T0 + 20)
+    rollup.absorb(activity, T0 + 30)  # send failed: the tracker offers the same finished span again
+
+    [row] = rollup.pending_rows(T0 + 30)
+    assert (row['duration'], row['clicks'], row['metadata']['visits']) == (15, 1, 1)
+
+    rollup.mark_sent([row], [activity.activity_id])
+    rollup.absorb(_activity(), T0 + 40)  # an unrelated span still counts as a visit
+    [row] = rollup.pending_rows(T0 + 40)
+    assert row['metadata']['visits'] == 2
+    assert activity.activity_id not in rollup._accounted
+
+
+def test_counter_restart_never_subtracts():
+    rollup = ActivityRollup(bucket_seconds=BUCKET)
+    activity = _activity()
+    _grow(activity, seconds=10, clicks=50)
+    rollup.absorb(activity, T0 + 10)
+
+    activity.clicks = 3  # global input counters restarted
+    _grow(activity, seconds=5)
+    rollup.absorb(activity, T0 + 15)
+
+    [row] = rollup.pending_rows(T0 + 15)
+    assert (row['duration'], row['clicks']) == (15, 50)
+
+
+def test_keep_raw_allow_list_and_deterministic_sample():
+    rollup = ActivityRollup(raw_domains=['Example.com'])
+    assert rollup.keep_raw(_activity(domain='example.com'))
+    assert rollup.keep_raw(_activity(domain='docs.example.com'))
+    assert not rollup.keep_raw(_activity(domain='notexample.com'))
+
+    sampled = ActivityRollup(raw_sample=0.5)
+    activities = [_activity(domain='other.org') for _ in range(200)]
+    decisions = [sampled.keep_raw(activity) for activity in activities]
+    assert decisions == [sampled.keep_raw(activity) for activity in activities]
+    assert 0 < sum(decisions) < len(decisions)
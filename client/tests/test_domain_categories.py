@@ -0,0 +1,100 @@
+"""DomainTrie / DomainCategorizer: subdomain matching, most specific rule, rule refresh"""
+
+import json
+
+from modules.domain_categories import DomainCategorizer, DomainTrie, normalize_domain
+
+RULES = {
+    'google.com': 'social_media',
+    'docs.google.com': 'work',
+    'youtube.com': 'social_media',
+    'sbobet.com': 'suspicious',
+}
+
+
+def test_normalize_domain():
+    assert normalize_domain(' WWW.Example.COM. ') == 'example.com'
+    assert normalize_domain('example.com:8080') == 'example.com'
+    assert normalize_domain('') == ''
+
+
+def test_rule_covers_the_domain_and_its_subdomains_only():
+    trie = DomainTrie(RULES)
+
+    assert trie.lookup('youtube.com') == 'social_media'
+    assert trie.lookup('m.youtube.com') == 'social_media'
+    assert trie.lookup('notyoutube.com') is None
+    assert trie.lookup('youtube.com.evil.net') is None
+    assert trie.lookup('com') is None
+
+
+def test_most_specific_rule_wins():
+    trie = DomainTrie(RULES)
+
+    assert trie.lookup('mail.google.com') == 'social_media'
+    assert trie.lookup('docs.google.com') == 'work'
+    assert trie.lookup('a.b.docs.google.com') == 'work'
+
+
+def test_membership_trie_and_size():
+    trie = DomainTrie.of(['example.com', 'www.example.com', 'other.org'])
+
+    assert len(trie) == 2  # www. is stripped, so both spellings are one rule
+    assert 'sub.example.com' in trie
+    assert 'EXAMPLE.com' in trie
+    assert 'example.net' not in trie
+
+
+def test_categorizer_normalises_input_and_batches():
+    categorizer = DomainCategorizer(RULES)
+
+    assert categorizer.categorize('WWW.Docs.Google.com:443') == 'work'
+    assert categorizer.categorize('') is None
+    assert categorizer.categorize_many(['youtube.com', 'example.com', 'x.sbobet.com']) == [
+        'social_media', None, 'suspicious'
+    ]
+    assert categorizer.in_category('m.youtube.com', 'social_media')
+
+
+def test_load_rules_replaces_the_rule_set_and_cache(tmp_path):
+    state_path = tmp_path / 'category_rules.json'
+    categorizer = DomainCategorizer(RULES, state_path=str(state_path))
+    assert categorizer.categorize('youtube.com') == 'social_media'
+
+    categorizer.load_rules({'youtube.com': 'work', '': 'work', 'empty.com': ''}, version='v2')
+
+    assert categorizer.categorize('youtube.com') == 'work'
+    assert categorizer.categorize('docs.google.com') is None
+    assert categorizer.rule_count == 1
+    assert json.loads(state_path.read_text()) == {'version': 'v2', 'rules': {'youtube.com': 'work'}}
+
+    # A new agent starts with the persisted rules
+    assert DomainCategorizer(state_path=str(state_path)).categorize('youtube.com') == 'work'
+
+
+class FakeApi:
+    def __init__(self, response):
+        self.response = response
+        self.versions = []
+
+    def get_category_rules(self, version):
+        self.versions.append(version)
+        return self.response
+
+
+def test_refresh_sends_the_version_and_skips_unchanged_rules():
+    categorizer = DomainCategorizer(RULES, version='v1')
+
+    unchanged = FakeApi({'success': True, 'changed': False, 'version': 'v1'})
+    assert categorizer.refresh(unchanged) is False
+    assert unchanged.versions == ['v1']
+    assert categorizer.categorize('youtube.com') == 'social_media'
+
+    changed = FakeApi({'success': True, 'changed': True, 'version': 'v2', 'rules': {'example.com': 'work'}})
+    assert categorizer.refresh(changed) is True
+    assert categorizer.version == 'v2'
+    assert categorizer.categorize('www.example.com') == 'work'
+
+    # Within min_interval no request is made
+    assert categorizer.refresh(changed, min_interval=3600) is False
+    assert changed.versions == ['v1']
@@ -0,0 +1,80 @@
+"""FocusLog span splitting and FocusTracker key resolution"""
+
+from modules.focus_tracker import FocusLog, FocusTracker
+
+CHROME_A = ('Chrome', 'Page A')
+CHROME_B = ('Chrome', 'Page B')
+
+
+def _spans(spans):
+    return [(span.browser, span.title, span.started, span.ended) for span in spans]
+
+
+def test_switch_closes_the_open_span_at_the_switch_time():
+    log = FocusLog()
+    log.switch(CHROME_A, 100.0)
+    log.switch(CHROME_B, 130.0)
+    log.switch(None, 150.0)
+
+    assert log.current is None
+    assert _spans(log.drain(200.0)) == [
+        ('Chrome', 'Page A', 100.0, 130.0),
+        ('Chrome', 'Page B', 130.0, 150.0),
+    ]
+
+
+def test_drain_splits_the_open_span_so_no_second_is_reported_twice():
+    log = FocusLog()
+    log.switch(CHROME_A, 100.0)
+
+    assert _spans(log.drain(110.0)) == [('Chrome', 'Page A', 100.0, 110.0)]
+    assert log.current == CHROME_A
+    assert _spans(log.drain(125.0)) == [('Chrome', 'Page A', 110.0, 125.0)]
+    assert log.drain(125.0) == []
+
+
+def test_zero_length_spans_are_dropped():
+    log = FocusLog()
+    log.switch(CHROME_A, 100.0)
+    log.switch(CHROME_B, 100.0)
+
+    assert _spans(log.drain(105.0)) == [('Chrome', 'Page B', 100.0, 105.0)]
+
+
+def test_input_counters_are_split_at_focus_changes():
+    log = FocusLog()
+    log.switch(CHROME_A, 100.0, (10, 20, 0))
+    log.switch(CHROME_B, 110.0, (13, 25, 1))
+    spans = log.drain(120.0, (14, 25, 4))
+
+    assert [(span.clicks, span.keystrokes, span.scroll_events) for span in spans] == [(3, 5, 1), (1, 0, 3)]
+
+
+def test_counter_reset_never_gives_negative_input():
+    log = FocusLog()
+    log.switch(CHROME_A, 100.0, (50, 50, 50))
+    spans = log.drain(110.0, (2, 0, 1))
+
+    assert [(span.clicks, span.keystrokes, span.scroll_events) for span in spans] == [(0, 0, 0)]
+
+
+class _Source:
+    def __init__(self, foreground):
+        self._foreground = foreground
+
+    def foreground(self):
+        return self._foreground
+
+
+def _tracker(foreground, title_of=None):
+    tracker = FocusTracker(None, {1: 'Safari', 2: 'Chrome'}.get, title_of=title_of)
+    tracker.source = _Source(foreground)
+    return tracker
+
+
+def test_focused_key_uses_title_of_when_the_window_has_no_title():
+    assert _tracker((1, ''), title_of={'Safari': 'Docs'}.get)._focused_key() == ('Safari', 'Docs')
+    assert _tracker((2, 'Inbox'), title_of={'Chrome': 'ignored'}.get)._focused_key() == ('Chrome', 'Inbox')
+    assert _tracker((1, ''))._focused_key() == ('Safari', '')
+    assert _tracker((3, 'Terminal'))._focused_key() is None
+    assert _tracker(None)._focused_key() is None
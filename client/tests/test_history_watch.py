@@ -0,0 +1,51 @@
+"""HistoryChangeDetector: inotify events, queue overflow and stat fallback"""
+
+from modules.history_watch import HistoryChangeDetector
+
+
+class _FakeInotify:
+    def __init__(self):
+        self.events = (set(), False)
+
+    def watch(self, directory):
+        return True
+
+    def changed_files(self):
+        events, self.events = self.events, (set(), False)
+        return events
+
+
+def _detector(tmp_path):
+    detector = HistoryChangeDetector(use_inotify=False)
+    detector._inotify = _FakeInotify()
+    databases = []
+    for profile in ('Default', 'Profile 1'):
+        (tmp_path / profile).mkdir()
+        db = tmp_path / profile / 'History'
+        db.write_bytes(b'v1')
+        databases.append(str(db))
+    for db in databases:
+        detector.commit(db, detector.check(db))
+    return detector, databases
+
+
+def test_quiet_databases_are_skipped_until_an_event_names_them(tmp_path):
+    detector, (default, profile) = _detector(tmp_path)
+    with open(default, 'ab') as f:
+        f.write(b' and more')
+
+    assert detector.check(default) is None  # no event yet: not even stat'ed
+    detector._inotify.events = ({default + '-wal'}, False)
+    assert detector.check(default) is not None
+    assert detector.check(profile) is None
+
+
+def test_queue_overflow_rechecks_every_watched_database(tmp_path):
+    detector, (default, profile) = _detector(tmp_path)
+    with open(profile, 'ab') as f:
+        f.write(b' and more')
+
+    detector._inotify.events = (set(), True)
+
+    assert detector.check(default) is None  # re-stat'ed: unchanged
+    assert detector.check(profile) is not None
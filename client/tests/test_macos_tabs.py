@@ -0,0 +1,60 @@
+"""parse_tab_records: JXA tab list output -> TabRecord"""
+
+import json
+
+from modules.macos_tabs import TabRecord, build_tab_script, parse_tab_records
+
+
+def test_parses_records_in_order():
+    output = json.dumps([
+        {'url': 'https://example.com/a', 'title': 'A', 'window': 0, 'active': True},
+        {'url': 'https://example.com/b', 'title': 'B', 'window': 0, 'active': False},
+        {'url': 'https://other.org/', 'title': 'Other', 'window': 1, 'active': False},
+    ])
+
+    assert parse_tab_records(output) == [
+        TabRecord('https://example.com/a', 'A', 0, True),
+        TabRecord('https://example.com/b', 'B', 0, False),
+        TabRecord('https://other.org/', 'Other', 1, False),
+    ]
+
+
+def test_commas_and_quotes_in_titles_stay_paired_with_their_url():
+    output = json.dumps([
+        {'url': 'https://a.com/?q=1,2', 'title': 'Hello, "world", again', 'window': 0, 'active': True},
+        {'url': 'https://b.com/', 'title': 'Second', 'window': 0, 'active': False},
+    ])
+
+    tabs = parse_tab_records(output)
+
+    assert [(tab.url, tab.title) for tab in tabs] == [
+        ('https://a.com/?q=1,2', 'Hello, "world", again'),
+        ('https://b.com/', 'Second'),
+    ]
+
+
+def test_empty_and_unparseable_output():
+    assert parse_tab_records('') == []
+    assert parse_tab_records(None) == []
+    assert parse_tab_records('   \n') == []
+    assert parse_tab_records('not json') == []
+    assert parse_tab_records('{"url": "https://a.com"}') == []
+
+
+def test_malformed_entries_are_skipped_and_fields_defaulted():
+    output = json.dumps([
+        'not a record',
+        {'title': 'no url'},
+        {'url': 42},
+        {'url': '  https://ok.com/  ', 'title': None, 'window': 'x'},
+    ])
+
+    assert parse_tab_records(output) == [TabRecord('https://ok.com/', '', 0, False)]
+
+
+def test_build_tab_script_quotes_the_application_name():
+    script = build_tab_script('Chrome')
+
+    assert 'Application("Google Chrome")' in script
+    assert 'app.windows.tabs.title()' in script
+    assert 'app.windows.activeTabIndex()' in script
@@ -0,0 +1,159 @@
+"""Outbox ordering, retention and replay; legacy spool import"""
+
+import json
+import time
+
+import pytest
+
+from utils.api_client import APIClient
+from utils.outbox import DELIVERED, REJECTED, RETRY, Outbox, OutboxDrainer
+
+
+@pytest.fixture
+def outbox(tmp_path):
+    return Outbox(str(tmp_path / 'outbox.db'))
+
+
+def test_due_orders_by_endpoint_priority_then_insertion(outbox):
+    outbox.enqueue('/api/system-stats', {'n': 1})
+    outbox.enqueue('/api/url-activities', {'n': 2})
+    outbox.enqueue('/api/screenshots', b'jpeg', kind='screenshot', metadata={'monitor': 1})
+    outbox.enqueue('/api/clients/register', {'n': 4})
+    outbox.enqueue('/api/url-activities', {'n': 5})
+
+    entries = outbox.due()
+
+    assert [entry.endpoint for entry in entries] == [
+        '/api/clients/register', '/api/url-activities', '/api/url-activities',
+        '/api/screenshots', '/api/system-stats',
+    ]
+    assert [entry.json_payload()['n'] for entry in entries if entry.kind == 'json'] == [4, 2, 5, 1]
+    assert entries[3].payload == b'jpeg' and entries[3].metadata == {'monitor': 1}
+
+
+def test_same_idempotency_key_is_queued_once(outbox):
+    assert outbox.enqueue('/api/url-activities', {'a': 1}, idempotency_key='k1') == 'k1'
+    outbox.enqueue('/api/url-activities', {'a': 2}, idempotency_key='k1')
+
+    assert outbox.stats()['/api/url-activities']['count'] == 1
+    assert outbox.has_pending('/api/url-activities')
+    assert not outbox.has_pending('/api/browser-sessions')
+
+
+def test_defer_holds_back_later_entries_of_the_same_endpoint(outbox):
+    outbox.enqueue('/api/url-activities', {'n': 1})
+    outbox.enqueue('/api/url-activities', {'n': 2})
+    outbox.enqueue('/api/browser-sessions', {'n': 3})
+
+    first = outbox.due()[0]
+    outbox.defer(first)
+
+    assert [entry.json_payload()['n'] for entry in outbox.due()] == [3]
+
+
+def test_drain_keeps_order_when_an_endpoint_fails(outbox):
+    for n in range(3):
+        outbox.enqueue('/api/url-activities', {'n': n})
+    outbox.enqueue('/api/browser-sessions', {'n': 9})
+    outbox.enqueue('/api/screenshots', b'x', kind='screenshot')
+    delivered = []
+
+    def deliver(entry):
+        if entry.kind == 'screenshot':
+            return REJECTED
+        n = entry.json_payload()['n']
+        if n == 1:
+            return RETRY
+        delivered.append(n)
+        return DELIVERED
+
+    assert OutboxDrainer(outbox, deliver).drain_once() == 3
+
+    # n=2 was not tried after n=1 failed; the rejected screenshot was dropped
+    assert delivered == [0, 9]
+    assert outbox.stats() == {'/api/url-activities': {'count': 2, 'bytes': 16}}
+
+
+def test_retention_drops_old_entries_then_lowest_priority_first(tmp_path):
+    outbox = Outbox(str(tmp_path / 'outbox.db'), max_bytes=25, max_age=3600)
+    old_key = outbox.enqueue('/api/url-activities', {'old': True})
+    outbox._conn.execute('UPDATE outbox SET created_at = ? WHERE idempotency_key = ?',
+                         (time.time() - 7200, old_key))
+    outbox.enqueue('/api/url-activities', {'n': 1})  # 8 bytes
+    outbox.enqueue('/api/screenshots', b'0123456789', kind='screenshot')  # 10 bytes
+    outbox.enqueue('/api/system-stats', {'stats': 'x' * 10})  # lowest priority
+
+    assert outbox.enforce_retention() == 2
+
+    assert sorted(outbox.stats()) == ['/api/screenshots', '/api/url-activities']
+    assert outbox.due()[0].json_payload() == {'n': 1}
+
+
+def test_legacy_spool_files_are_imported_once(tmp_path):
+    pending = tmp_path / 'pending'
+    screenshots = tmp_path / 'screenshots'
+    pending.mkdir()
+    screenshots.mkdir()
+    (pending / '_api_url_activities_pending.jsonl').write_text('{"a": 1}\nnot json\n{"b": 2}\n')
+    (screenshots / 'screenshot_1.jpg').write_bytes(b'\xff\xd8jpeg')
+    (screenshots / 'screenshot_1_metadata.json').write_text(json.dumps(
+        {'client_id': 'c1', 'monitor': 2, 'local_file': 'screenshot_1.jpg', 'stored_at': 'x', 'size_bytes': 6}
+    ))
+    outbox = Outbox(str(tmp_path / 'outbox.db'))
+    client = APIClient('http://localhost', 'key', outbox_dir=str(tmp_path))
+
+    client._import_legacy_spool(outbox)
+    client._import_legacy_spool(outbox)
+
+    entries = outbox.due()
+    assert [(entry.endpoint, entry.kind) for entry in entries] == [
+        ('/api/url-activities', 'json'), ('/api/url-activities', 'json'), ('/api/screenshots', 'screenshot')
+    ]
+    assert entries[2].metadata == {'client_id': 'c1', 'monitor': 2}
+    assert list(pending.iterdir()) == [] and list(screenshots.iterdir()) == []
+
+
+@pytest.mark.parametrize('status, result', [
+    (201, DELIVERED), (409, RETRY), (422, REJECTED), (503, RETRY),
+])
+def test_replay_status_mapping(tmp_path, monkeypatch, status, result):
+    outbox = Outbox(str(tmp_path / 'outbox.db'))
+    outbox.enqueue('/api/url-activities', {'n': 1})
+    client = APIClient('http://localhost', 'key', outbox_dir=str(tmp_path))
+    monkeypatch.setattr(client.session, 'post', lambda *args, **kwargs: type('R', (), {'status_code': status})())
+
+    assert client._deliver_outbox_entry(outbox.due()[0]) == result
+
+
+def test_replay_re_registers_once_on_401_then_drops(tmp_path, monkeypatch):
+    outbox = Outbox(str(tmp_path / 'outbox.db'))
+    outbox.enqueue('/api/url-activities', {'n': 1})
+    client = APIClient('http://localhost', 'key', outbox_dir=str(tmp_path))
+    statuses = [401, 201]
+    monkeypatch.setattr(client.session, 'post',
+                        lambda *args, **kwargs: type('R', (), {'status_code': statuses.pop(0)})())
+    registrations = []
+    client.on_auth_failure = lambda: registrations.append(1) or True
+
+    assert client._deliver_outbox_entry(outbox.due()[0]) == DELIVERED
+    assert registrations == [1]
+
+    statuses[:] = [401, 401]
+    assert client._deliver_outbox_entry(outbox.due()[0]) == REJECTED
+    assert registrations == [1, 1]
+
+
+def test_best_effort_endpoints_are_never_queued(tmp_path, monkeypatch):
+    client = APIClient('http://localhost', 'key', outbox_dir=str(tmp_path))
+    calls = []
+
+    def post(*args, **kwargs):
+        calls.append(args[0])
+        return type('R', (), {'status_code': 404})()
+
+    monkeypatch.setattr(client.session, 'post', post)
+
+    assert client.post('/api/system-stats', {'stats': []})['success'] is False
+    assert client.post('/api/system-stats', {'stats': []})['skipped'] is True
+    assert calls == ['http://localhost/api/system-stats']
+    assert client.get_outbox_statistics() == {}
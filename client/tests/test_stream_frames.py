@@ -0,0 +1,47 @@
+"""Live stream delta frames (TJD1) pack and unpack losslessly"""
+
+import io
+
+import pytest
+from PIL import Image
+
+from modules.tile_delta import NUMPY_AVAILABLE, TileDeltaEncoder, pack_delta, unpack_delta
+
+
+def test_delta_round_trip():
+    tiles = [(0, 0, 64, 64, b'first'), (128, 64, 192, 64, b''), (640, 320, 32, 16, b'third tile')]
+
+    message = pack_delta(tiles, 42, 1280, 720, timestamp=1700000001.25)
+
+    assert unpack_delta(message) == (42, 1700000001.25, 1280, 720, tiles)
+
+
+def test_unpack_delta_rejects_other_frames():
+    with pytest.raises(ValueError):
+        unpack_delta(b'TJV1' + bytes(30))
+
+    truncated = pack_delta([(0, 0, 8, 8, b'tile bytes')], 1, 8, 8)[:-3]
+    with pytest.raises(ValueError):
+        unpack_delta(truncated)
+
+
+@pytest.mark.skipif(not NUMPY_AVAILABLE, reason="deltas need numpy")
+def test_encoded_delta_decodes_to_the_changed_region():
+    width, height = 256, 128
+    first = bytearray(b'\x20\x40\x60\x00' * width * height)
+    second = bytearray(first)
+    for y in range(70, 90):  # a change inside tile row 1, column 2
+        row = (y * width + 150) * 4
+        second[row:row + 40 * 4] = b'\xff\xff\xff\x00' * 40
+
+    encoder = TileDeltaEncoder(tile_size=64, keyframe_interval=60)
+    keyframe = encoder.encode(bytes(first), (width, height), (width, height), 80)
+    delta = encoder.encode(bytes(second), (width, height), (width, height), 80)
+    assert keyframe.keyframe and not delta.keyframe
+
+    sequence, _, out_w, out_h, tiles = unpack_delta(pack_delta(delta.tiles, 3, width, height))
+
+    assert (sequence, out_w, out_h) == (3, width, height)
+    assert tiles == delta.tiles
+    assert [(x, y, w, h) for x, y, w, h, _ in tiles] == [(128, 64, 64, 64)]
+    assert Image.open(io.BytesIO(tiles[0][4])).size == (64, 64)
@@ -0,0 +1,77 @@
+"""normalize_url canonicalisation and the memoised UrlNormalizer"""
+
+from modules.url_normalizer import (
+    ParsedUrl, UrlNormalizer, normalize_url, registrable_domain, title_from_domain
+)
+
+
+def test_tracking_parameters_are_removed_and_the_rest_kept_verbatim():
+    parsed = normalize_url('https://example.com/p?utm_source=x&id=5&GCLID=abc&b=&fbclid=1&q=a%20b#top')
+
+    assert parsed.canonical_url == 'https://example.com/p?id=5&b=&q=a%20b'
+
+
+def test_query_without_tracking_parameters_is_untouched():
+    url = 'https://example.com/search?q=1&&x=y'
+
+    assert normalize_url(url).canonical_url == url
+
+
+def test_only_tracking_parameters_leaves_no_query():
+    assert normalize_url('https://example.com/?utm_medium=a&utm_campaign=b').canonical_url == 'https://example.com/'
+
+
+def test_scheme_host_www_credentials_and_fragment():
+    parsed = normalize_url('HTTPS://user:pw@WWW.Example.COM/Path/?a=1#frag')
+
+    assert parsed == ParsedUrl('https://example.com/Path/?a=1', 'example.com', 'example.com')
+
+
+def test_port_is_kept():
+    parsed = normalize_url('http://www.localhost:8080/app')
+
+    assert parsed.canonical_url == 'http://localhost:8080/app'
+    assert parsed.domain == 'localhost'
+
+
+def test_malformed_port_gives_unknown_domain():
+    parsed = normalize_url('http://example.com:99999999/x')
+
+    assert parsed == ParsedUrl('http://example.com:99999999/x', 'unknown', 'unknown')
+
+
+def test_url_without_host():
+    assert normalize_url('about:blank#x') == ParsedUrl('about:blank', 'unknown', 'unknown')
+    assert normalize_url('') == ParsedUrl('', 'unknown', 'unknown')
+
+
+def test_ipv6_host_is_bracketed():
+    parsed = normalize_url('http://[::1]:3000/')
+
+    assert parsed.canonical_url == 'http://[::1]:3000/'
+    assert parsed.domain == '::1'
+
+
+def test_registrable_domain():
+    assert registrable_domain('mail.google.com') == 'google.com'
+    assert registrable_domain('shop.tokopedia.co.id') == 'tokopedia.co.id'
+    assert registrable_domain('a.b.example.com.au') == 'example.com.au'
+    assert registrable_domain('example.io') == 'example.io'
+    assert registrable_domain('192.168.1.10') == '192.168.1.10'
+
+
+def test_title_from_domain():
+    assert title_from_domain('example.com') == 'Example.com'
+    assert title_from_domain('unknown') == 'Unknown Page'
+    assert title_from_domain('') == 'Unknown Page'
+
+
+def test_normalizer_memoises_and_counts_hits():
+    normalizer = UrlNormalizer(max_entries=16)
+
+    assert normalizer.domain('https://www.example.com/a') == 'example.com'
+    assert normalizer.parse('https://www.example.com/a').registrable_domain == 'example.com'
+    assert normalizer.title(None) == 'Unknown Page'
+
+    stats = normalizer.get_statistics()
+    assert (stats['hits'], stats['misses'], stats['cached']) == (1, 2, 2)
@@ -0,0 +1,110 @@
+"""BrowserPidCache and classify_windows"""
+
+from modules.process_snapshot import ProcessInfo, ProcessSnapshot
+from modules.window_classifier import BrowserPidCache, BrowserWindow, classify_windows
+
+
+def _process(pid, name, create_time=100.0, browser=None):
+    return ProcessInfo(pid=pid, name=name, exe=None, create_time=create_time, cpu_times=None,
+                       memory_info=None, browser=browser, office_category=None, monitored=False)
+
+
+class FakeSnapshots:
+    """ProcessSnapshotService stand-in returning whatever processes were set last"""
+
+    def __init__(self, processes=()):
+        self.version = 0
+        self.set(processes)
+
+    def set(self, processes):
+        self.version += 1
+        self.snapshot = ProcessSnapshot(self.version, 0.0, tuple(processes), {}, (), ())
+
+    def get_snapshot(self):
+        return self.snapshot
+
+
+class FakeResolver:
+    def __init__(self, identities):
+        self.identities = identities
+        self.calls = []
+
+    def __call__(self, pid):
+        self.calls.append(pid)
+        return self.identities.get(pid)
+
+
+def test_snapshot_entries_answer_without_resolving():
+    resolver = FakeResolver({})
+    cache = BrowserPidCache(FakeSnapshots([_process(10, 'chrome.exe', browser='Chrome'),
+                                           _process(11, 'explorer.exe')]), resolve=resolver)
+    cache.sync()
+
+    assert cache.browser_of(10) == 'Chrome'
+    assert cache.browser_of(11) is None
+    assert resolver.calls == []
+    assert cache.hits == 2
+
+
+def test_pid_newer_than_the_snapshot_is_resolved_once():
+    resolver = FakeResolver({20: (200.0, 'firefox')})
+    cache = BrowserPidCache(FakeSnapshots(), resolve=resolver)
+    cache.sync()
+
+    assert cache.browser_of(20) == 'Firefox'
+    assert cache.browser_of(20) == 'Firefox'
+    assert resolver.calls == [20]
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_failed_resolution_is_not_cached():
+    resolver = FakeResolver({})
+    cache = BrowserPidCache(FakeSnapshots(), resolve=resolver)
+    cache.sync()
+
+    assert cache.browser_of(30) is None
+    # The PID is reused by a browser before the next snapshot
+    resolver.identities[30] = (300.0, 'msedge.exe')
+    assert cache.browser_of(30) == 'Edge'
+    assert resolver.calls == [30, 30]
+
+
+def test_new_snapshot_evicts_exited_and_reused_pids():
+    snapshots = FakeSnapshots([_process(40, 'chrome.exe', create_time=1.0, browser='Chrome')])
+    resolver = FakeResolver({41: (2.0, 'firefox')})
+    cache = BrowserPidCache(snapshots, resolve=resolver)
+    cache.sync()
+    assert cache.browser_of(41) == 'Firefox'
+
+    # 40 was reused by a non-browser; 41 exited
+    snapshots.set([_process(40, 'notepad.exe', create_time=5.0)])
+    cache.sync()
+    resolver.identities = {}
+
+    assert cache.browser_of(40) is None
+    assert cache.browser_of(41) is None
+    assert resolver.calls == [41, 41]
+
+
+def test_classify_windows_keeps_browser_windows_and_looks_up_each_pid_once():
+    lookups = []
+
+    def browser_of(pid):
+        lookups.append(pid)
+        return {1: 'Chrome', 2: 'Firefox'}.get(pid)
+
+    windows = [(100, 1, 'Inbox'), (101, 3, 'Terminal'), (102, 1, 'Docs'), (103, 2, 'News')]
+
+    assert classify_windows(windows, browser_of) == [
+        BrowserWindow(100, 1, 'Chrome', 'Inbox'),
+        BrowserWindow(102, 1, 'Chrome', 'Docs'),
+        BrowserWindow(103, 2, 'Firefox', 'News'),
+    ]
+    assert lookups == [1, 3, 2]
+
+
+def test_classify_windows_restricted_to_some_browsers():
+    browser_of = {1: 'Chrome', 2: 'Firefox'}.get
+    windows = [(100, 1, 'Inbox'), (103, 2, 'News')]
+
+    assert classify_windows(windows, browser_of, browsers=['Firefox']) == [BrowserWindow(103, 2, 'Firefox', 'News')]
@@ -10,6 +10,7 @@
 use Illuminate\Http\JsonResponse;
 use Illuminate\Support\Facades\Storage;
 use Illuminate\Support\Facades\Log;
+use Illuminate\Support\Carbon;
 use Illuminate\Support\Str;
 
 class ScreenshotController extends Controller
@@ -173,7 +174,8 @@ public function upload(Request $request): JsonResponse
             'file' => 'required|image|max:10240', // Max 10MB
             'client_id' => 'required|string',
             'resolution' => 'string',
-            'monitor' => 'integer|min:1'
+            'monitor' => 'integer|min:1',
+            'timestamp' => 'nullable|date'
         ]);
 
         $client = $this->validateAndGetClient($request);
@@ -185,11 +187,14 @@ public function upload(Request $request): JsonResponse
         try {
             $file = $request->file('file');
 
+            // Binary client uploads send the capture time; fall back to receive time
+            $capturedAt = $request->timestamp ? Carbon::parse($request->timestamp) : now();
+
             // Generate filename
             $filename = sprintf(
                 '%s_%s_%d.%s',
                 $client->client_id,
-                now()->format('Y-m-d_H-i-s'),
+                $capturedAt->format('Y-m-d_H-i-s'),
                 $request->monitor ?? 1,
                 $file->getClientOriginalExtension()
             );
@@ -205,7 +210,7 @@ public function upload(Request $request): JsonResponse
                 'resolution' => $request->resolution ?? 'unknown',
                 'monitor' => $request->monitor ?? 1,
                 'file_size' => $file->getSize(),
-                'captured_at' => now()
+                'captured_at' => $capturedAt
             ]);
 
             // Update client last seen
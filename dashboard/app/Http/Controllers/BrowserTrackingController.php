@@ -33,8 +33,10 @@ public function storeBrowserTracking(Request $request)
 
             $processed = [
                 'browser_sessions' => 0,
-                'url_activities' => 0
+                'url_activities' => 0,
+                'url_activity_updates' => 0
             ];
+            $unknownActivities = [];
 
             // Process browser sessions
             if (isset($data['browser_sessions']) && is_array($data['browser_sessions'])) {
@@ -52,9 +54,22 @@ public function storeBrowserTracking(Request $request)
                 }
             }
 
+            // Process URL activity deltas ({id, duration, clicks, keystrokes} of activities sent earlier)
+            if (isset($data['url_activity_updates']) && is_array($data['url_activity_updates'])) {
+                foreach ($data['url_activity_updates'] as $updateData) {
+                    if ($this->processUrlActivityUpdate($clientId, $updateData)) {
+                        $processed['url_activity_updates']++;
+                    } elseif (isset($updateData['id'])) {
+                        $unknownActivities[] = $updateData['id'];
+                    }
+                }
+            }
+
             return response()->json([
                 'status' => 'success',
                 'processed' => $processed,
+                // Client re-sends these in full
+                'unknown_url_activities' => $unknownActivities,
                 'timestamp' => now()->toISOString()
             ]);
 
@@ -270,10 +285,10 @@ private function processUrlActivity($clientId, $data)
         // Extract domain
         $domain = $this->extractDomain($url);
 
-        // Categorize the activity
+        // Categorize the activity (clients tag it from the domain rules; URL/title keywords can override)
         $categorizer = new ActivityCategorizerService();
         $pageTitle = $data['title'] ?? null;
-        $category = $categorizer->categorize($url, $domain, $pageTitle);
+        $category = $categorizer->resolveCategory($data['category'] ?? null, $url, $domain, $pageTitle);
 
         // Find or create browser session
         $browserSession = BrowserSession::where('client_id', $clientId)
@@ -296,13 +311,21 @@ private function processUrlActivity($clientId, $data)
         // This prevents duplicate entries while still allowing multiple visits to same URL
         // IMPORTANT: Also check browser_session_id to distinguish same URL in different browsers
         $recentCutoff = Carbon::now()->subSeconds(60);
-        $existingActivity = UrlActivity::where('client_id', $clientId)
-            ->where('url', $url)
-            ->where('browser_session_id', $browserSession->id)  // ✅ Distinguish by browser
-            ->where('is_active', true)
-            ->where('visit_start', '>=', $recentCutoff)  // Only consider recent activities
-            ->orderBy('visit_start', 'desc')
-            ->first();
+        if (!empty($data['id'])) {
+            // Same activity span re-sent in full by the client; an unknown id is a new span
+            $existingActivity = UrlActivity::where('client_id', $clientId)
+                ->where('client_activity_id', $data['id'])
+                ->first();
+        } else {
+            // Legacy clients without ids: reuse the recent active row for this URL and browser
+            $existingActivity = UrlActivity::where('client_id', $clientId)
+                ->where('url', $url)
+                ->where('browser_session_id', $browserSession->id)  // ✅ Distinguish by browser
+                ->where('is_active', true)
+                ->where('visit_start', '>=', $recentCutoff)  // Only consider recent activities
+                ->orderBy('visit_start', 'desc')
+                ->first();
+        }
 
         if ($existingActivity) {
             // Update existing recent activity (within last 60 seconds)
@@ -313,8 +336,12 @@ private function processUrlActivity($clientId, $data)
                 'clicks' => $data['clicks'] ?? $existingActivity->clicks,
                 'keystrokes' => $data['keystrokes'] ?? $existingActivity->keystrokes,
                 'is_active' => $data['is_active'] ?? true,
+                'metadata' => $data['metadata'] ?? $existingActivity->metadata,
                 'activity_category' => $category
             ];
+            if (!empty($data['id'])) {
+                $updateData['client_activity_id'] = $data['id'];
+            }
 
             // Set end time if activity is no longer active
             if (isset($data['is_active']) && !$data['is_active'] && isset($data['end_time'])) {
@@ -327,6 +354,7 @@ private function processUrlActivity($clientId, $data)
             // Create new activity
             $activity = UrlActivity::create([
                 'client_id' => $clientId,
+                'client_activity_id' => $data['id'] ?? null,
                 'browser_session_id' => $browserSession->id,
                 'url' => $url,
                 'domain' => $domain,
@@ -348,6 +376,65 @@ private function processUrlActivity($clientId, $data)
         }
     }
 
+    /**
+     * Domain category rules for clients.
+     * Answers {changed: false} when the client's rules (?since=version) are current.
+     */
+    public function getCategoryRules(Request $request)
+    {
+        $categorizer = new ActivityCategorizerService();
+        $version = $categorizer->getDomainRulesVersion();
+
+        if ($request->get('since') === $version) {
+            return response()->json([
+                'success' => true,
+                'changed' => false,
+                'version' => $version,
+            ]);
+        }
+
+        return response()->json([
+            'success' => true,
+            'changed' => true,
+            'version' => $version,
+            'rules' => $categorizer->getDomainRules(),
+        ]);
+    }
+
+    /**
+     * Apply a delta update to an activity previously sent in full.
+     * Returns false if the activity is unknown (the client then re-sends it in full).
+     */
+    private function processUrlActivityUpdate($clientId, $data)
+    {
+        if (empty($data['id'])) {
+            return false;
+        }
+
+        $activity = UrlActivity::where('client_id', $clientId)
+            ->where('client_activity_id', $data['id'])
+            ->first();
+
+        if (!$activity) {
+            return false;
+        }
+
+        $updateData = [];
+        foreach (['duration', 'clicks', 'keystrokes', 'scroll_depth', 'is_active'] as $field) {
+            if (array_key_exists($field, $data)) {
+                $updateData[$field] = $data[$field];
+            }
+        }
+        if (isset($data['end_time'])) {
+            $updateData['visit_end'] = Carbon::parse($data['end_time']);
+        }
+
+        if ($updateData) {
+            $activity->update($updateData);
+        }
+        return true;
+    }
+
     /**
      * Extract domain from URL
      */
@@ -12,8 +12,21 @@ class StreamController extends Controller
 {
     protected static $streamConnections = [];
 
+    // Deltas kept on top of one keyframe; past this the client must send a new keyframe
+    private const MAX_PENDING_DELTAS = 120;
+
     public function startStream(Request $request, $clientId)
     {
+        $request->validate([
+            'quality' => 'nullable|in:low,medium,high,custom',
+            'settings' => 'nullable|array',
+            'settings.width' => 'nullable|integer|min:160|max:3840',
+            'settings.height' => 'nullable|integer|min:120|max:2160',
+            'settings.fps' => 'nullable|numeric|min:1|max:30',
+            'settings.jpeg_quality' => 'nullable|integer|min:10|max:95',
+            'settings.resample' => 'nullable|in:nearest,bilinear,bicubic,lanczos',
+        ]);
+
         $quality = $request->input('quality', 'medium');
 
         $client = Client::where('client_id', $clientId)->first();
@@ -22,10 +35,15 @@ public function startStream(Request $request, $clientId)
         }
 
         // Store stream request in cache/database
-        cache()->put("stream_request_{$clientId}", [
+        $streamRequest = [
             'quality' => $quality,
             'timestamp' => now()
-        ], 300); // 5 minutes
+        ];
+        if ($quality === 'custom') {
+            $streamRequest['settings'] = $request->input('settings', []);
+        }
+
+        cache()->put("stream_request_{$clientId}", $streamRequest, 300); // 5 minutes
 
         return response()->json(['success' => true, 'message' => 'Stream started']);
     }
@@ -38,15 +56,43 @@ public function stopStream(Request $request, $clientId)
         return response()->json(['success' => true, 'message' => 'Stream stopped']);
     }
 
-    public function getStreamRequest($clientId)
+    /**
+     * Stream command long-poll for clients.
+     *
+     * With ?wait=N and If-None-Match, the request is held (up to the configured
+     * stream_long_poll_seconds) until the stream command changes, otherwise it
+     * ends with an empty 304. The X-Long-Poll header tells clients how long the
+     * server holds requests; 0 means "answered immediately, poll on a timer".
+     */
+    public function getStreamRequest(Request $request, $clientId)
+    {
+        $maxWait = max(0, (int) config('app.stream_long_poll_seconds', 0));
+        $wait = min($maxWait, max(0, (int) $request->query('wait', 0)));
+        $knownEtag = trim((string) $request->header('If-None-Match'), '" ');
+        $deadline = microtime(true) + $wait;
+
+        $payload = $this->streamCommand($clientId);
+        $etag = md5(json_encode($payload));
+        while ($etag === $knownEtag && microtime(true) < $deadline) {
+            usleep(250000);
+            $payload = $this->streamCommand($clientId);
+            $etag = md5(json_encode($payload));
+        }
+
+        $response = $etag === $knownEtag ? response('', 304) : response()->json($payload);
+
+        return $response->header('ETag', "\"{$etag}\"")->header('X-Long-Poll', (string) $maxWait);
+    }
+
+    private function streamCommand($clientId)
     {
         $streamRequest = cache()->get("stream_request_{$clientId}");
 
         if ($streamRequest) {
-            return response()->json($streamRequest);
+            return array_merge($streamRequest, ['streaming' => true]);
         }
 
-        return response()->json(['streaming' => false]);
+        return ['streaming' => false];
     }
 
     public function getStreamStatus($clientId)
@@ -71,6 +117,10 @@ public function uploadStreamChunk(Request $request, $clientId)
             $sequence = $request->input('sequence', 0);
             $quality = $request->input('quality', 'medium');
 
+            if ($request->filled('delta')) {
+                return $this->storeStreamDelta($clientId, $request->input('delta'), (int) $sequence, $request->input('base'));
+            }
+
             if (empty($chunk)) {
                 Log::warning('uploadStreamChunk missing chunk data', [
                     'client_id' => $clientId,
@@ -86,6 +136,7 @@ public function uploadStreamChunk(Request $request, $clientId)
                 'sequence' => $sequence,
                 'timestamp' => now(),
                 'quality' => $quality,
+                'deltas' => [],
             ], 10); // Keep for 10 seconds
 
             // Optional: Log for debugging purposes
@@ -102,16 +153,62 @@ public function uploadStreamChunk(Request $request, $clientId)
         }
     }
 
-    public function getLatestChunk($clientId)
+    /**
+     * Append a packed delta frame (TJD1, base64) to the stored keyframe.
+     *
+     * The delta only applies on top of the keyframe it was encoded against, so a
+     * missing, replaced or overfull keyframe answers 409 and the client sends a
+     * full frame next.
+     */
+    private function storeStreamDelta($clientId, $delta, $sequence, $base)
+    {
+        $videoChunk = cache()->get("latest_video_chunk_{$clientId}");
+
+        if (!$videoChunk || $base === null || (int) $videoChunk['sequence'] !== (int) $base
+            || count($videoChunk['deltas'] ?? []) >= self::MAX_PENDING_DELTAS) {
+            return response()->json(['error' => 'Keyframe required', 'keyframe_required' => true], 409);
+        }
+
+        $videoChunk['deltas'][] = ['sequence' => $sequence, 'data' => $delta];
+        $videoChunk['timestamp'] = now();
+        cache()->put("latest_video_chunk_{$clientId}", $videoChunk, 10);
+
+        return response()->json(['success' => true, 'sequence' => $sequence]);
+    }
+
+    /**
+     * Latest frame for the viewer: the keyframe plus the deltas on top of it.
+     *
+     * With ?keyframe=<sequence>&since=<sequence> (the keyframe and the last
+     * frame the viewer drew) the keyframe is left out while it is still the one
+     * the viewer has, and only newer deltas are returned.
+     */
+    public function getLatestChunk(Request $request, $clientId)
     {
         try {
+            // A viewer is still watching - keep the stream request alive so the
+            // client is not told to stop while someone polls frames
+            $streamRequest = cache()->get("stream_request_{$clientId}");
+            if ($streamRequest) {
+                cache()->put("stream_request_{$clientId}", $streamRequest, 300);
+            }
+
             // Fetch the latest video chunk from the cache.
             $videoChunk = cache()->get("latest_video_chunk_{$clientId}");
 
             if ($videoChunk) {
+                $since = (int) $request->query('since', -1);
+                $hasKeyframe = $request->query('keyframe') !== null
+                    && (int) $request->query('keyframe') === (int) $videoChunk['sequence'];
+                $deltas = array_values(array_filter(
+                    $videoChunk['deltas'] ?? [],
+                    fn ($delta) => !$hasKeyframe || $delta['sequence'] > $since
+                ));
+
                 return response()->json([
-                    'data' => $videoChunk['data'],
+                    'data' => $hasKeyframe ? null : $videoChunk['data'],
                     'sequence' => $videoChunk['sequence'],
+                    'deltas' => $deltas,
                     'timestamp' => $videoChunk['timestamp'],
                     'type' => 'video_stream', // Hardcoded to video stream
                     'quality' => $videoChunk['quality'] ?? 'medium'
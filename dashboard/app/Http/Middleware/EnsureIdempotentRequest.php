@@ -0,0 +1,65 @@
+<?php
+
+namespace App\Http\Middleware;
+
+use App\Models\IdempotencyKey;
+use Closure;
+use Illuminate\Database\UniqueConstraintViolationException;
+use Illuminate\Http\Request;
+use Symfony\Component\HttpFoundation\Response;
+
+class EnsureIdempotentRequest
+{
+    /**
+     * Replay the stored response for a POST whose Idempotency-Key was already
+     * processed, so outbox retries after a lost response are not stored twice.
+     *
+     * @param  \Closure(\Illuminate\Http\Request): (\Symfony\Component\HttpFoundation\Response)  $next
+     */
+    public function handle(Request $request, Closure $next): Response
+    {
+        $key = $request->header('Idempotency-Key');
+        if (!$request->isMethod('POST') || !$key || strlen($key) > 64) {
+            return $next($request);
+        }
+
+        $endpoint = substr($request->path(), 0, 100);
+
+        try {
+            // Claim the key before processing; the unique index makes concurrent retries lose the race
+            $record = IdempotencyKey::create(['key' => $key, 'endpoint' => $endpoint]);
+        } catch (UniqueConstraintViolationException $e) {
+            $existing = IdempotencyKey::where('key', $key)->where('endpoint', $endpoint)->first();
+
+            if ($existing && $existing->isCompleted()) {
+                return response($existing->response_body, $existing->response_status)
+                    ->header('Content-Type', 'application/json')
+                    ->header('Idempotent-Replayed', 'true');
+            }
+
+            // A claim that outlived its lease belongs to a request that died mid-way
+            if (!$existing || !$existing->takeOverExpiredClaim()) {
+                return response()->json([
+                    'success' => false,
+                    'message' => 'A request with this Idempotency-Key is already being processed',
+                ], 409)->header('Retry-After', (string) IdempotencyKey::CLAIM_LEASE_SECONDS);
+            }
+
+            $record = $existing;
+        }
+
+        $response = $next($request);
+
+        if ($response->isSuccessful()) {
+            $record->update([
+                'response_status' => $response->getStatusCode(),
+                'response_body' => $response->getContent(),
+            ]);
+        } else {
+            // Failed requests were not applied: release the key so the retry is processed
+            $record->delete();
+        }
+
+        return $response;
+    }
+}
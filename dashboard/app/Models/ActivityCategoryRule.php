@@ -0,0 +1,28 @@
+<?php
+
+namespace App\Models;
+
+use App\Services\ActivityCategorizerService;
+use Illuminate\Database\Eloquent\Model;
+use Illuminate\Support\Facades\Cache;
+
+class ActivityCategoryRule extends Model
+{
+    const TYPE_DOMAIN = 'domain';
+    const TYPE_KEYWORD = 'keyword';
+
+    protected $fillable = [
+        'type',
+        'pattern',
+        'category',
+    ];
+
+    /**
+     * Drop the cached rule set whenever a rule changes
+     */
+    protected static function booted(): void
+    {
+        static::saved(fn () => Cache::forget(ActivityCategorizerService::RULES_CACHE_KEY));
+        static::deleted(fn () => Cache::forget(ActivityCategorizerService::RULES_CACHE_KEY));
+    }
+}
@@ -0,0 +1,64 @@
+<?php
+
+namespace App\Models;
+
+use Illuminate\Database\Eloquent\Builder;
+use Illuminate\Database\Eloquent\MassPrunable;
+use Illuminate\Database\Eloquent\Model;
+
+class IdempotencyKey extends Model
+{
+    use MassPrunable;
+
+    /**
+     * How long a key is remembered. Clients drop undelivered requests after
+     * 72 hours, so a replay can never arrive later than this.
+     */
+    public const RETENTION_DAYS = 4;
+
+    /**
+     * How long an unfinished claim blocks its key. A request that is still not
+     * done after this (worker killed, timed out) lost its claim and a retry may
+     * take it over.
+     */
+    public const CLAIM_LEASE_SECONDS = 120;
+
+    protected $fillable = [
+        'key',
+        'endpoint',
+        'response_status',
+        'response_body',
+    ];
+
+    protected $casts = [
+        'response_status' => 'integer',
+    ];
+
+    /**
+     * Keys older than the retention window
+     */
+    public function prunable(): Builder
+    {
+        return static::where('created_at', '<', now()->subDays(self::RETENTION_DAYS));
+    }
+
+    /**
+     * Take over this key's expired unfinished claim. Returns false if the claim
+     * finished, is still fresh, or another retry took it over first.
+     */
+    public function takeOverExpiredClaim(): bool
+    {
+        return static::whereKey($this->getKey())
+            ->whereNull('response_status')
+            ->where('updated_at', '<', now()->subSeconds(self::CLAIM_LEASE_SECONDS))
+            ->update(['updated_at' => now()]) === 1;
+    }
+
+    /**
+     * Whether the first request with this key has finished
+     */
+    public function isCompleted(): bool
+    {
+        return $this->response_status !== null;
+    }
+}
@@ -10,6 +10,7 @@ class UrlActivity extends Model
 {
     protected $fillable = [
         'client_id',
+        'client_activity_id',
         'browser_session_id',
         'url',
         'domain',
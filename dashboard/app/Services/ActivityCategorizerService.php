@@ -2,84 +2,138 @@
 
 namespace App\Services;
 
+use App\Models\ActivityCategoryRule;
+use Illuminate\Support\Facades\Cache;
+
 class ActivityCategorizerService
 {
     const CATEGORY_WORK = 'work';
     const CATEGORY_SOCIAL = 'social_media';
     const CATEGORY_SUSPICIOUS = 'suspicious';
 
+    const RULES_CACHE_KEY = 'activity_category_rules';
+
+    /**
+     * Loaded rule set: ['domains' => [domain => category], 'keywords' => [category => [keyword, ...]]]
+     */
+    protected ?array $rules = null;
+
     /**
-     * Work-related keywords
+     * Rules from config/activity_categories.php, extended or overridden by the
+     * activity_category_rules table. Cached; changing a rule drops the cache.
+     *
+     * @return array
      */
-    protected $workKeywords = [
-        // Office Apps
-        'excel', 'xls', 'xlsx', 'spreadsheet',
-        'word', 'doc', 'docx', 'document',
-        'powerpoint', 'ppt', 'pptx', 'presentation',
-        'pdf', 'adobe', 'acrobat',
-
-        // Accounting/Finance
-        'accurate', 'coretax', 'pajak.go.id', 'e-faktur', 'efaktur',
-        'e-spt', 'espt', 'jurnal.id', 'zahir', 'myob',
-        'accounting', 'finance', 'akuntansi', 'keuangan',
-
-        // Email
-        'mail.google.com', 'gmail', 'outlook', 'office.com',
-        'email', 'inbox', 'webmail',
-
-        // Productivity Tools
-        'drive.google.com', 'docs.google.com', 'sheets.google.com',
-        'dropbox', 'onedrive', 'notion', 'trello', 'asana',
-
-        // Communication (work)
-        'slack', 'teams', 'zoom', 'meet.google.com',
-        'skype', 'webex',
-
-        // Development (if applicable)
-        'github', 'gitlab', 'bitbucket', 'stackoverflow',
-        'localhost', 'dev.', 'staging.', 'admin.',
-    ];
+    protected function rules(): array
+    {
+        return $this->rules ??= Cache::remember(
+            self::RULES_CACHE_KEY,
+            (int) config('activity_categories.cache_ttl', 300),
+            fn () => $this->loadRules()
+        );
+    }
 
     /**
-     * Social media & entertainment keywords
+     * Build the rule set from config and the database
+     *
+     * @return array
      */
-    protected $socialKeywords = [
-        // Social Media
-        'youtube', 'youtu.be', 'instagram', 'tiktok',
-        'facebook', 'fb.com', 'twitter', 'x.com',
-        'whatsapp.com', 'telegram.org', 'linkedin.com',
+    protected function loadRules(): array
+    {
+        $domains = config('activity_categories.domains', []);
+        $keywords = config('activity_categories.keywords', []);
+
+        try {
+            $rows = ActivityCategoryRule::all(['type', 'pattern', 'category']);
+        } catch (\Throwable $e) {
+            // Table not migrated yet: config defaults only
+            $rows = collect();
+        }
+
+        foreach ($rows as $row) {
+            if (!$this->isValidCategory($row->category)) {
+                continue;
+            }
+            $pattern = strtolower(trim($row->pattern));
+            if ($row->type === ActivityCategoryRule::TYPE_DOMAIN) {
+                $domains[$pattern] = $row->category;
+            } else {
+                $keywords[$row->category][] = $pattern;
+            }
+        }
 
-        // Entertainment
-        'netflix', 'disney', 'hbo', 'spotify',
-        'soundcloud', 'twitch', 'reddit',
+        // The keyword scan also matches every domain rule, so a rule added for clients applies here too
+        foreach ($domains as $domain => $category) {
+            $keywords[$category][] = $domain;
+        }
+        foreach ($keywords as $category => $list) {
+            $keywords[$category] = array_values(array_unique($list));
+        }
 
-        // Shopping
-        'tokopedia', 'shopee', 'lazada', 'bukalapak',
-        'amazon', 'ebay', 'alibaba', 'olx', 'carousell',
+        ksort($domains);
+
+        return ['domains' => $domains, 'keywords' => $keywords];
+    }
 
-        // News/Portal (non-work)
-        'detik.com', 'kompas.com', 'tribun',
-        'liputan6', 'cnnindonesia',
-    ];
+    /**
+     * Domain rules for clients
+     *
+     * @return array domain => category
+     */
+    public function getDomainRules(): array
+    {
+        return $this->rules()['domains'];
+    }
 
     /**
-     * Suspicious keywords (gambling, gaming, etc)
+     * Version of the domain rules (changes whenever a rule does)
+     *
+     * @return string
      */
-    protected $suspiciousKeywords = [
-        // Gambling/Betting
-        'judi', 'taruhan', 'betting', 'bet', 'odds',
-        'slot', 'casino', 'poker', 'roulette', 'blackjack',
-        'sbobet', 'maxbet', 'togel', 'jackpot',
-        'deposit', 'withdraw', 'bonus slot', 'gacor',
-
-        // Online Gaming
-        'mobile legends', 'mobilelegends', 'ml.', 'mlbb',
-        'free fire', 'freefire', 'garena',
-        'pubg', 'fortnite', 'valorant', 'apex legends',
-        'steam', 'epicgames', 'battle.net',
-        'roblox', 'minecraft', 'genshin', 'honkai',
-        'mobile legend', 'game online',
-    ];
+    public function getDomainRulesVersion(): string
+    {
+        return sha1(json_encode($this->getDomainRules()));
+    }
+
+    /**
+     * Whether a category reported by a client is one we know
+     *
+     * @param string|null $category
+     * @return bool
+     */
+    public function isValidCategory(?string $category): bool
+    {
+        return in_array($category, [self::CATEGORY_WORK, self::CATEGORY_SOCIAL, self::CATEGORY_SUSPICIOUS], true);
+    }
+
+    /**
+     * Final category of an activity the client may already have tagged from the domain rules.
+     * Keywords in the URL or title still override the domain tag: suspicious content on any
+     * domain, and work content on a social domain (an Excel tutorial on YouTube).
+     *
+     * @param string|null $clientCategory
+     * @param string $url
+     * @param string $domain
+     * @param string|null $pageTitle
+     * @return string
+     */
+    public function resolveCategory(?string $clientCategory, string $url, string $domain, ?string $pageTitle = null): string
+    {
+        if (!$this->isValidCategory($clientCategory)) {
+            return $this->categorize($url, $domain, $pageTitle);
+        }
+
+        $keywordCategory = $this->matchKeywords(strtolower($url . ' ' . ($pageTitle ?? '')));
+
+        if ($keywordCategory === self::CATEGORY_SUSPICIOUS) {
+            return self::CATEGORY_SUSPICIOUS;
+        }
+        if ($clientCategory === self::CATEGORY_SOCIAL && $keywordCategory === self::CATEGORY_WORK) {
+            return self::CATEGORY_WORK;
+        }
+
+        return $clientCategory;
+    }
 
     /**
      * Categorize a URL activity
@@ -94,29 +148,30 @@ public function categorize(string $url, string $domain, ?string $pageTitle = nul
         // Combine all text for searching
         $searchText = strtolower($url . ' ' . $domain . ' ' . ($pageTitle ?? ''));
 
-        // 1. Check SUSPICIOUS first (highest priority)
-        foreach ($this->suspiciousKeywords as $keyword) {
-            if ($this->containsKeyword($searchText, $keyword)) {
-                return self::CATEGORY_SUSPICIOUS;
-            }
-        }
+        // Default: work (benefit of the doubt)
+        return $this->matchKeywords($searchText) ?? self::CATEGORY_WORK;
+    }
 
-        // 2. Check WORK keywords
-        foreach ($this->workKeywords as $keyword) {
-            if ($this->containsKeyword($searchText, $keyword)) {
-                return self::CATEGORY_WORK;
-            }
-        }
+    /**
+     * First keyword category found in text, or null if no keyword matches
+     *
+     * @param string $searchText lowercase
+     * @return string|null
+     */
+    protected function matchKeywords(string $searchText): ?string
+    {
+        $keywords = $this->rules()['keywords'];
 
-        // 3. Check SOCIAL MEDIA keywords
-        foreach ($this->socialKeywords as $keyword) {
-            if ($this->containsKeyword($searchText, $keyword)) {
-                return self::CATEGORY_SOCIAL;
+        // SUSPICIOUS first (highest priority), then WORK, then SOCIAL MEDIA
+        foreach ([self::CATEGORY_SUSPICIOUS, self::CATEGORY_WORK, self::CATEGORY_SOCIAL] as $category) {
+            foreach ($keywords[$category] ?? [] as $keyword) {
+                if ($this->containsKeyword($searchText, $keyword)) {
+                    return $category;
+                }
             }
         }
 
-        // Default: work (benefit of the doubt)
-        return self::CATEGORY_WORK;
+        return null;
     }
 
     /**
@@ -31,6 +31,11 @@
             \Illuminate\Foundation\Http\Middleware\ValidatePostSize::class,
             \Illuminate\Foundation\Http\Middleware\ConvertEmptyStringsToNull::class,
         ]);
+
+        // Replay stored responses for retried client uploads (Idempotency-Key header)
+        $middleware->alias([
+            'idempotent' => \App\Http\Middleware\EnsureIdempotentRequest::class,
+        ]);
     })
     ->withExceptions(function (Exceptions $exceptions): void {
         // Return JSON for API 429 errors instead of HTML
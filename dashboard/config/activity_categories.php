@@ -0,0 +1,170 @@
+<?php
+
+return [
+
+    /*
+    |--------------------------------------------------------------------------
+    | Activity Category Rules
+    |--------------------------------------------------------------------------
+    |
+    | Default rules for classifying URL activities as work, social_media or
+    | suspicious. Rows in the activity_category_rules table extend or
+    | override these at runtime without a deploy.
+    |
+    | Domain rules are sent to clients, which classify every visit locally;
+    | a rule covers the domain and all of its subdomains and the most
+    | specific rule wins. The server's keyword scan (used when a client did
+    | not tag a visit, and to override its tag) matches the domain rules
+    | plus the keywords below anywhere in the URL or page title.
+    |
+    */
+
+    'cache_ttl' => env('ACTIVITY_CATEGORY_CACHE_TTL', 300),
+
+    'domains' => [
+        // Work
+        'mail.google.com' => 'work',
+        'docs.google.com' => 'work',
+        'drive.google.com' => 'work',
+        'sheets.google.com' => 'work',
+        'meet.google.com' => 'work',
+        'office.com' => 'work',
+        'outlook.com' => 'work',
+        'outlook.live.com' => 'work',
+        'onedrive.live.com' => 'work',
+        'teams.microsoft.com' => 'work',
+        'dropbox.com' => 'work',
+        'notion.so' => 'work',
+        'trello.com' => 'work',
+        'asana.com' => 'work',
+        'slack.com' => 'work',
+        'zoom.us' => 'work',
+        'skype.com' => 'work',
+        'webex.com' => 'work',
+        'github.com' => 'work',
+        'gitlab.com' => 'work',
+        'bitbucket.org' => 'work',
+        'stackoverflow.com' => 'work',
+        'pajak.go.id' => 'work',
+        'jurnal.id' => 'work',
+        'accurate.id' => 'work',
+        'zahir.co.id' => 'work',
+        'myob.com' => 'work',
+
+        // Social media & entertainment
+        'youtube.com' => 'social_media',
+        'youtu.be' => 'social_media',
+        'instagram.com' => 'social_media',
+        'tiktok.com' => 'social_media',
+        'facebook.com' => 'social_media',
+        'fb.com' => 'social_media',
+        'twitter.com' => 'social_media',
+        'x.com' => 'social_media',
+        'whatsapp.com' => 'social_media',
+        'telegram.org' => 'social_media',
+        'linkedin.com' => 'social_media',
+        'netflix.com' => 'social_media',
+        'disneyplus.com' => 'social_media',
+        'hbomax.com' => 'social_media',
+        'spotify.com' => 'social_media',
+        'soundcloud.com' => 'social_media',
+        'twitch.tv' => 'social_media',
+        'reddit.com' => 'social_media',
+
+        // Shopping
+        'tokopedia.com' => 'social_media',
+        'shopee.co.id' => 'social_media',
+        'lazada.co.id' => 'social_media',
+        'bukalapak.com' => 'social_media',
+        'amazon.com' => 'social_media',
+        'ebay.com' => 'social_media',
+        'alibaba.com' => 'social_media',
+        'olx.co.id' => 'social_media',
+        'carousell.com' => 'social_media',
+
+        // News/Portal (non-work)
+        'detik.com' => 'social_media',
+        'kompas.com' => 'social_media',
+        'tribunnews.com' => 'social_media',
+        'liputan6.com' => 'social_media',
+        'cnnindonesia.com' => 'social_media',
+
+        // Gambling / online gaming
+        'sbobet.com' => 'suspicious',
+        'maxbet.com' => 'suspicious',
+        'mobilelegends.com' => 'suspicious',
+        'garena.com' => 'suspicious',
+        'pubg.com' => 'suspicious',
+        'fortnite.com' => 'suspicious',
+        'playvalorant.com' => 'suspicious',
+        'steampowered.com' => 'suspicious',
+        'steamcommunity.com' => 'suspicious',
+        'epicgames.com' => 'suspicious',
+        'battle.net' => 'suspicious',
+        'roblox.com' => 'suspicious',
+        'minecraft.net' => 'suspicious',
+        'hoyoverse.com' => 'suspicious',
+    ],
+
+    // Keywords beyond the domains above, per category
+    'keywords' => [
+        'work' => [
+            // Office Apps
+            'excel', 'xls', 'xlsx', 'spreadsheet',
+            'word', 'doc', 'docx', 'document',
+            'powerpoint', 'ppt', 'pptx', 'presentation',
+            'pdf', 'adobe', 'acrobat',
+
+            // Accounting/Finance
+            'accurate', 'coretax', 'e-faktur', 'efaktur',
+            'e-spt', 'espt', 'zahir', 'myob',
+            'accounting', 'finance', 'akuntansi', 'keuangan',
+
+            // Email
+            'gmail', 'outlook', 'email', 'inbox', 'webmail',
+
+            // Productivity Tools
+            'dropbox', 'onedrive', 'notion', 'trello', 'asana',
+
+            // Communication (work)
+            'slack', 'teams', 'zoom', 'skype', 'webex',
+
+            // Development (if applicable)
+            'github', 'gitlab', 'bitbucket', 'stackoverflow',
+            'localhost', 'dev.', 'staging.', 'admin.',
+        ],
+
+        'social_media' => [
+            // Social Media
+            'youtube', 'instagram', 'tiktok', 'facebook', 'twitter',
+
+            // Entertainment
+            'netflix', 'disney', 'hbo', 'spotify',
+            'soundcloud', 'twitch', 'reddit',
+
+            // Shopping
+            'tokopedia', 'shopee', 'lazada', 'bukalapak',
+            'amazon', 'ebay', 'alibaba', 'olx', 'carousell',
+
+            // News/Portal (non-work)
+            'tribun', 'liputan6', 'cnnindonesia',
+        ],
+
+        'suspicious' => [
+            // Gambling/Betting
+            'judi', 'taruhan', 'betting', 'bet', 'odds',
+            'slot', 'casino', 'poker', 'roulette', 'blackjack',
+            'sbobet', 'maxbet', 'togel', 'jackpot',
+            'deposit', 'withdraw', 'bonus slot', 'gacor',
+
+            // Online Gaming
+            'mobile legends', 'mobilelegends', 'ml.', 'mlbb',
+            'free fire', 'freefire', 'garena',
+            'pubg', 'fortnite', 'valorant', 'apex legends',
+            'steam', 'epicgames',
+            'roblox', 'minecraft', 'genshin', 'honkai',
+            'mobile legend', 'game online',
+        ],
+    ],
+
+];
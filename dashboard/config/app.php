@@ -27,6 +27,23 @@
 
     'client_version' => env('CLIENT_VERSION', '2.0.0'),
 
+    /*
+    |--------------------------------------------------------------------------
+    | Stream Command Long-Poll
+    |--------------------------------------------------------------------------
+    |
+    | Longest time (seconds) a client's stream command request is held while
+    | nothing changes. A held request sleeps and re-reads one cache key every
+    | 250 ms, so live view starts within a quarter second and an idle client
+    | makes one request per this many seconds. Each held request occupies a
+    | PHP worker while it sleeps, so holding is off by default: clients then
+    | send a conditional GET every 15 seconds. Enable it on servers with a
+    | worker per client to spare (e.g. Octane) by setting a value like 20.
+    |
+    */
+
+    'stream_long_poll_seconds' => (int) env('STREAM_LONG_POLL_SECONDS', 0),
+
     /*
     |--------------------------------------------------------------------------
     | Application Environment
@@ -0,0 +1,32 @@
+<?php
+
+use Illuminate\Database\Migrations\Migration;
+use Illuminate\Database\Schema\Blueprint;
+use Illuminate\Support\Facades\Schema;
+
+return new class extends Migration
+{
+    /**
+     * Run the migrations.
+     */
+    public function up(): void
+    {
+        Schema::table('url_activities', function (Blueprint $table) {
+            // Client-generated id of the activity span, referenced by delta updates
+            $table->string('client_activity_id', 64)->nullable()->after('client_id');
+
+            $table->index(['client_id', 'client_activity_id']);
+        });
+    }
+
+    /**
+     * Reverse the migrations.
+     */
+    public function down(): void
+    {
+        Schema::table('url_activities', function (Blueprint $table) {
+            $table->dropIndex(['client_id', 'client_activity_id']);
+            $table->dropColumn('client_activity_id');
+        });
+    }
+};
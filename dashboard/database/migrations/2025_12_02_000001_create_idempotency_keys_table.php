@@ -0,0 +1,36 @@
+<?php
+
+use Illuminate\Database\Migrations\Migration;
+use Illuminate\Database\Schema\Blueprint;
+use Illuminate\Support\Facades\Schema;
+
+return new class extends Migration
+{
+    /**
+     * Run the migrations.
+     */
+    public function up(): void
+    {
+        Schema::create('idempotency_keys', function (Blueprint $table) {
+            $table->id();
+            // Idempotency-Key header sent by the client outbox, scoped to the endpoint
+            $table->string('key', 64);
+            $table->string('endpoint', 100);
+            // Stored response; null while the first request is still being processed
+            $table->unsignedSmallInteger('response_status')->nullable();
+            $table->mediumText('response_body')->nullable();
+            $table->timestamps();
+
+            $table->unique(['key', 'endpoint']);
+            $table->index('created_at');
+        });
+    }
+
+    /**
+     * Reverse the migrations.
+     */
+    public function down(): void
+    {
+        Schema::dropIfExists('idempotency_keys');
+    }
+};
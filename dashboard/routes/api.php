@@ -55,8 +55,10 @@
 
 // Screenshot upload - NO throttling (clients upload every 5 minutes)
 Route::prefix('screenshots')->group(function () {
-    Route::post('/', [ScreenshotController::class, 'store']);
-    Route::post('/upload', [ScreenshotController::class, 'upload']);
+    Route::middleware('idempotent')->group(function () {
+        Route::post('/', [ScreenshotController::class, 'store']);
+        Route::post('/upload', [ScreenshotController::class, 'upload']);
+    });
 
     // NO AUTH for local testing - fetch screenshots by client
     Route::get('/', [ScreenshotController::class, 'index']);
@@ -70,20 +72,21 @@
 
 // Enhanced Browser Tracking - NO throttling (continuous monitoring)
 Route::prefix('browser-tracking')->group(function () {
-    Route::post('/', [BrowserTrackingController::class, 'storeBrowserTracking']);
+    Route::middleware('idempotent')->post('/', [BrowserTrackingController::class, 'storeBrowserTracking']);
+    Route::get('/category-rules', [BrowserTrackingController::class, 'getCategoryRules']);
     Route::middleware('auth:sanctum')->get('/{clientId}/summary', [BrowserTrackingController::class, 'getBrowserSummary']);
 });
 
 Route::prefix('browser-sessions')->group(function () {
     Route::get('/', [BrowserSessionController::class, 'index']);
     Route::get('/{browserSession}', [BrowserSessionController::class, 'show']);
-    Route::post('/', [BrowserTrackingController::class, 'storeBrowserSession']);
+    Route::middleware('idempotent')->post('/', [BrowserTrackingController::class, 'storeBrowserSession']);
 });
 
 Route::prefix('url-activities')->group(function () {
     Route::get('/', [UrlActivityController::class, 'index']);
     Route::get('/{urlActivity}', [UrlActivityController::class, 'show']);
-    Route::post('/', [BrowserTrackingController::class, 'storeUrlActivity']);
+    Route::middleware('idempotent')->post('/', [BrowserTrackingController::class, 'storeUrlActivity']);
 });
 
 // System stats - NO throttling (continuous monitoring)
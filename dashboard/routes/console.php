@@ -103,3 +103,9 @@
     ->at('03:30')
     ->description('Weekly cleanup of URL activities older than 90 days')
     ->emailOutputOnFailure(config('mail.admin_email', 'admin@tenjo.app'));
+
+// Forget client Idempotency-Keys once no outbox can still replay them
+Schedule::command('model:prune', ['--model' => [\App\Models\IdempotencyKey::class]])
+    ->daily()
+    ->at('04:30')
+    ->description('Daily pruning of expired idempotency keys');